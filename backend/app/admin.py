@@ -11,10 +11,19 @@ __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
 
+from core.cache import user_cache
 from core.config import settings
-from models import BlackListTokens, GeneratedImage, Styles, Transaction, User
+from models import (
+    BlackListTokens,
+    GeneratedImage,
+    GenerationJob,
+    Styles,
+    Transaction,
+    User,
+)
 from sqladmin import ModelView
 from sqladmin.authentication import AuthenticationBackend
+from services import styles_catalog
 from starlette.requests import Request
 from utils import create_access_token, decode_access_token
 
@@ -58,6 +67,12 @@ class UserAdmin(ModelView, model=User):  # type: ignore
     column_searchable_list = [User.name, User.email]
     column_sortable_list = [User.id, User.name, User.email]
 
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        user_cache.invalidate(model.email)
+
+    async def after_model_delete(self, model, request) -> None:
+        user_cache.invalidate(model.email)
+
 
 class StylesAdmin(ModelView, model=Styles):  # type: ignore
     column_list = [
@@ -70,6 +85,12 @@ class StylesAdmin(ModelView, model=Styles):  # type: ignore
     ]
     column_searchable_list = [Styles.name, Styles.category]
 
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        styles_catalog.invalidate()
+
+    async def after_model_delete(self, model, request) -> None:
+        styles_catalog.invalidate()
+
 
 class GeneratedImageAdmin(ModelView, model=GeneratedImage):  # type: ignore
     column_list = [
@@ -94,6 +115,31 @@ class GeneratedImageAdmin(ModelView, model=GeneratedImage):  # type: ignore
     column_default_sort = (GeneratedImage.created_at, True)
 
 
+class GenerationJobAdmin(ModelView, model=GenerationJob):  # type: ignore
+    # jobs are written by the queue only
+    can_create = False
+    can_edit = False
+
+    column_list = [
+        GenerationJob.id,
+        GenerationJob.image_id,
+        GenerationJob.kind,
+        GenerationJob.view,
+        GenerationJob.status,
+        GenerationJob.attempts,
+        GenerationJob.created_at,
+        GenerationJob.finished_at,
+        GenerationJob.stage_ms,
+        GenerationJob.last_error,
+    ]
+    column_sortable_list = [
+        GenerationJob.id,
+        GenerationJob.created_at,
+        GenerationJob.status,
+    ]
+    column_default_sort = (GenerationJob.id, True)
+
+
 class BlackListTokensAdmin(ModelView, model=BlackListTokens):  # type: ignore
     column_list = [
         BlackListTokens.id,
@@ -126,6 +172,7 @@ admin_views = [
     UserAdmin,
     StylesAdmin,
     GeneratedImageAdmin,
+    GenerationJobAdmin,
     BlackListTokensAdmin,
     TransactionAdmin,
 ]
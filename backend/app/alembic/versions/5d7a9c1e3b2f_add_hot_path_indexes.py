@@ -0,0 +1,79 @@
+"""add hot path indexes
+
+Revision ID: 5d7a9c1e3b2f
+Revises: 8b2e4f6a1c3d
+Create Date: 2025-12-13 11:20:37.418203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7a9c1e3b2f"
+down_revision: Union[str, Sequence[str], None] = "8b2e4f6a1c3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# name, table, columns, partial index predicate per dialect
+INDEXES = [
+    (
+        "ix_generated_images_user_id_created_at",
+        "generated_images",
+        ["user_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_generated_images_user_id_liked",
+        "generated_images",
+        ["user_id", "created_at", "id"],
+        {"postgresql": "liked IS TRUE", "sqlite": "liked IS 1"},
+    ),
+    ("ix_transactions_session_id", "transactions", ["session_id"], None),
+    (
+        "ix_transactions_payment_id",
+        "transactions",
+        ["payment_id"],
+        {"postgresql": "payment_id IS NOT NULL", "sqlite": "payment_id IS NOT NULL"},
+    ),
+    (
+        "ix_transactions_user_id_status_created_at",
+        "transactions",
+        ["user_id", "status", "created_at", "id"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while Postgres builds the
+    # indexes, it cannot run inside a transaction. An interrupted build
+    # leaves an INVALID index behind, drop it before running this again
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where["postgresql"]) if where else None,
+                sqlite_where=sa.text(where["sqlite"]) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,32 @@
+"""add views job kind
+
+Revision ID: 8b2e4f6a1c3d
+Revises: 3f1b7c2d9a4e
+Create Date: 2025-12-09 18:40:02.551930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b2e4f6a1c3d"
+down_revision: Union[str, Sequence[str], None] = "3f1b7c2d9a4e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite stores enums as plain strings, only Postgres has a type to extend
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE jobkind ADD VALUE IF NOT EXISTS 'VIEWS'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop a value from an enum type, VIEWS jobs are
+    # simply no longer produced after a downgrade
+    pass
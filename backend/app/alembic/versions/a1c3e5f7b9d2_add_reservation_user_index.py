@@ -0,0 +1,35 @@
+"""add reservation user index
+
+Revision ID: a1c3e5f7b9d2
+Revises: f3a5b7c9d1e2
+Create Date: 2025-12-17 09:12:44.803527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a1c3e5f7b9d2"
+down_revision: Union[str, Sequence[str], None] = "f3a5b7c9d1e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # serves the per-user in-flight check of admission control
+    op.create_index(
+        "ix_credit_reservations_user_id_status",
+        "credit_reservations",
+        ["user_id", "status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_credit_reservations_user_id_status", table_name="credit_reservations"
+    )
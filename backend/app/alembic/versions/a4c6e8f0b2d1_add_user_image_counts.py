@@ -0,0 +1,49 @@
+"""add user image counts
+
+Revision ID: a4c6e8f0b2d1
+Revises: 5d7a9c1e3b2f
+Create Date: 2025-12-13 16:05:12.730514
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c6e8f0b2d1"
+down_revision: Union[str, Sequence[str], None] = "5d7a9c1e3b2f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_image_counts",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("favourites", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # backfill from the existing images, `python repair_counts.py` does the
+    # same on a live database
+    op.execute(
+        """
+        INSERT INTO user_image_counts (user_id, total, favourites, completed)
+        SELECT user_id,
+               COUNT(id),
+               SUM(CASE WHEN liked IS TRUE THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END)
+        FROM generated_images
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_image_counts")
@@ -0,0 +1,63 @@
+"""add generation rollups
+
+Revision ID: a7c9e1f3b5d8
+Revises: f6b8d0e2a4c7
+Create Date: 2025-12-23 10:17:45.903128
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c9e1f3b5d8"
+down_revision: Union[str, Sequence[str], None] = "f6b8d0e2a4c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("style_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            # the type already exists for generated_images
+            postgresql.ENUM(
+                "PENDING",
+                "PROCESSING",
+                "COMPLETED",
+                "FAILED",
+                name="imagestatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("images", sa.Integer(), nullable=False),
+        sa.Column("liked", sa.Integer(), nullable=False),
+        sa.Column("timed", sa.Integer(), nullable=False),
+        sa.Column("time_sum", sa.Float(), nullable=False),
+        sa.Column("time_min", sa.Float(), nullable=True),
+        sa.Column("time_max", sa.Float(), nullable=True),
+        sa.Column("time_histogram", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(["style_id"], ["styles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "style_id", "status"),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rollup_watermarks")
+    op.drop_table("generation_rollups")
@@ -0,0 +1,70 @@
+"""add generation flights and idempotency keys
+
+Revision ID: c3e5a7b9d1f4
+Revises: b2d4f6a8c0e3
+Create Date: 2025-12-20 16:22:37.940115
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e5a7b9d1f4"
+down_revision: Union[str, Sequence[str], None] = "b2d4f6a8c0e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_flights",
+        sa.Column("flight_key", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("image_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["image_id"], ["generated_images.id"]),
+        sa.PrimaryKeyConstraint("flight_key"),
+    )
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("response", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_idempotency_keys_user_id_key",
+        "idempotency_keys",
+        ["user_id", "key"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_idempotency_keys_created_at",
+        "idempotency_keys",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_generation_jobs_image_id_status",
+        "generation_jobs",
+        ["image_id", "status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_generation_jobs_image_id_status", table_name="generation_jobs")
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_index("ix_idempotency_keys_user_id_key", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
+    op.drop_table("generation_flights")
@@ -0,0 +1,54 @@
+"""add user uploads
+
+Revision ID: c7e9a1b3d5f2
+Revises: a4c6e8f0b2d1
+Create Date: 2025-12-14 09:42:51.118306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e9a1b3d5f2"
+down_revision: Union[str, Sequence[str], None] = "a4c6e8f0b2d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_uploads",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("input_image_url", sa.String(), nullable=False),
+        sa.Column("use_count", sa.Integer(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "input_image_url", name="uq_user_uploads_url"),
+    )
+    op.create_index(
+        "ix_user_uploads_user_id_last_used_at",
+        "user_uploads",
+        ["user_id", "last_used_at", "id"],
+        unique=False,
+    )
+    # one row per distinct input image of the existing history
+    op.execute(
+        """
+        INSERT INTO user_uploads (user_id, input_image_url, use_count, last_used_at)
+        SELECT user_id, input_image_url, COUNT(id), MAX(created_at)
+        FROM generated_images
+        GROUP BY user_id, input_image_url
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_uploads_user_id_last_used_at", table_name="user_uploads")
+    op.drop_table("user_uploads")
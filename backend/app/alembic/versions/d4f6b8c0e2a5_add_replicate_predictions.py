@@ -0,0 +1,69 @@
+"""add replicate predictions
+
+Revision ID: d4f6b8c0e2a5
+Revises: c3e5a7b9d1f4
+Create Date: 2025-12-21 11:08:52.317604
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f6b8c0e2a5"
+down_revision: Union[str, Sequence[str], None] = "c3e5a7b9d1f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "replicate_predictions",
+        sa.Column("id", sa.String(length=64), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("view", sa.String(length=10), nullable=True),
+        sa.Column("cache_key", sa.String(length=64), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "COMPLETING",
+                "SUCCEEDED",
+                "FAILED",
+                "CACHED",
+                "ABANDONED",
+                name="predictionstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["generation_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_replicate_predictions_job_id",
+        "replicate_predictions",
+        ["job_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_replicate_predictions_status_created_at",
+        "replicate_predictions",
+        ["status", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_replicate_predictions_status_created_at",
+        table_name="replicate_predictions",
+    )
+    op.drop_index("ix_replicate_predictions_job_id", table_name="replicate_predictions")
+    op.drop_table("replicate_predictions")
+    sa.Enum(name="predictionstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,46 @@
+"""add blacklist token expiry
+
+Revision ID: e2f4a6b8c0d1
+Revises: c7e9a1b3d5f2
+Create Date: 2025-12-15 10:08:14.602931
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f4a6b8c0d1"
+down_revision: Union[str, Sequence[str], None] = "c7e9a1b3d5f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing rows keep a NULL expiry, they are purged once the longest
+    # token lifetime has passed since they were blacklisted
+    op.add_column(
+        "blacklist_tokens", sa.Column("expires_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index(
+        "ix_blacklist_tokens_blacklisted_on",
+        "blacklist_tokens",
+        ["blacklisted_on"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_blacklist_tokens_expires_at",
+        "blacklist_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_blacklist_tokens_expires_at", table_name="blacklist_tokens")
+    op.drop_index("ix_blacklist_tokens_blacklisted_on", table_name="blacklist_tokens")
+    op.drop_column("blacklist_tokens", "expires_at")
@@ -0,0 +1,42 @@
+"""add generated images status index
+
+Revision ID: e5a7c9d1f3b6
+Revises: d4f6b8c0e2a5
+Create Date: 2025-12-22 09:41:16.582903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a7c9d1f3b6"
+down_revision: Union[str, Sequence[str], None] = "d4f6b8c0e2a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built CONCURRENTLY so generated_images stays writable, see 5d7a9c1e3b2f
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_generated_images_status_created_at",
+            "generated_images",
+            ["status", "created_at"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_generated_images_status_created_at",
+            table_name="generated_images",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
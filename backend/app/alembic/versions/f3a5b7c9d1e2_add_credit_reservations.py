@@ -0,0 +1,76 @@
+"""add credit reservations
+
+Revision ID: f3a5b7c9d1e2
+Revises: e2f4a6b8c0d1
+Create Date: 2025-12-16 14:31:06.275190
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a5b7c9d1e2"
+down_revision: Union[str, Sequence[str], None] = "e2f4a6b8c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "credit_reservations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("image_id", sa.Integer(), nullable=False),
+        sa.Column("credits", sa.Integer(), nullable=False),
+        sa.Column("held", sa.Integer(), nullable=False),
+        sa.Column("charged", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("HELD", "SETTLED", name="reservationstatus"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("settled_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["image_id"], ["generated_images.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_credit_reservations_status_created_at",
+        "credit_reservations",
+        ["status", "created_at"],
+        unique=False,
+    )
+    # jobs queued before this revision hold no credits and are not charged
+    with op.batch_alter_table("generation_jobs") as batch_op:
+        batch_op.add_column(
+            sa.Column("reservation_id", sa.Integer(), nullable=True),
+        )
+        batch_op.add_column(
+            sa.Column("credits", sa.Integer(), nullable=False, server_default="0"),
+        )
+        batch_op.create_foreign_key(
+            "fk_generation_jobs_reservation_id",
+            "credit_reservations",
+            ["reservation_id"],
+            ["id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("generation_jobs") as batch_op:
+        batch_op.drop_constraint(
+            "fk_generation_jobs_reservation_id", type_="foreignkey"
+        )
+        batch_op.drop_column("credits")
+        batch_op.drop_column("reservation_id")
+    op.drop_index(
+        "ix_credit_reservations_status_created_at", table_name="credit_reservations"
+    )
+    op.drop_table("credit_reservations")
+    sa.Enum(name="reservationstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""add generation job stage timings
+
+Revision ID: f6b8d0e2a4c7
+Revises: e5a7c9d1f3b6
+Create Date: 2025-12-22 14:08:37.215640
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6b8d0e2a4c7"
+down_revision: Union[str, Sequence[str], None] = "e5a7c9d1f3b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("generation_jobs", sa.Column("stage_ms", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("generation_jobs", "stage_ms")
@@ -9,15 +9,21 @@ Routes included:
 - /api/v1/files/*: File upload and management endpoints
 - /api/v1/image/*: Image processing and management endpoints
 - /api/v1/payment/*: Payment endpoints
+- /api/v1/replicate/*: Replicate webhook endpoint
+- /api/v1/system/*: Operational endpoints for administrators
+- /api/v1/analytics/*: Generation analytics for administrators
 """
 
 from fastapi import APIRouter
 
 from .v1 import (
+    analytics_router,
     auth_router,
     files_upload_router,
     image_router,
     payment_router,
+    replicate_router,
+    system_router,
     user_router,
 )
 
@@ -28,3 +34,6 @@ router.include_router(user_router)
 router.include_router(files_upload_router)
 router.include_router(image_router)
 router.include_router(payment_router)
+router.include_router(replicate_router)
+router.include_router(system_router)
+router.include_router(analytics_router)
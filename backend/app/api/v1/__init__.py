@@ -1,7 +1,10 @@
+from .analytics import router as analytics_router
 from .auth import router as auth_router
 from .files_upload import router as files_upload_router
 from .image import router as image_router
 from .payment import router as payment_router
+from .replicate import router as replicate_router
+from .system import router as system_router
 from .user import router as user_router
 
 __all__ = [
@@ -10,4 +13,7 @@ __all__ = [
     "files_upload_router",
     "image_router",
     "payment_router",
+    "replicate_router",
+    "system_router",
+    "analytics_router",
 ]
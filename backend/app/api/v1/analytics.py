@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: analytics.py
+Author: Maria Kevin
+Created: 2025-12-23
+Description: Generation analytics for administrators
+
+Routes included:
+- GET /analytics/styles: Outcomes, like rate and time taken per style (admin session required)
+- GET /analytics/daily: Outcomes, like rate and time taken per day (admin session required)
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+from typing import Optional
+
+from core.dependencies import AdminOnly
+from db import AsyncSession, get_async_db
+from fastapi import APIRouter, Depends, Query
+from schemas import DailyAnalyticsResponse, StyleAnalyticsResponse
+from services import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[AdminOnly])
+
+
+@router.get("/styles", response_model=StyleAnalyticsResponse)
+async def get_style_analytics(
+    days: int = Query(7, ge=1, le=366),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Report generations per style over the trailing days.
+
+    Args:
+        days (int): Number of days, today included.
+        db (AsyncSession): Session used to read the rollups.
+
+    Returns:
+        StyleAnalyticsResponse: Counts, failure and like rates and time taken
+            per style, read from the daily rollups.
+    """
+    return await AnalyticsService(db).get_style_analytics(days)
+
+
+@router.get("/daily", response_model=DailyAnalyticsResponse)
+async def get_daily_analytics(
+    days: int = Query(30, ge=1, le=366),
+    style_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Report generations per day over the trailing days.
+
+    Args:
+        days (int): Number of days, today included.
+        style_id (Optional[int]): Only count this style.
+        db (AsyncSession): Session used to read the rollups.
+
+    Returns:
+        DailyAnalyticsResponse: Counts, failure and like rates and time taken
+            per day, read from the daily rollups.
+    """
+    return await AnalyticsService(db).get_daily_analytics(days, style_id=style_id)
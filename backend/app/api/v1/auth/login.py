@@ -26,6 +26,7 @@ from schemas import (
     VerifyLoginRequest,
     VerifyLoginResponse,
 )
+from services import BlacklistTokenService
 
 router = APIRouter()
 
@@ -96,8 +97,8 @@ async def verify_login(
     user = auth_service.verify_login(payload.token, payload.code)
 
     # blacklist the signup token after successful verification
-    auth_service.token_repository.blacklist_token(
-        token, token_type=TokenType.LOGIN_VERIFY
+    BlacklistTokenService(auth_service.db).blacklist_token(
+        token, TokenType.LOGIN_VERIFY
     )
 
     logged_in_user = auth_service.login_user(
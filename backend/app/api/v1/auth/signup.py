@@ -23,6 +23,7 @@ from schemas import (
     VerifySignupRequest,
     VerifySignupResponse,
 )
+from services import BlacklistTokenService
 
 router = APIRouter()
 
@@ -135,8 +136,8 @@ async def verify_signup(
     user = auth_service.verify_signup(payload.token, payload.code)
 
     # blacklist the signup token after successful verification
-    auth_service.token_repository.blacklist_token(
-        token, token_type=TokenType.SIGNUP_VERIFY
+    BlacklistTokenService(auth_service.db).blacklist_token(
+        token, TokenType.SIGNUP_VERIFY
     )
 
     logged_in_user = auth_service.login_user(
@@ -38,6 +38,6 @@ async def get_presigned_url(
 
     # we need to append a user-specific folder to avoid name collisions
     file_name = f"user_{current_user.id}/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{file_name}"
-    return ImageUploadService.generate_presigned_url(
+    return await ImageUploadService.generate_presigned_url(
         file_path=file_name, file_type=file_type
     )
@@ -4,16 +4,19 @@ image.py
 Handles image generation workflow:
 - /image/generate : initiate image generation
 - /image/status/{image_id} : retrieve generation status
-- /image/styles : list available styles
+- /image/status/{image_id}/stream : push status changes as Server-Sent Events
+- /image/styles : list available styles, cached with ETag revalidation
 """
 
-from typing import List
+from typing import List, Optional
 
+from core.config import settings
 from core.dependencies import get_current_user
-from core.exceptions import ImageNotFoundException, NotEnoughCreditsException
+from core.exceptions import ImageNotFoundException
 from core.ratelimiting import limiter
-from db import get_db
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from db import get_async_db
+from fastapi import APIRouter, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from models import User
 from schemas import (
     ImageGenRequest,
@@ -22,7 +25,8 @@ from schemas import (
     StylesResponse,
     ViewImageRequest,
 )
-from services import ImageGenService
+from services import AsyncImageGenService, GenerationRequestService
+from utils import etag_matches
 
 router = APIRouter(prefix="/image", tags=["image"])
 
@@ -30,22 +34,31 @@ router = APIRouter(prefix="/image", tags=["image"])
 @router.post(
     "/generate",
     response_model=ImageGenResponse,
-    responses={402: {"description": "Not enough credits"}},
+    responses={
+        402: {"description": "Not enough credits"},
+        422: {"description": "Idempotency-Key reused for another request"},
+    },
 )
 @limiter.limit("5/minute")
 async def generate_image(
     request: Request,  # required by ratelimiting lib
+    response: Response,  # receives the RateLimit-* headers
     data: ImageGenRequest,
-    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: User = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> ImageGenResponse:
     """
     Initiate an image generation request.
 
+    A repeated request with the same Idempotency-Key replays the original
+    response, and a request identical to one still in progress joins it,
+    so neither is queued or charged twice.
+
     Args:
         data (ImageGenRequest): User input including style ID and input image URL.
-        background_tasks (BackgroundTasks): FastAPI background task handler.
+        response (Response): Response the rate limit headers are written to.
+        idempotency_key (Optional[str]): Client key identifying the request.
         current_user (User): Authenticated user via dependency.
         db: Database session.
 
@@ -54,46 +67,47 @@ async def generate_image(
 
     Raises:
         NotEnoughCreditsException: If user has not enough credits.
+        IdempotencyKeyMismatchException: If the key was used for another request.
         HTTPException: If database record creation fails.
     """
-
-    if current_user.credits < 1:
-        raise NotEnoughCreditsException()
-
-    service = ImageGenService(db=db)
-
-    image = service.create_image_generation_record(
+    result, replayed = await GenerationRequestService(db=db).generate_image(
+        user_id=current_user.id,
         style_id=data.style_id,
         input_image_url=str(data.image_input_url),
-        user_id=current_user.id,
-    )
-
-    background_tasks.add_task(service.start_image_generation, image)
-
-    return ImageGenResponse(
-        image_id=image.id, message="Image generation started successfully."
+        idempotency_key=idempotency_key,
     )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 
 @router.post(
     "/view-generate",
     response_model=ImageGenResponse,
-    responses={402: {"description": "Not enough credits"}},
+    responses={
+        402: {"description": "Not enough credits"},
+        422: {"description": "Idempotency-Key reused for another request"},
+    },
 )
 @limiter.limit("5/minute")
 async def generate_view_images(
     request: Request,  # required by ratelimiting lib
+    response: Response,  # receives the RateLimit-* headers
     data: ViewImageRequest,
-    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: User = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> ImageGenResponse:
     """
     Initiate an view image generation request.
 
+    Idempotency-Key replays and joining of in-progress views work as for
+    /image/generate.
+
     Args:
         data (ImageGenRequest): User input including style ID and input image URL.
-        background_tasks (BackgroundTasks): FastAPI background task handler.
+        response (Response): Response the rate limit headers are written to.
+        idempotency_key (Optional[str]): Client key identifying the request.
         current_user (User): Authenticated user via dependency.
         db: Database session.
 
@@ -102,24 +116,23 @@ async def generate_view_images(
 
     Raises:
         NotEnoughCreditsException: If user has not enough credits.
+        IdempotencyKeyMismatchException: If the key was used for another request.
         HTTPException: If database record creation fails.
     """
-
-    if current_user.credits < 3:
-        raise NotEnoughCreditsException()
-
-    service = ImageGenService(db=db)
-    image = service.get_image_record(image_id=data.image_id, user_id=current_user.id)
+    service = AsyncImageGenService(db=db)
+    image = await service.get_image_record(
+        image_id=data.image_id, user_id=current_user.id
+    )
 
     if not image:
         raise ImageNotFoundException()
 
-    for view in ("right", "left", "back"):
-        background_tasks.add_task(service.start_image_generation, image, view)
-
-    return ImageGenResponse(
-        image_id=image.id, message="Image generation started successfully."
+    result, replayed = await GenerationRequestService(db=db).generate_views(
+        user_id=current_user.id, image=image, idempotency_key=idempotency_key
     )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 
 @router.get(
@@ -130,7 +143,7 @@ async def generate_view_images(
 async def get_image_status(
     image_id: int,
     current_user: User = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> ImageGenStatusResponse:
     """
     Retrieve image generation status and results.
@@ -146,8 +159,10 @@ async def get_image_status(
     Raises:
         HTTPException: If image not found or doesn't belong to user.
     """
-    service = ImageGenService(db=db)
-    image_record = service.get_image_record(image_id=image_id, user_id=current_user.id)
+    service = AsyncImageGenService(db=db)
+    image_record = await service.get_image_record(
+        image_id=image_id, user_id=current_user.id
+    )
 
     if not image_record:
         raise ImageNotFoundException()
@@ -155,30 +170,99 @@ async def get_image_status(
     return image_record
 
 
-@router.get("/styles", response_model=List[StylesResponse])
+@router.get(
+    "/status/{image_id}/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        404: {"description": "Image not found"},
+    },
+)
+async def stream_image_status(
+    image_id: int,
+    wait_for_views: bool = False,
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_async_db),
+) -> StreamingResponse:
+    """
+    Stream image generation status changes instead of polling.
+
+    Sends a ``status`` event with the current state, then one per
+    transition (PENDING, PROCESSING, each side view, COMPLETED or FAILED)
+    and closes once the image is done.
+
+    Args:
+        image_id (int): ID of the image generation record.
+        wait_for_views (bool): Stay open until the side views are done.
+        current_user (User): Authenticated user via dependency.
+        db: Database session, used for the ownership check only.
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` of ImageGenStatusResponse.
+
+    Raises:
+        HTTPException: If image not found or doesn't belong to user.
+    """
+    service = AsyncImageGenService(db=db)
+    image_record = await service.get_image_record(
+        image_id=image_id, user_id=current_user.id
+    )
+
+    if not image_record:
+        raise ImageNotFoundException()
+
+    # give the connection back to the pool before the long-lived stream
+    await db.close()
+
+    return StreamingResponse(
+        service.stream_status(image_id, current_user.id, wait_for_views),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/styles",
+    response_model=List[StylesResponse],
+    responses={304: {"description": "Catalog unchanged since the given ETag"}},
+)
 async def get_image_styles(
-    db=Depends(get_db),
-) -> List[StylesResponse]:
+    request: Request,
+    db=Depends(get_async_db),
+) -> Response:
     """
     Retrieve all available hairstyles.
 
+    The catalog is served from memory with a strong ETag, clients sending
+    it back in If-None-Match get 304 Not Modified without a body.
+
     Args:
-        current_user (User): Authenticated user via dependency.
-        db: Database session.
+        request (Request): Incoming request carrying If-None-Match.
+        db: Database session, used only when the catalog is reloaded.
 
     Returns:
-        List[StylesResponse]: List of available styles with metadata.
+        Response: Styles JSON, or an empty 304 response.
     """
-    service = ImageGenService(db=db)
-    styles = service.get_available_styles()
-    return styles  # type: ignore
+    service = AsyncImageGenService(db=db)
+    catalog = await service.get_available_styles()
+    headers = {
+        "ETag": catalog.etag,
+        "Cache-Control": f"public, max-age={settings.STYLES_CACHE_MAX_AGE_SECONDS}",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=catalog.body, media_type="application/json", headers=headers
+    )
 
 
 @router.post("/like/{image_id}")
 async def like_image(
     image_id: int,
     current_user: User = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> dict:
     """
     Like an image generation record.
@@ -194,8 +278,8 @@ async def like_image(
     Raises:
         HTTPException: If image not found or doesn't belong to user.
     """
-    service = ImageGenService(db=db)
-    result = service.like_image(image_id=image_id, user_id=current_user.id)
+    service = AsyncImageGenService(db=db)
+    result = await service.like_image(image_id=image_id, user_id=current_user.id)
     return {"liked": result}
 
 
@@ -203,7 +287,7 @@ async def like_image(
 async def dislike_image(
     image_id: int,
     current_user: User = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> dict:
     """
     Dislike an image generation record.
@@ -219,6 +303,6 @@ async def dislike_image(
     Raises:
         HTTPException: If image not found or doesn't belong to user.
     """
-    service = ImageGenService(db=db)
-    result = service.dislike_image(image_id=image_id, user_id=current_user.id)
+    service = AsyncImageGenService(db=db)
+    result = await service.dislike_image(image_id=image_id, user_id=current_user.id)
     return {"disliked": result}
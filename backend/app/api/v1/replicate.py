@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: replicate.py
+Author: Maria Kevin
+Created: 2025-12-21
+Description: Replicate webhook endpoint
+
+Routes included:
+- POST /replicate/webhook: Completion of a prediction created in webhook mode
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import asyncio
+import json
+
+from core.exceptions import InvalidWebhookException, PredictionNotFoundException
+from core.ratelimiting import limiter
+from db import SessionLocal
+from fastapi import APIRouter, Request, Response
+from services import ImageGenService, replicate_client
+
+router = APIRouter(prefix="/replicate", tags=["Replicate"])
+
+
+@router.post("/webhook", include_in_schema=False)
+@limiter.exempt
+async def replicate_webhook_handler(request: Request):
+    """
+    Store the output of a completed prediction and finish its job.
+
+    The completion runs its queries in worker threads on a session of its
+    own, so a burst of webhooks never blocks the event loop.
+    """
+    body = (await request.body()).decode()
+    if not replicate_client.verify_webhook(request.headers, body):
+        raise InvalidWebhookException()
+
+    payload = json.loads(body)
+    if payload.get("status") not in ("succeeded", "failed", "canceled"):
+        # only completions are subscribed to, anything else needs no work
+        return Response(status_code=200)
+
+    db = SessionLocal()
+    try:
+        known = await ImageGenService(db).complete_prediction(payload)
+    finally:
+        await asyncio.to_thread(db.close)
+    if not known:
+        # the prediction may not be recorded yet, Replicate delivers again
+        raise PredictionNotFoundException()
+    return Response(status_code=200)
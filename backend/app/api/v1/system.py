@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: system.py
+Author: Maria Kevin
+Created: 2025-12-10
+Description: Operational endpoints for administrators
+
+Routes included:
+- GET /system/stats: Connection pool, upload, cache, event, token revocation, rate limit, Replicate, generation cache, queue, stage latency, reaper and analytics rollup statistics (admin session required)
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+from core.cache import user_cache
+from core.dependencies import AdminOnly, HttpClientsDep
+from core.events import event_broker
+from core.ratelimiting import limiter
+from core.stage_timings import summarize_stages
+from core.storage import s3_client
+from db import ENGINES, AsyncSession, get_async_db, pool_stats
+from fastapi import APIRouter, Depends
+from repository import AsyncJobRepository
+from services import (
+    generation_cache,
+    generation_rollups,
+    job_reaper,
+    replicate_client,
+    revocation_store,
+)
+
+router = APIRouter(prefix="/system", tags=["system"], dependencies=[AdminOnly])
+
+# finished jobs the stage latency summary is computed over
+STAGE_SAMPLE_SIZE = 500
+
+
+@router.get("/stats")
+async def get_system_stats(
+    http_clients: HttpClientsDep, db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    """
+    Report live connection pool statistics of the process.
+
+    Args:
+        http_clients (HttpClientRegistry): Shared outbound HTTP clients.
+        db (AsyncSession): Session used to read the generation queue backlog
+            and the stage timings of recent jobs.
+
+    Returns:
+        dict: Pool statistics grouped by subsystem.
+    """
+    job_repository = AsyncJobRepository(db)
+    return {
+        "db": {name: pool_stats(engine) for name, engine in ENGINES.items()},
+        "http": http_clients.stats(),
+        "s3": s3_client.stats(),
+        "user_cache": user_cache.stats(),
+        "events": event_broker.stats(),
+        "token_revocation": revocation_store.stats(),
+        "rate_limit": limiter.stats(),
+        "replicate": replicate_client.stats(),
+        "generation_cache": generation_cache.stats(),
+        "generation_queue": await job_repository.get_queue_stats(),
+        "generation_stages": summarize_stages(
+            await job_repository.get_recent_stages(STAGE_SAMPLE_SIZE)
+        ),
+        "job_reaper": job_reaper.stats(),
+        "analytics_rollups": generation_rollups.stats(),
+    }
@@ -7,14 +7,15 @@ Routes included:
 - GET /user/me: Retrieve current authenticated user profile
 """
 
-from typing import List
+from typing import Annotated, List, Optional
 
+from core.config import settings
 from core.dependencies import get_current_user
-from db import get_db
-from fastapi import APIRouter, Depends
+from db import get_async_db
+from fastapi import APIRouter, Depends, Query, Response
 from pydantic import HttpUrl
 from schemas import UserBase, UserImagesResponse
-from services import ImageGenService
+from services import AsyncImageGenService
 
 router = APIRouter(prefix="/user", tags=["user"])
 
@@ -33,14 +34,20 @@ async def read_current_user(current_user=Depends(get_current_user)) -> UserBase:
     return current_user
 
 
-@router.get("/images", response_model=UserImagesResponse)
+@router.get(
+    "/images",
+    response_model=UserImagesResponse,
+    responses={400: {"description": "Invalid cursor"}},
+)
 async def get_user_images(
     favourites: bool = False,
     page: int = 1,
     limit: int = 10,
     sort_desc: bool = True,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     current_user: UserBase = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> UserImagesResponse:
     """
     Retrieve user's generated images.
@@ -49,38 +56,62 @@ async def get_user_images(
         favourites (bool): If True, fetch only favourite images. Defaults to False.
         page (int): Page number for pagination. Defaults to 1.
         limit (int): Number of images per page. Defaults to 10.
+        cursor (Optional[str]): ``next_cursor`` of the previous page, used
+            instead of page when given.
+        include_total (bool): Whether to return total_images. Defaults to True.
         current_user (User): Authenticated user via dependency.
         db: Database session.
     """
-    service = ImageGenService(db=db)
-    images = service.get_images_by_user_id(
+    service = AsyncImageGenService(db=db)
+    images = await service.get_images_by_user_id(
         user_id=current_user.id,
         page=page,
         limit=limit,
         sort_desc=sort_desc,
         favourites=favourites,
+        cursor=cursor,
+        include_total=include_total,
     )
     return images
 
 
-@router.get("/uploads", response_model=List[HttpUrl])
+@router.get(
+    "/uploads",
+    response_model=List[HttpUrl],
+    responses={400: {"description": "Invalid cursor"}},
+)
 async def get_user_uploads(
+    response: Response,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.UPLOADS_MAX_LIMIT)
+    ] = settings.UPLOADS_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
     current_user: UserBase = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_async_db),
 ) -> List[HttpUrl]:
     """
-    Retrieve URLs of user's uploaded images.
+    Retrieve URLs of user's uploaded images, most recently used first.
+
+    When more uploads follow, the ``X-Next-Cursor`` response header holds
+    the cursor of the next page.
 
     Args:
+        response (Response): Response carrying the next page cursor.
+        limit (int): Number of uploads per page.
+        cursor (Optional[str]): ``X-Next-Cursor`` of the previous page.
         current_user (User): Authenticated user via dependency.
         db: Database session.
 
     Returns:
         List[HttpUrl]: List of URLs of uploaded images.
     """
-    service = ImageGenService(db=db)
-    uploads = service.get_user_input_images(user_id=current_user.id)
-    return uploads
+    service = AsyncImageGenService(db=db)
+    uploads = await service.get_user_input_images(
+        user_id=current_user.id, limit=limit, cursor=cursor
+    )
+    if uploads.next_cursor:
+        response.headers["X-Next-Cursor"] = uploads.next_cursor
+    return uploads.uploads
 
 
 # get credits
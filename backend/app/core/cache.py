@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: cache.py
+Author: Maria Kevin
+Created: 2025-12-12
+Description: In-process LRU cache, optional Redis backend and the user cache
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import logfire
+from core.config import settings
+from loguru import logger
+from models import User
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+user_cache_lookups = logfire.metric_counter(
+    "user_cache.lookups", description="Authenticated user lookups by cache result"
+)
+
+_redis: Optional[Redis] = None
+_sync_redis: Optional[SyncRedis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    Shared Redis client, created on first use.
+
+    Returns:
+        Optional[Redis]: The client, or None when REDIS_URL is not set.
+    """
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def get_sync_redis() -> Optional[SyncRedis]:
+    """
+    Blocking Redis client for code running outside an event loop.
+
+    Returns:
+        Optional[SyncRedis]: The client, or None when REDIS_URL is not set.
+    """
+    global _sync_redis
+    if _sync_redis is None and settings.REDIS_URL:
+        _sync_redis = SyncRedis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _sync_redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis clients and their connection pools."""
+    global _redis, _sync_redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if _sync_redis is not None:
+        _sync_redis.close()
+        _sync_redis = None
+
+
+class MemoryCache:
+    """Bounded least-recently-used cache whose entries expire after a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """JSON values in the shared Redis, namespaced by a key prefix."""
+
+    def __init__(self, client: Redis, prefix: str):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        await self.client.set(
+            self.prefix + key, json.dumps(value), px=int(ttl_seconds * 1000)
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    def delete_sync(self, key: str) -> None:
+        """Delete a key with the blocking client, for worker threads."""
+        client = get_sync_redis()
+        if client is not None:
+            client.delete(self.prefix + key)
+
+
+class UserCache:
+    """
+    Short-lived snapshots of authenticated users keyed by token subject.
+
+    Lookups hit the in-process LRU first, then Redis when REDIS_URL is
+    set. With Redis the local layer uses a shorter TTL so a write on one
+    worker is seen by the others within USER_CACHE_LOCAL_TTL_SECONDS.
+    Cached users are transient User objects carrying profile, credit and
+    verification fields only, they are not attached to any session.
+    """
+
+    FIELDS = ("id", "name", "email", "userpic", "verified", "credits")
+
+    def __init__(self):
+        self.local = MemoryCache(
+            max_entries=settings.USER_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+        )
+        self._hits = 0
+        self._misses = 0
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.USER_CACHE_TTL_SECONDS > 0
+
+    @property
+    def shared(self) -> Optional[RedisCache]:
+        client = get_redis()
+        return RedisCache(client, prefix="user:") if client else None
+
+    def _local_ttl(self) -> float:
+        if self.shared is None:
+            return settings.USER_CACHE_TTL_SECONDS
+        return min(
+            settings.USER_CACHE_LOCAL_TTL_SECONDS, settings.USER_CACHE_TTL_SECONDS
+        )
+
+    async def get(self, email: str) -> Optional[User]:
+        """
+        Look up a cached user.
+
+        Args:
+            email (str): Token subject of the user.
+
+        Returns:
+            Optional[User]: Transient user snapshot, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        values = self.local.get(email)
+        if values is None and (shared := self.shared) is not None:
+            try:
+                values = await shared.get(email)
+            except Exception as e:
+                logger.warning(f"Shared user cache read failed: {e}")
+            if values is not None:
+                self.local.set(email, values, ttl_seconds=self._local_ttl())
+
+        if values is None:
+            self._misses += 1
+            user_cache_lookups.add(1, {"result": "miss"})
+            return None
+
+        self._hits += 1
+        user_cache_lookups.add(1, {"result": "hit"})
+        return User(**values)
+
+    async def set(self, user: User) -> None:
+        """
+        Store a snapshot of a user loaded from the database.
+
+        Args:
+            user (User): The user to cache.
+        """
+        if not self.enabled:
+            return
+
+        values = {field: getattr(user, field) for field in self.FIELDS}
+        self.local.set(user.email, values, ttl_seconds=self._local_ttl())
+        if (shared := self.shared) is not None:
+            try:
+                await shared.set(user.email, values, settings.USER_CACHE_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Shared user cache write failed: {e}")
+
+    def invalidate(self, email: str) -> None:
+        """
+        Drop a user from the cache after a write to their row.
+
+        Safe to call from synchronous repository code. The shared entry is
+        deleted in the background when an event loop is running, and with a
+        blocking client from worker threads and other code outside a loop,
+        e.g. settlements committed through asyncio.to_thread.
+
+        Args:
+            email (str): Token subject of the user.
+        """
+        self.local.delete(email)
+        if (shared := self.shared) is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                shared.delete_sync(email)
+            except Exception as e:
+                logger.warning(f"Shared user cache invalidation failed: {e}")
+            return
+        task = loop.create_task(self._delete_shared(shared, email))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @staticmethod
+    async def _delete_shared(shared: RedisCache, email: str) -> None:
+        try:
+            await shared.delete(email)
+        except Exception as e:
+            logger.warning(f"Shared user cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        User cache statistics of the process.
+
+        Returns:
+            dict: Local entry count, hit and miss totals and the backend.
+        """
+        return {
+            "entries": len(self.local),
+            "hits": self._hits,
+            "misses": self._misses,
+            "backend": "redis" if self.shared else "memory",
+        }
+
+
+user_cache = UserCache()
@@ -21,6 +21,19 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str = "sqlite:///./app/instance/test.db"
 
+    # Database engine, pool settings apply to the sync and async engine each
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # PostgreSQL only, 0 disables the timeout
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # SQLite only, applied on every new connection
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "MEMORY"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     # Other
     FREE_USER_CREDITS: int = 3
     PORT: int = 8000
@@ -48,13 +61,81 @@ class Settings(BaseSettings):
     AWS_REGION: str = "ap-south-1"
     BUCKET_NAME: str = "hairtry"
     CDN_DOMAIN: str | None = None
+    # images are streamed to S3 in parts of this size, S3 requires >= 5 MB
+    S3_UPLOAD_PART_SIZE_MB: int = 5
+    # concurrent S3 calls per process, each runs on its own pool thread
+    S3_MAX_CONCURRENCY: int = 16
 
     UPLOADS_FOLDER: str = "uploads/"
     GENERATED_IMAGES_FOLDER: str = "generated/"
     PROFILE_PICS_FOLDER: str = "profilepic/"
 
+    # Outbound HTTP connection pooling, shared by all third party clients
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_PER_HOST: int = 20
+    HTTP_KEEPALIVE_SECONDS: float = 30.0
+    HTTP_DNS_CACHE_SECONDS: int = 300
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 60.0
+
+    # Shared cache for multi-worker deployments, in-process only when unset
+    REDIS_URL: Optional[str] = None
+
+    # Authenticated user cache, 0 disables it
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Styles catalog, reloaded after admin edits or once the TTL passes
+    STYLES_CACHE_TTL_SECONDS: int = 300
+    STYLES_CACHE_MAX_AGE_SECONDS: int = 60
+
+    # Live image status stream, the database is re-read when no event
+    # arrived within the recheck interval
+    STATUS_STREAM_RECHECK_SECONDS: float = 15.0
+    STATUS_STREAM_MAX_SECONDS: int = 600
+
+    # Uploads listing page sizes
+    UPLOADS_DEFAULT_LIMIT: int = 5
+    UPLOADS_MAX_LIMIT: int = 50
+
+    # Revoked tokens, screened by an in-process Bloom filter that picks up
+    # revocations from other workers every sync interval
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 100000
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 2.0
+    TOKEN_REVOCATION_PURGE_SECONDS: int = 3600
+
+    # Rate limits, counted per user in RATE_LIMIT_STORAGE_URI or REDIS_URL
+    # when set so the limits hold across the fleet, else in process memory
+    RATE_LIMIT_STORAGE_URI: Optional[str] = None
+    RATE_LIMIT_DEFAULT: str = "40/minute"
+
     # Third party API keys
     REPLICATE_API_TOKEN: str
+    # Replicate predictions: each attempt gets a deadline, retryable errors
+    # are retried with jittered backoff, and the breaker fails fast after
+    # consecutive failures. A second prediction is raced against one still
+    # running after REPLICATE_HEDGE_AFTER_SECONDS, 0 disables hedging
+    REPLICATE_DEADLINE_SECONDS: float = 90.0
+    REPLICATE_MAX_ATTEMPTS: int = 3
+    REPLICATE_BACKOFF_BASE_SECONDS: float = 1.0
+    REPLICATE_BACKOFF_MAX_SECONDS: float = 15.0
+    REPLICATE_BREAKER_FAILURES: int = 5
+    REPLICATE_BREAKER_RESET_SECONDS: float = 30.0
+    REPLICATE_HEDGE_AFTER_SECONDS: float = 0.0
+    # with REPLICATE_WEBHOOK_URL set, workers create predictions with a
+    # webhook and move on, the signed callback stores the output and
+    # finishes the job. Jobs wait up to REPLICATE_WEBHOOK_TIMEOUT_SECONDS
+    # before being dispatched again, and predictions pending for longer than
+    # REPLICATE_WEBHOOK_GRACE_SECONDS are polled in case a callback was lost
+    REPLICATE_WEBHOOK_URL: Optional[str] = None
+    REPLICATE_WEBHOOK_SECRET: Optional[str] = None
+    REPLICATE_WEBHOOK_TIMEOUT_SECONDS: int = 600
+    REPLICATE_WEBHOOK_GRACE_SECONDS: int = 60
+    REPLICATE_WEBHOOK_POLL_SECONDS: float = 30.0
+    # API base URL, e.g. a local `python replicate_stub.py` for offline runs
+    REPLICATE_BASE_URL: Optional[str] = None
 
     # Email settings
     MAIL_FROM_NAME: str
@@ -71,10 +152,50 @@ class Settings(BaseSettings):
     DODO_PAYMENTS_PRODUCT_ID: str
     DODO_PAYMENTS_WEBHOOK_SECRET: str
 
+    # Generation job queue
+    # "embedded" runs the worker pool inside the API process, "external"
+    # expects a separate `python worker.py` process to drain the queue
+    JOB_QUEUE_MODE: Literal["embedded", "external"] = "embedded"
+    WORKER_CONCURRENCY: int = 4
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 120
+    JOB_MAX_ATTEMPTS: int = 3
+    # jobs still leased out after JOB_MAX_ATTEMPTS claims are failed and
+    # refunded, images left unfinished without a live job for
+    # JOB_REAP_AFTER_SECONDS are closed. One process reaps at a time
+    JOB_REAP_INTERVAL_SECONDS: float = 60.0
+    JOB_REAP_AFTER_SECONDS: int = 900
+    JOB_REAP_BATCH_SIZE: int = 100
+    # settled generated images are folded into the daily analytics rollups
+    # in batches of ANALYTICS_ROLLUP_BATCH_SIZE. One process folds at a time
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: float = 300.0
+    ANALYTICS_ROLLUP_BATCH_SIZE: int = 1000
+    # run the three side views as one job with concurrent predictions
+    BATCH_VIEW_GENERATION: bool = True
+    # admission control, 0 disables a limit. Running jobs are capped across
+    # the fleet, requests past the queued or per-user limits are refused
+    GENERATION_MAX_RUNNING: int = 16
+    GENERATION_MAX_QUEUED: int = 200
+    GENERATION_MAX_IN_FLIGHT_PER_USER: int = 2
+    GENERATION_RETRY_AFTER_SECONDS: int = 30
+    # reuse the output of an identical earlier generation, keyed by a hash of
+    # the input image bytes, prompt and model parameters. Hits are charged
+    # like a generation unless GENERATION_CACHE_CHARGE_HITS is off
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_CHARGE_HITS: bool = True
+    GENERATION_CACHE_INPUT_HASHES: int = 10000
+    # responses replayed for a repeated Idempotency-Key header
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_KEY_PURGE_SECONDS: int = 3600
+
     @property
     def IS_PROD(self) -> bool:
         return self.ENV == "prod"
 
+    @property
+    def USE_REPLICATE_WEBHOOKS(self) -> bool:
+        return bool(self.REPLICATE_WEBHOOK_URL)
+
     model_config = ConfigDict(env_file=".env", extra="ignore")  # type: ignore
 
 
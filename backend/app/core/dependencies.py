@@ -4,6 +4,8 @@ FastAPI dependency injection for protected routes.
 This module provides authentication dependencies for securing API endpoints.
 """
 
+from admin import admin_authentication
+from core.cache import user_cache
 from core.exceptions import (
     InvalidRefreshTokenException,
     InvalidResetTokenException,
@@ -13,11 +15,12 @@ from core.exceptions import (
     UserNotFoundException,
     UserNotVerifiedException,
 )
-from db import Session, get_db
+from core.http_clients import HttpClientRegistry
+from db import AsyncSession, Session, get_async_db, get_db
 from enums import TokenType
-from fastapi import Cookie, Depends
+from fastapi import Cookie, Depends, Request
 from models import User
-from repository import UserRepository
+from repository import AsyncUserRepository
 from schemas import (
     CookiesModel,
     ResetPasswordRequest,
@@ -39,9 +42,9 @@ def get_cookies(cookies: Annotated[CookiesModel, Cookie()]) -> CookiesModel:
     return cookies
 
 
-def get_current_user(
+async def get_current_user(
     cookies: CookiesModel = Depends(get_cookies),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     if not cookies.refresh_token:
         raise NoCookiesException()
@@ -56,12 +59,15 @@ def get_current_user(
     if email is None:
         raise NotAuthenticatedException()
 
-    user_repository = UserRepository(db)
-
-    user = user_repository.get_user_by_email(email)
+    user = await user_cache.get(email)
 
     if user is None:
-        raise NotAuthenticatedException()
+        user = await AsyncUserRepository(db).get_user_by_email(email)
+
+        if user is None:
+            raise NotAuthenticatedException()
+
+        await user_cache.set(user)
 
     if not user.verified:
         raise UserNotVerifiedException()
@@ -69,6 +75,12 @@ def get_current_user(
     return user
 
 
+async def require_admin(request: Request) -> None:
+    """Dependency allowing only requests carrying a valid admin panel session."""
+    if not await admin_authentication.authenticate(request):
+        raise NotAuthenticatedException()
+
+
 def require_valid_reset_token(
     request: ResetPasswordRequest,
     db: Session = Depends(get_db),
@@ -129,20 +141,29 @@ def blacklist_refresh_token(
         token_service.blacklist_token(token, TokenType.REFRESH)
 
 
-def get_mail_service():
-    return MailService()
+def get_http_clients(request: Request) -> HttpClientRegistry:
+    return request.app.state.http_clients
+
+
+HttpClientsDep = Annotated[HttpClientRegistry, Depends(get_http_clients)]
+
+
+def get_mail_service(http_clients: HttpClientsDep):
+    return MailService(http_clients)
 
 
 def get_auth_service(db: Session = Depends(get_db)):
     return AuthService(db)
 
 
-def get_google_auth_service(db: Session = Depends(get_db)):
-    return GoogleAuthService(db)
+def get_google_auth_service(
+    http_clients: HttpClientsDep, db: Session = Depends(get_db)
+):
+    return GoogleAuthService(db, http_clients)
 
 
-def get_payment_service(db: Session = Depends(get_db)):
-    return PaymentService(db)
+def get_payment_service(http_clients: HttpClientsDep, db: Session = Depends(get_db)):
+    return PaymentService(db, http_clients)
 
 
 MailServiceDep = Annotated[MailService, Depends(get_mail_service)]
@@ -154,3 +175,4 @@ UseAndBlacklistRefreshToken = Annotated[str, Depends(blacklist_refresh_token)]
 UseAndBlacklistVerifyToken = Annotated[str, Depends(require_valid_code_token)]
 UseAndBlacklistResetToken = Annotated[str, Depends(require_valid_reset_token)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AdminOnly = Depends(require_admin)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: events.py
+Author: Maria Kevin
+Created: 2025-12-12
+Description: Publish/subscribe of live events with a pluggable transport
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+from core.cache import get_redis
+from loguru import logger
+
+Deliver = Callable[[str, dict], None]
+
+
+class LocalEventBackend:
+    """Delivers events to subscribers of the same process only."""
+
+    name = "memory"
+
+    def __init__(self, deliver: Deliver):
+        self.deliver = deliver
+
+    def start(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: dict) -> None:
+        self.deliver(channel, message)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisEventBackend:
+    """
+    Fans events out to every process through Redis pub/sub.
+
+    One listener per process subscribes to all event channels and hands
+    messages to the local subscribers, including those of the publisher.
+    """
+
+    name = "redis"
+    PREFIX = "events:"
+
+    def __init__(self, deliver: Deliver):
+        self.deliver = deliver
+        self._listener: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the listener, needed only by processes with subscribers."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def publish(self, channel: str, message: dict) -> None:
+        redis = get_redis()
+        assert redis is not None
+        await redis.publish(self.PREFIX + channel, json.dumps(message))
+
+    async def _listen(self) -> None:
+        while True:
+            redis = get_redis()
+            if redis is None:
+                return
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(self.PREFIX + "*")
+                    async for item in pubsub.listen():
+                        if item["type"] != "pmessage":
+                            continue
+                        channel = item["channel"].removeprefix(self.PREFIX)
+                        self.deliver(channel, json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event listener lost its Redis connection: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+class EventBroker:
+    """
+    In-process pub/sub for live updates such as image status changes.
+
+    Subscribers get a bounded queue per channel. The transport is Redis
+    when REDIS_URL is set, so events published by a worker process reach
+    streams held open by any API process; otherwise events stay local.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._backend: LocalEventBackend | RedisEventBackend | None = None
+        self._published = 0
+
+    @property
+    def backend(self) -> LocalEventBackend | RedisEventBackend:
+        if self._backend is None:
+            if get_redis() is not None:
+                self._backend = RedisEventBackend(self._deliver)
+            else:
+                self._backend = LocalEventBackend(self._deliver)
+        return self._backend
+
+    async def publish(self, channel: str, message: dict) -> None:
+        """
+        Publish an event, never raising so callers' work is not affected.
+
+        Args:
+            channel (str): Channel name, e.g. ``image:42``.
+            message (dict): JSON serializable payload.
+        """
+        self._published += 1
+        try:
+            await self.backend.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"Publishing to {channel} failed, delivering locally: {e}")
+            self._deliver(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to a channel for the duration of the context.
+
+        Args:
+            channel (str): Channel name.
+
+        Yields:
+            asyncio.Queue: Queue receiving the channel's messages.
+        """
+        self.backend.start()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+    def _deliver(self, channel: str, message: dict) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            if queue.full():
+                # a slow consumer only needs the latest state
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def close(self) -> None:
+        """Stop the transport, called on shutdown."""
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+    def stats(self) -> dict:
+        """
+        Event statistics of the process.
+
+        Returns:
+            dict: Transport, open subscriptions and published event total.
+        """
+        return {
+            "backend": self.backend.name,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self._published,
+        }
+
+
+event_broker = EventBroker()
@@ -75,6 +75,20 @@ class ImageNotFoundException(HTTPException):
         )
 
 
+class PredictionNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Prediction not found"
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
 class InvalidResetTokenException(HTTPException):
     def __init__(
         self,
@@ -159,6 +173,32 @@ class NotEnoughCreditsException(HTTPException):
         )
 
 
+class GenerationQueueFullException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Image generation is busy, please try again shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class TooManyGenerationsException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Please wait for your running generations to finish.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class IdempotencyKeyMismatchException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request.",
+        )
+
+
 class InternalServerException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: http_clients.py
+Author: Maria Kevin
+Created: 2025-12-10
+Description: App-scoped pooled HTTP clients for outbound calls
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import aiohttp
+import httpx
+from core.config import settings
+from dodopayments import AsyncDodoPayments
+from replicate.client import Client
+
+
+class HttpClientRegistry:
+    """
+    Long-lived HTTP clients shared by every outbound call of the process.
+
+    Reusing one client per upstream keeps connections alive between calls,
+    so TLS handshakes and DNS lookups are paid once per connection instead
+    of once per request. Clients are created lazily so the registry also
+    works in the standalone worker process.
+    """
+
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+        self._replicate: Client | None = None
+        self._replicate_transport: httpx.AsyncHTTPTransport | None = None
+        self._dodo: AsyncDodoPayments | None = None
+        self._dodo_http: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        """Create the clients eagerly, called from the app lifespan."""
+        _ = self.session, self.replicate, self.dodo
+
+    async def close(self) -> None:
+        """Close every open client and its connection pool."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        if self._replicate_transport:
+            await self._replicate_transport.aclose()
+        if self._dodo_http:
+            await self._dodo_http.aclose()
+        self._session = None
+        self._replicate = self._replicate_transport = None
+        self._dodo = self._dodo_http = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Generic aiohttp session used for downloads, email and OAuth."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_SIZE,
+                limit_per_host=settings.HTTP_POOL_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+                    sock_read=settings.HTTP_READ_TIMEOUT_SECONDS,
+                ),
+            )
+        return self._session
+
+    @property
+    def replicate(self) -> Client:
+        """Replicate client sharing one pooled transport across jobs."""
+        if self._replicate is None:
+            self._replicate_transport = httpx.AsyncHTTPTransport(
+                limits=self._httpx_limits()
+            )
+            self._replicate = Client(
+                api_token=settings.REPLICATE_API_TOKEN,
+                timeout=self._httpx_timeout(),
+                transport=self._replicate_transport,
+                base_url=settings.REPLICATE_BASE_URL,
+            )
+        return self._replicate
+
+    @property
+    def dodo(self) -> AsyncDodoPayments:
+        """Dodo Payments client sharing one pooled httpx client."""
+        if self._dodo is None:
+            self._dodo_http = httpx.AsyncClient(
+                limits=self._httpx_limits(), timeout=self._httpx_timeout()
+            )
+            self._dodo = AsyncDodoPayments(
+                bearer_token=settings.DODO_PAYMENTS_API_KEY,
+                environment=settings.DODO_PAYMENTS_MODE,
+                http_client=self._dodo_http,
+            )
+        return self._dodo
+
+    def stats(self) -> dict:
+        """
+        Connection pool statistics per client.
+
+        Returns:
+            dict: Open, in-use and idle connection counts with pool limits.
+        """
+        stats: dict = {}
+
+        if self._session is not None and not self._session.closed:
+            connector = self._session.connector
+            in_use = len(getattr(connector, "_acquired", ()))
+            idle = sum(len(c) for c in getattr(connector, "_conns", {}).values())
+            stats["aiohttp"] = {
+                "in_use": in_use,
+                "idle": idle,
+                "limit": settings.HTTP_POOL_SIZE,
+                "limit_per_host": settings.HTTP_POOL_PER_HOST,
+            }
+
+        if self._replicate_transport is not None:
+            stats["replicate"] = self._httpx_pool_stats(self._replicate_transport)
+
+        if self._dodo_http is not None:
+            transport = getattr(self._dodo_http, "_transport", None)
+            if isinstance(transport, httpx.AsyncHTTPTransport):
+                stats["dodo"] = self._httpx_pool_stats(transport)
+
+        return stats
+
+    @staticmethod
+    def _httpx_pool_stats(transport: httpx.AsyncHTTPTransport) -> dict:
+        connections = getattr(getattr(transport, "_pool", None), "connections", [])
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "limit": settings.HTTP_POOL_SIZE,
+        }
+
+    @staticmethod
+    def _httpx_limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_POOL_SIZE,
+            max_keepalive_connections=settings.HTTP_POOL_PER_HOST,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS,
+        )
+
+    @staticmethod
+    def _httpx_timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        )
+
+
+http_clients = HttpClientRegistry()
@@ -4,20 +4,61 @@
 File: lifespan.py
 Author: Maria Kevin
 Created: 2025-12-01
-Description: Brief description
+Description: Application startup and shutdown hooks
 """
 
 __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from db import Base, engine
+from core.config import settings
+from core.cache import close_redis
+from core.events import event_broker
+from core.http_clients import http_clients
+from core.storage import s3_client
+from db import Base, async_engine, engine
 from fastapi import FastAPI
+from loguru import logger
+from services import GenerationRequestService, WorkerPool, revocation_store
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # creates the database tables
     Base.metadata.create_all(bind=engine)
+
+    # pooled outbound HTTP clients shared by every request and job
+    await http_clients.start()
+    app.state.http_clients = http_clients
+
+    # in embedded mode the API process drains the job queue itself
+    worker_pool = None
+    worker_task = None
+    if settings.JOB_QUEUE_MODE == "embedded":
+        worker_pool = WorkerPool()
+        worker_task = asyncio.create_task(worker_pool.run())
+
+    # drops revocations of expired tokens so blacklist_tokens stays bounded
+    purge_task = asyncio.create_task(revocation_store.run_purge_loop())
+    # and expired idempotency keys so idempotency_keys does too
+    idempotency_task = asyncio.create_task(GenerationRequestService.run_purge_loop())
+
     yield
+
+    purge_task.cancel()
+    idempotency_task.cancel()
+    if worker_pool and worker_task:
+        worker_pool.stop()
+        try:
+            await asyncio.wait_for(worker_task, timeout=30)
+        except TimeoutError:
+            # unfinished jobs keep their lease and are reclaimed once it expires
+            logger.warning("Worker pool did not drain in time, cancelled")
+
+    await http_clients.close()
+    s3_client.close()
+    await async_engine.dispose()
+    await event_broker.close()
+    await close_redis()
@@ -12,6 +12,7 @@ __version__ = "0.1.0"
 
 
 from core.config import settings
+from core.ratelimiting import RATE_LIMIT_HEADERS
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
@@ -24,6 +25,12 @@ def setup_middlewares(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor",
+            "Retry-After",
+            "Idempotent-Replayed",
+            *RATE_LIMIT_HEADERS,
+        ],
     )
 
     app.add_middleware(
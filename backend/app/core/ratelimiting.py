@@ -4,22 +4,152 @@
 File: ratelimiting.py
 Author: Maria Kevin
 Created: 2025-11-21
+Description: Per-user rate limits shared by every worker of the fleet
 """
 
 __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
 
+import math
+import time
+from typing import Optional, Tuple
+
+from core.config import settings
+from limits import RateLimitItem
 from loguru import logger
 from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from utils import decode_access_token
+
+RATE_LIMIT_HEADERS = (
+    "RateLimit-Limit",
+    "RateLimit-Remaining",
+    "RateLimit-Reset",
+    "RateLimit-Policy",
+)
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Key requests by the authenticated user, falling back to the client address.
+
+    The user is read from the access token cookie without a database query,
+    so users behind a shared NAT get their own budget.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        str: Rate limit key.
+    """
+    payload = decode_access_token(request.cookies.get("access_token") or "")
+    if payload:
+        if payload.get("uid") is not None:
+            return f"user:{payload['uid']}"
+        # tokens issued before the user id was added to them
+        if payload.get("sub"):
+            return f"sub:{payload['sub']}"
+    return f"ip:{get_remote_address(request)}"
+
+
+def storage_uri() -> str:
+    """
+    Storage of the rate limit counters.
+
+    Returns:
+        str: RATE_LIMIT_STORAGE_URI, else REDIS_URL so every worker shares
+            the counters, else process memory.
+    """
+    return settings.RATE_LIMIT_STORAGE_URI or settings.REDIS_URL or "memory://"
+
+
+class UserRateLimiter(Limiter):
+    """
+    slowapi limiter writing the standard ``RateLimit-*`` headers.
+
+    ``RateLimit-Reset`` and ``Retry-After`` are seconds until the window
+    frees up, ``Retry-After`` is only sent with a 429.
+    """
+
+    def _rate_limit_headers(
+        self, current_limit: Tuple[RateLimitItem, list], exceeded: bool
+    ) -> dict:
+        item, args = current_limit
+        reset_at, remaining = self.limiter.get_window_stats(item, *args)
+        reset_in = max(0, math.ceil(reset_at - time.time()))
+        headers = {
+            "RateLimit-Limit": str(item.amount),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(reset_in),
+            "RateLimit-Policy": f"{item.amount};w={item.get_expiry()}",
+        }
+        if exceeded:
+            headers["Retry-After"] = str(max(1, reset_in))
+        return headers
+
+    def _headers_for(
+        self, current_limit: Optional[Tuple[RateLimitItem, list]], exceeded: bool
+    ) -> dict:
+        if not (self.enabled and self._headers_enabled and current_limit):
+            return {}
+        try:
+            return self._rate_limit_headers(current_limit, exceeded)
+        except Exception as e:
+            # headers are advisory, a storage hiccup must not fail the request
+            logger.warning(f"Rate limit headers unavailable: {e}")
+            return {}
+
+    def _inject_headers(
+        self, response: Response, current_limit: Tuple[RateLimitItem, list]
+    ) -> Response:
+        headers = self._headers_for(current_limit, response.status_code == 429)
+        response.headers.update(headers)
+        return response
+
+    def _inject_asgi_headers(
+        self, headers: MutableHeaders, current_limit: Tuple[RateLimitItem, list]
+    ) -> MutableHeaders:
+        headers.update(self._headers_for(current_limit, False))
+        return headers
+
+    def stats(self) -> dict:
+        """
+        Rate limiter statistics of the process.
+
+        Returns:
+            dict: Counter storage and whether it fell back to process memory.
+        """
+        return {
+            "backend": storage_uri().split(":")[0],
+            "fallback": self._storage_dead,
+        }
+
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["40/minute"])
+limiter = UserRateLimiter(
+    key_func=rate_limit_key,
+    default_limits=[settings.RATE_LIMIT_DEFAULT],
+    strategy="sliding-window-counter",
+    storage_uri=storage_uri(),
+    key_prefix="ratelimit",
+    # count per route rather than per URL, so path parameters share a budget
+    key_style="endpoint",
+    headers_enabled=True,
+    in_memory_fallback_enabled=True,
+)
 
 
 def setup_ratelimiting(app):
     app.state.limiter = limiter
-    app.add_exception_handler(429, handler=_rate_limit_exceeded_handler)  # type: ignore
+    # only the limiter's own errors, other 429s keep their Retry-After
+    app.add_exception_handler(
+        RateLimitExceeded,
+        handler=_rate_limit_exceeded_handler,  # type: ignore
+    )
     app.add_middleware(SlowAPIMiddleware)
-    logger.info("Rate limiting has been set up.")
+    logger.info(f"Rate limiting has been set up on {storage_uri().split(':')[0]}.")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: resilience.py
+Author: Maria Kevin
+Created: 2025-12-18
+Description: Circuit breaker and retry backoff for calls to flaky upstreams
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import random
+import time
+from typing import Literal
+
+import logfire
+from loguru import logger
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+breaker_transitions = logfire.metric_counter(
+    "circuit_breaker.transitions", description="Circuit breaker state changes"
+)
+breaker_rejections = logfire.metric_counter(
+    "circuit_breaker.rejections", description="Calls refused by an open breaker"
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream the breaker considers down."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): Number of the failed attempt, starting at 1.
+        base (float): Delay after the first attempt, before jitter.
+        cap (float): Upper bound of the delay.
+
+    Returns:
+        float: Seconds to sleep, drawn uniformly below the exponential bound
+            so retries of concurrent callers spread out.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker of one process.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    refuses calls for ``reset_seconds``. It then lets a single trial call
+    through (half open): a success closes it, a failure opens it again.
+    State is kept per process, every worker finds out on its own. A
+    threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state: BreakerState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> BreakerState:
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.reset_seconds
+        ):
+            self._transition("half_open")
+        return self._state
+
+    def _transition(self, state: BreakerState) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"{self.name} circuit {self._state} -> {state}")
+        breaker_transitions.add(1, {"breaker": self.name, "state": state})
+        self._state = state
+        if state == "open":
+            self._opened_at = time.monotonic()
+            self._opened += 1
+        self._trial_running = False
+
+    def before_call(self) -> None:
+        """
+        Admit a call or refuse it.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half open with its
+                trial call already running.
+        """
+        if not self.enabled:
+            return
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return
+
+        self._rejected += 1
+        breaker_rejections.add(1, {"breaker": self.name})
+        retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._transition("closed")
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == "half_open" or (
+            self.enabled and self._failures >= self.failure_threshold
+        ):
+            self._transition("open")
+
+    def release(self) -> None:
+        """Give the trial call back when it ended without an outcome."""
+        self._trial_running = False
+
+    def stats(self) -> dict:
+        """
+        Breaker statistics of the process.
+
+        Returns:
+            dict: State, consecutive failures, times opened and refused calls.
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self._opened,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: stage_timings.py
+Author: Maria Kevin
+Created: 2025-12-22
+Description: Per-stage latency of generation jobs
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+import logfire
+
+# queue_wait: enqueue to claim, predict: the Replicate call as the worker
+# sees it, provider_queue and inference: the same prediction as Replicate
+# reports it, download and upload: copying the output to S3, commit:
+# writing the result
+STAGES = (
+    "queue_wait",
+    "predict",
+    "provider_queue",
+    "inference",
+    "download",
+    "upload",
+    "commit",
+)
+
+stage_duration = logfire.metric_histogram(
+    "generation.stage.duration",
+    unit="s",
+    description="Duration of generation job stages by stage and job kind",
+)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class StageTimings:
+    """
+    Stage durations of one generation job, in whole milliseconds.
+
+    Outputs of a job run concurrently, so a stage recorded more than once
+    keeps its slowest duration, the one on the job's critical path. Every
+    recording is also emitted to the stage histogram.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._ms: dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        stage_duration.record(seconds, {"stage": stage, "kind": self.kind})
+        self._ms[stage] = max(self._ms.get(stage, 0), round(seconds * 1000))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one stage, whether it raises or not."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record_prediction(
+        self,
+        created_at: Optional[str],
+        started_at: Optional[str],
+        completed_at: Optional[str],
+        metrics: Optional[dict],
+        include_predict: bool = False,
+    ) -> None:
+        """
+        Split a prediction into Replicate's queueing and inference time.
+
+        Args:
+            created_at (Optional[str]): ISO timestamp of the prediction.
+            started_at (Optional[str]): When a model instance picked it up.
+            completed_at (Optional[str]): When it finished.
+            metrics (Optional[dict]): Replicate metrics, ``predict_time``
+                in seconds.
+            include_predict (bool): Also record the whole prediction as the
+                predict stage, when the caller did not time it itself.
+        """
+        created, started, completed = map(
+            _parse_time, (created_at, started_at, completed_at)
+        )
+        if created and started:
+            self.record("provider_queue", (started - created).total_seconds())
+        predict_time = (metrics or {}).get("predict_time")
+        if isinstance(predict_time, (int, float)):
+            self.record("inference", float(predict_time))
+        if include_predict and created and completed:
+            self.record("predict", (completed - created).total_seconds())
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(self._ms)
+
+
+def merge_stages(current: Optional[dict], new: dict[str, int]) -> dict[str, int]:
+    """Merge stage durations recorded by separate processes, keeping maxima."""
+    merged = dict(current or {})
+    for stage, ms in new.items():
+        merged[stage] = max(merged.get(stage, 0), ms)
+    return merged
+
+
+def summarize_stages(samples: Iterable[dict]) -> dict:
+    """
+    Summarize the stage durations of many jobs.
+
+    Args:
+        samples (Iterable[dict]): Stage durations in milliseconds per job.
+
+    Returns:
+        dict: Per stage, the number of jobs and the mean, p50, p95 and max
+            durations in milliseconds.
+    """
+    values: dict[str, list[int]] = {}
+    for sample in samples:
+        for stage, ms in (sample or {}).items():
+            values.setdefault(stage, []).append(ms)
+
+    summary = {}
+    for stage in sorted(values, key=lambda s: STAGES.index(s) if s in STAGES else 99):
+        ordered = sorted(values[stage])
+        count = len(ordered)
+        summary[stage] = {
+            "count": count,
+            "mean_ms": round(sum(ordered) / count),
+            # nearest-rank percentiles
+            "p50_ms": ordered[max(0, -(-50 * count // 100) - 1)],
+            "p95_ms": ordered[max(0, -(-95 * count // 100) - 1)],
+            "max_ms": ordered[-1],
+        }
+    return summary
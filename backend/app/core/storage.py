@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File: storage.py
+Author: Maria Kevin
+Created: 2025-12-11
+Description: Non-blocking S3 client backed by a bounded thread pool
+"""
+
+__author__ = "Maria Kevin"
+__version__ = "0.1.0"
+
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+import boto3
+import logfire
+from botocore.config import Config
+from core.config import settings
+
+s3_request_duration = logfire.metric_histogram(
+    "s3.request.duration", unit="s", description="Duration of S3 API calls"
+)
+s3_upload_bytes = logfire.metric_counter(
+    "s3.upload.bytes", unit="By", description="Bytes uploaded to S3"
+)
+s3_request_errors = logfire.metric_counter(
+    "s3.request.errors", description="Failed S3 API calls"
+)
+
+
+class AsyncS3Client:
+    """
+    S3 client whose blocking boto3 calls run off the event loop.
+
+    Calls are dispatched to a dedicated thread pool and capped by a
+    semaphore, so a slow upload occupies one pool thread instead of the
+    whole worker, and a burst of uploads queues instead of exhausting
+    threads or boto3 connections.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.S3_MAX_CONCURRENCY,
+    ):
+        self.max_concurrency = max_concurrency
+        self._client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=max_concurrency,
+            ),
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="s3"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._bytes_uploaded = 0
+
+    async def _call(self, operation: str, **kwargs: Any) -> Any:
+        async with self._semaphore:
+            self._in_flight += 1
+            self._requests += 1
+            start_time = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, partial(getattr(self._client, operation), **kwargs)
+                )
+            except Exception:
+                self._errors += 1
+                s3_request_errors.add(1, {"operation": operation})
+                raise
+            finally:
+                self._in_flight -= 1
+                s3_request_duration.record(
+                    time.perf_counter() - start_time, {"operation": operation}
+                )
+
+    def _count_upload(self, body: bytes) -> None:
+        self._bytes_uploaded += len(body)
+        s3_upload_bytes.add(len(body))
+
+    async def put_object(self, Body: bytes, **kwargs: Any) -> dict:
+        result = await self._call("put_object", Body=Body, **kwargs)
+        self._count_upload(Body)
+        return result
+
+    async def create_multipart_upload(self, **kwargs: Any) -> dict:
+        return await self._call("create_multipart_upload", **kwargs)
+
+    async def upload_part(self, Body: bytes, **kwargs: Any) -> dict:
+        result = await self._call("upload_part", Body=Body, **kwargs)
+        self._count_upload(Body)
+        return result
+
+    async def complete_multipart_upload(self, **kwargs: Any) -> dict:
+        return await self._call("complete_multipart_upload", **kwargs)
+
+    async def abort_multipart_upload(self, **kwargs: Any) -> dict:
+        return await self._call("abort_multipart_upload", **kwargs)
+
+    async def generate_presigned_post(self, **kwargs: Any) -> dict:
+        return await self._call("generate_presigned_post", **kwargs)
+
+    def close(self) -> None:
+        """Wait for pending calls and release the pool threads."""
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        """
+        Upload statistics of the process.
+
+        Returns:
+            dict: In-flight calls, concurrency limit and running totals.
+        """
+        return {
+            "in_flight": self._in_flight,
+            "limit": self.max_concurrency,
+            "requests": self._requests,
+            "errors": self._errors,
+            "bytes_uploaded": self._bytes_uploaded,
+        }
+
+
+s3_client = AsyncS3Client()
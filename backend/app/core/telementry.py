@@ -14,10 +14,10 @@ __version__ = "0.1.0"
 import logfire
 
 
-def init_telemetry(app, engine=None, logfire_token=None):
+def init_telemetry(app, engines=None, logfire_token=None):
     if not logfire_token:
         return
     logfire.configure()
     logfire.instrument_fastapi(app, capture_headers=True)
     logfire.instrument_system_metrics()
-    logfire.instrument_sqlalchemy(engine=engine, enable_commenter=True)
+    logfire.instrument_sqlalchemy(engines=engines, enable_commenter=True)
@@ -3,17 +3,162 @@ Database configuration and session management.
 
 This module sets up SQLAlchemy engine, session factory, and base class
 for ORM models, along with database dependency injection.
+
+Two engines share the same database: the synchronous one is used by the
+admin panel, alembic and the generation workers, while request handlers
+use the async engine (asyncpg on PostgreSQL, aiosqlite on SQLite) so
+queries do not block the event loop.
 """
 
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import logfire
 from core.config import settings
-from sqlalchemy import create_engine
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session  # do not remove, imported in other modules
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the driver of a database URL for its asyncio counterpart.
+
+    Args:
+        url (str): Synchronous URL, e.g. ``postgresql://...`` or
+            ``postgresql+psycopg2://...``.
+
+    Returns:
+        str: The same URL using asyncpg or aiosqlite.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return parsed.set(
+        drivername=f"{backend}+{ASYNC_DRIVERS[backend]}"
+    ).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """
+    Pool and connection arguments for an engine, built from settings.
+
+    Args:
+        url (str): Database URL the engine connects to.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for create_engine.
+    """
+    parsed = make_url(url)
+    options: dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    # in-memory SQLite keeps one connection per thread and takes no pool sizing
+    if parsed.get_backend_name() != "sqlite" or parsed.database not in (
+        None,
+        "",
+        ":memory:",
+    ):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if parsed.get_backend_name() == "postgresql" and timeout:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(timeout)}
+            }
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply journal and locking pragmas to every new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def pool_stats(sync_engine: Engine) -> dict[str, Any]:
+    """
+    Live connection pool statistics of an engine.
+
+    Args:
+        sync_engine (Engine): Engine to inspect, use ``.sync_engine`` for
+            async engines.
+
+    Returns:
+        dict[str, Any]: Checked out, idle and overflow connections with limits.
+    """
+    pool = sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "size": pool.size(),
+        "limit": pool.size() + settings.DB_MAX_OVERFLOW,
+    }
 
-engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = to_async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL)
+)
+
+ENGINES = {"sync": engine, "async": async_engine.sync_engine}
+
+for _engine in ENGINES.values():
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", set_sqlite_pragmas)
+
+
+def _observe_pool(key: str):
+    def callback(options: CallbackOptions):
+        for name, sync_engine in ENGINES.items():
+            stats = pool_stats(sync_engine)
+            if key in stats:
+                yield Observation(stats[key], {"engine": name})
+
+    return callback
+
+
+logfire.metric_gauge_callback(
+    "db.pool.checked_out",
+    callbacks=[_observe_pool("checked_out")],
+    description="Database connections currently checked out",
+)
+logfire.metric_gauge_callback(
+    "db.pool.overflow",
+    callbacks=[_observe_pool("overflow")],
+    description="Database connections open beyond the pool size",
+)
+
+# objects stay usable after commit, lazy refreshes are not possible
+# without a greenlet context
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -25,4 +170,51 @@ def get_db():
         db.close()
 
 
-__all__ = ["Session", "get_db", "Base", "engine"]
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def advisory_lock(key: int) -> Iterator[bool]:
+    """
+    Try to take a PostgreSQL advisory lock for the duration of a block.
+
+    The lock is held by a dedicated connection, so the block may commit
+    its own sessions as often as it likes. Other databases have no
+    advisory locks and always grant it, writes made under it must stay
+    conditional.
+
+    Args:
+        key (int): 64-bit lock key shared by every process.
+
+    Yields:
+        bool: Whether this process holds the lock.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    with engine.connect() as conn:
+        acquired = bool(
+            conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+        )
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+
+__all__ = [
+    "Session",
+    "AsyncSession",
+    "get_db",
+    "get_async_db",
+    "advisory_lock",
+    "Base",
+    "engine",
+    "async_engine",
+    "pool_stats",
+    "ENGINES",
+]
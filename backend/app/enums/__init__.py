@@ -1,6 +1,8 @@
 "Enums for database models."
 
+from .credit import ReservationStatus
 from .image import ImageStatus
+from .job import JobKind, JobStatus, PredictionStatus
 from .payment import IntentStatus
 from .style import StyleCategory
 from .tokens import TokenType
@@ -10,4 +12,8 @@ __all__ = [
     "ImageStatus",
     "TokenType",
     "IntentStatus",
+    "JobKind",
+    "JobStatus",
+    "PredictionStatus",
+    "ReservationStatus",
 ]
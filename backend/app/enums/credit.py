@@ -0,0 +1,13 @@
+"""
+Credit reservation enumerations.
+
+This module defines the status values of the credit reservations taken
+when generation work is queued.
+"""
+
+from enum import Enum
+
+
+class ReservationStatus(str, Enum):
+    HELD = "held"
+    SETTLED = "settled"
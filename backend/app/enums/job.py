@@ -0,0 +1,31 @@
+"""
+Generation job enumerations.
+
+This module defines the kind and status values used by the durable
+generation job queue, and the status of the Replicate predictions a job
+waits on when predictions complete through webhooks.
+"""
+
+from enum import Enum
+
+
+class JobKind(str, Enum):
+    IMAGE = "image"
+    VIEW = "view"
+    VIEWS = "views"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class PredictionStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETING = "completing"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CACHED = "cached"
+    ABANDONED = "abandoned"
@@ -18,7 +18,7 @@ from core.logging import setup_logging
 from core.middleware import setup_middlewares
 from core.ratelimiting import setup_ratelimiting
 from core.telementry import init_telemetry
-from db import engine
+from db import async_engine, engine
 from fastapi import FastAPI
 from sqladmin import Admin
 
@@ -42,7 +42,9 @@ for view in admin_views:
     admin.add_view(view)
 
 
-init_telemetry(app, engine=engine, logfire_token=settings.LOGFIRE_TOKEN)
+init_telemetry(
+    app, engines=[engine, async_engine], logfire_token=settings.LOGFIRE_TOKEN
+)
 setup_ratelimiting(app)
 setup_middlewares(app)
 setup_exception_handler(app, is_production=settings.IS_PROD)
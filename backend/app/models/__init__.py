@@ -1,8 +1,17 @@
 from .blacklist_tokens import BlackListTokens
+from .credit_reservation import CreditReservation
 from .generated_images import GeneratedImage
+from .generation_result import GenerationResult
+from .generation_flight import GenerationFlight
+from .generation_job import GenerationJob
+from .generation_rollup import GenerationRollup, RollupWatermark
+from .idempotency_key import IdempotencyKey
+from .replicate_prediction import ReplicatePrediction
 from .style import Styles
 from .transactions import Transaction
 from .user import User
+from .user_image_counts import UserImageCounts
+from .user_upload import UserUpload
 
 __all__ = [
     "User",
@@ -10,4 +19,14 @@ __all__ = [
     "GeneratedImage",
     "BlackListTokens",
     "Transaction",
+    "GenerationJob",
+    "UserImageCounts",
+    "UserUpload",
+    "CreditReservation",
+    "GenerationResult",
+    "GenerationFlight",
+    "IdempotencyKey",
+    "ReplicatePrediction",
+    "GenerationRollup",
+    "RollupWatermark",
 ]
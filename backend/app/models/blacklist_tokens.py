@@ -11,15 +11,26 @@ __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
 
+import datetime
+
 from db import Base
 from enums import TokenType
-from sqlalchemy import DateTime, Enum, Integer, Text
+from sqlalchemy import DateTime, Enum, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class BlackListTokens(Base):
     __tablename__ = "blacklist_tokens"
+    __table_args__ = (
+        # incremental filter sync reads recent rows, the purge expired ones
+        Index("ix_blacklist_tokens_blacklisted_on", "blacklisted_on"),
+        Index("ix_blacklist_tokens_expires_at", "expires_at"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     jti: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
     token_type: Mapped[TokenType] = mapped_column(Enum(TokenType), nullable=False)
     blacklisted_on: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+    # expiry of the revoked token, the row is useless afterwards
+    expires_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
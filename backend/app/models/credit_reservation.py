@@ -0,0 +1,49 @@
+"""
+Credit reservation database model.
+
+This module defines the SQLAlchemy ORM model for the credit ledger. A
+reservation takes credits off the user's balance when generation work is
+queued, and is settled into charged and refunded credits once its jobs
+finish.
+"""
+
+import datetime
+
+from db import Base
+from enums import ReservationStatus
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class CreditReservation(Base):
+    """Credits held for the queued generation jobs of an image."""
+
+    __tablename__ = "credit_reservations"
+    __table_args__ = (
+        Index("ix_credit_reservations_status_created_at", "status", "created_at"),
+        Index("ix_credit_reservations_user_id_status", "user_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    image_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("generated_images.id"), nullable=False
+    )
+
+    # credits taken at enqueue, split into held, charged and refunded ones
+    credits: Mapped[int] = mapped_column(Integer, nullable=False)
+    held: Mapped[int] = mapped_column(Integer, nullable=False)
+    charged: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[ReservationStatus] = mapped_column(
+        Enum(ReservationStatus), nullable=False, default=ReservationStatus.HELD
+    )
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
+    settled_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
@@ -9,14 +9,40 @@ import datetime
 
 from db import Base
 from enums import ImageStatus
-from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from utils import utcnow
 
 
 class GeneratedImage(Base):
     """Generated image database model."""
 
     __tablename__ = "generated_images"
+    __table_args__ = (
+        # gallery pages, keyset cursors and per-user counts
+        Index("ix_generated_images_user_id_created_at", "user_id", "created_at", "id"),
+        # favourites are few, keep them in a small partial index
+        Index(
+            "ix_generated_images_user_id_liked",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=text("liked IS TRUE"),
+            sqlite_where=text("liked IS 1"),
+        ),
+        # the reaper's look for unfinished images
+        Index("ix_generated_images_status_created_at", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
@@ -34,14 +60,17 @@ class GeneratedImage(Base):
     left_view_url: Mapped[str | None] = mapped_column(String, nullable=True)
     back_view_url: Mapped[str | None] = mapped_column(String, nullable=True)
 
-    liked: Mapped[bool] = mapped_column(Boolean, default=None, nullable=True)
+    # active_history loads the previous value on change, the per-user
+    # counters need it to tell transitions apart
+    liked: Mapped[bool] = mapped_column(
+        Boolean, default=None, nullable=True, active_history=True
+    )
 
     status: Mapped[ImageStatus] = mapped_column(
-        Enum(ImageStatus), default=ImageStatus.PENDING
-    )
-    created_at: Mapped[datetime.datetime] = mapped_column(
-        DateTime, default=datetime.datetime.now(datetime.timezone.utc)
+        Enum(ImageStatus), default=ImageStatus.PENDING, active_history=True
     )
+    # a callable, so every row gets its own insert time
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=utcnow)
 
     # new field
     time_taken: Mapped[float] = mapped_column(Float, nullable=True)
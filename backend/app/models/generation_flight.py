@@ -0,0 +1,33 @@
+"""
+Generation flight database model.
+
+This module defines the SQLAlchemy ORM model for the single-flight lock
+table. A row claims a generation key, one user's image from one input and
+style or the side views of one image, for the image whose jobs do the
+work, so identical requests arriving while those jobs are queued or
+running join them instead of queueing their own.
+"""
+
+import datetime
+
+from db import Base
+from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class GenerationFlight(Base):
+    """Generation key claimed by the image doing the work."""
+
+    __tablename__ = "generation_flights"
+
+    flight_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    image_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("generated_images.id"), nullable=False
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
@@ -0,0 +1,78 @@
+"""
+Generation job database model.
+
+This module defines the SQLAlchemy ORM model for the durable queue of
+image generation jobs drained by the worker pool.
+"""
+
+import datetime
+
+from db import Base
+from enums import JobKind, JobStatus
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from utils import utcnow
+
+
+class GenerationJob(Base):
+    """Queued unit of generation work for a GeneratedImage."""
+
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index("ix_generation_jobs_status_id", "status", "id"),
+        # live jobs of an image, looked up by single-flight requests
+        Index("ix_generation_jobs_image_id_status", "image_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    image_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("generated_images.id"), nullable=False
+    )
+    kind: Mapped[JobKind] = mapped_column(Enum(JobKind), nullable=False)
+    view: Mapped[str | None] = mapped_column(String(10), nullable=True)
+
+    # share of the reservation this job may spend, zeroed once settled
+    reservation_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("credit_reservations.id", name="fk_generation_jobs_reservation_id"),
+        nullable=True,
+    )
+    credits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), nullable=False, default=JobStatus.QUEUED
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # lease held by the worker currently running the job, an expired lease
+    # means the worker died and the job can be claimed again
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    lease_expires_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
+    started_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    # milliseconds spent per stage, e.g. {"queue_wait": 120, "predict": 9400}
+    stage_ms: Mapped[dict | None] = mapped_column(
+        JSON(none_as_null=True), nullable=True
+    )
+
+    image = relationship("GeneratedImage")
@@ -0,0 +1,31 @@
+"""
+Generation result database model.
+
+This module defines the SQLAlchemy ORM model for the output reuse cache.
+Each row maps a content hash of a generation's input image, prompt and
+model parameters to the stored output, so repeating an identical
+generation reuses that output instead of running a new prediction.
+"""
+
+import datetime
+
+from db import Base
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class GenerationResult(Base):
+    """Stored output of a generation, keyed by a hash of its inputs."""
+
+    __tablename__ = "generation_results"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    output_url: Mapped[str] = mapped_column(String, nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
+    last_hit_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
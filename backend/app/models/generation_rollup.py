@@ -0,0 +1,52 @@
+"""
+Generation analytics rollup database models.
+
+This module defines the SQLAlchemy ORM models for the daily aggregates of
+generated images per style and status, and for the watermark recording
+how far generated_images has been folded into them.
+"""
+
+import datetime
+
+from db import Base
+from enums import ImageStatus
+from sqlalchemy import JSON, Date, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class GenerationRollup(Base):
+    """Settled images of one style, day and final status, aggregated."""
+
+    __tablename__ = "generation_rollups"
+
+    # the primary key leads with the day, so date ranges are index scans
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    style_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("styles.id", ondelete="CASCADE"), primary_key=True
+    )
+    status: Mapped[ImageStatus] = mapped_column(Enum(ImageStatus), primary_key=True)
+
+    images: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    liked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # time_taken of the images that have one, the histogram counts them per
+    # bound of TIME_BUCKETS with a last slot for slower ones, so percentiles
+    # survive merging days and styles
+    timed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    time_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    time_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    time_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    time_histogram: Mapped[list[int]] = mapped_column(JSON, nullable=False)
+
+
+class RollupWatermark(Base):
+    """Highest source row folded into a rollup."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow, onupdate=utcnow
+    )
@@ -0,0 +1,36 @@
+"""
+Idempotency key database model.
+
+This module defines the SQLAlchemy ORM model for the responses recorded
+under a client's Idempotency-Key header, so a retried request gets the
+original response back instead of being processed again.
+"""
+
+import datetime
+
+from db import Base
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class IdempotencyKey(Base):
+    """Response of a request made under an Idempotency-Key."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # hash of the route and body, a key reused for another request is refused
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
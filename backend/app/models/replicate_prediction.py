@@ -0,0 +1,46 @@
+"""
+Replicate prediction database model.
+
+This module defines the SQLAlchemy ORM model for the predictions a
+generation job waits on when Replicate reports completions through
+webhooks. A worker records each prediction it creates, or each output it
+reused from the cache, and the job finishes once none of its rows is
+pending any more.
+"""
+
+import datetime
+
+from db import Base
+from enums import PredictionStatus
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class ReplicatePrediction(Base):
+    """Prediction, or cache hit, producing one output of a generation job."""
+
+    __tablename__ = "replicate_predictions"
+    __table_args__ = (
+        Index("ix_replicate_predictions_job_id", "job_id"),
+        Index("ix_replicate_predictions_status_created_at", "status", "created_at"),
+    )
+
+    # Replicate's prediction ID, a random one for cache hits
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    job_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("generation_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    # side view the output belongs to, None for the main image
+    view: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    status: Mapped[PredictionStatus] = mapped_column(
+        Enum(PredictionStatus), nullable=False, default=PredictionStatus.PENDING
+    )
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
+    completed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
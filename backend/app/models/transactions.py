@@ -15,12 +15,30 @@ import datetime
 
 from db import Base
 from enums import IntentStatus
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_session_id", "session_id"),
+        # payment_id is only set once a checkout is paid
+        Index(
+            "ix_transactions_payment_id",
+            "payment_id",
+            postgresql_where=text("payment_id IS NOT NULL"),
+            sqlite_where=text("payment_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_transactions_user_id_status_created_at",
+            "user_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(
         String, nullable=False
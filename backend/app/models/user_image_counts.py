@@ -0,0 +1,24 @@
+"""
+User image counters database model.
+
+This module defines the SQLAlchemy ORM model for the per-user gallery
+counters kept in step with generated_images, so paginated listings do not
+count the user's images on every request.
+"""
+
+from db import Base
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UserImageCounts(Base):
+    """Number of images, favourites and completed images of a user."""
+
+    __tablename__ = "user_image_counts"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    favourites: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
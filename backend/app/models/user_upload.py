@@ -0,0 +1,41 @@
+"""
+User upload database model.
+
+This module defines the SQLAlchemy ORM model for the distinct input images
+of a user, recorded once per URL with how often and how recently they were
+used so the uploads listing is a plain indexed read.
+"""
+
+import datetime
+
+from db import Base
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from utils import utcnow
+
+
+class UserUpload(Base):
+    """Input image a user generated from, with its usage."""
+
+    __tablename__ = "user_uploads"
+    __table_args__ = (
+        UniqueConstraint("user_id", "input_image_url", name="uq_user_uploads_url"),
+        Index("ix_user_uploads_user_id_last_used_at", "user_id", "last_used_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    input_image_url: Mapped[str] = mapped_column(String, nullable=False)
+    use_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    last_used_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow
+    )
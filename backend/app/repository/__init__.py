@@ -3,11 +3,24 @@ Repository module init file.
 This modules contains all repository classes for database interactions.
 """
 
-from .image_respository import GeneratedImageRepository
-from .style_repository import StyleRepository
+from .credit_repository import AsyncCreditRepository, CreditRepository
+from .flight_repository import AsyncFlightRepository, flight_key
+from .generation_result_repository import GenerationResultRepository
+from .idempotency_repository import AsyncIdempotencyRepository, IdempotencyRepository
+from .image_counts_repository import AsyncImageCountsRepository, ImageCountsRepository
+from .image_respository import AsyncGeneratedImageRepository, GeneratedImageRepository
+from .job_repository import AsyncJobRepository, JobRepository
+from .prediction_repository import PredictionRepository
+from .rollup_repository import (
+    AsyncRollupRepository,
+    RollupRepository,
+    summarize_rollups,
+)
+from .style_repository import AsyncStyleRepository, StyleRepository
 from .token_repository import TokenRepository
 from .transaction_repository import TransactionRepository
-from .user_repository import UserRepository
+from .upload_repository import AsyncUploadRepository
+from .user_repository import AsyncUserRepository, UserRepository
 
 __all__ = [
     "UserRepository",
@@ -15,4 +28,23 @@ __all__ = [
     "GeneratedImageRepository",
     "TokenRepository",
     "TransactionRepository",
+    "JobRepository",
+    "AsyncUserRepository",
+    "AsyncStyleRepository",
+    "AsyncGeneratedImageRepository",
+    "AsyncJobRepository",
+    "ImageCountsRepository",
+    "AsyncImageCountsRepository",
+    "AsyncUploadRepository",
+    "CreditRepository",
+    "AsyncCreditRepository",
+    "GenerationResultRepository",
+    "AsyncFlightRepository",
+    "flight_key",
+    "AsyncIdempotencyRepository",
+    "IdempotencyRepository",
+    "PredictionRepository",
+    "RollupRepository",
+    "AsyncRollupRepository",
+    "summarize_rollups",
 ]
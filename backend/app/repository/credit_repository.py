@@ -0,0 +1,165 @@
+"""
+Credit ledger repository.
+
+This module reserves and settles credits with guarded, set-based UPDATEs.
+A reservation subtracts credits from the balance only while enough are
+left, so concurrent requests can never overspend. Each job holds a share
+of its reservation, settling the share charges what was generated and
+refunds the rest exactly once, however often the job is retried.
+"""
+
+from typing import Optional, cast
+
+from core.cache import user_cache
+from db import AsyncSession, Session
+from enums import ReservationStatus
+from models import CreditReservation, GenerationJob, User
+from sqlalchemy import CursorResult, case, event, func, literal, select, update
+from utils import utcnow
+
+
+def _invalidate_after_commit(session: Session, email: str) -> None:
+    # the cached balance must outlive the pending transaction
+    event.listen(
+        session, "after_commit", lambda _: user_cache.invalidate(email), once=True
+    )
+
+
+class CreditRepository:
+    """Repository settling credit reservations from the workers."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def settle_job(self, job_id: int, used: int, commit: bool = True) -> int:
+        """
+        Settle a job's share of its reservation.
+
+        Up to ``used`` credits of the share are charged and the remainder
+        is returned to the user. Settling a job twice is a no-op.
+
+        Args:
+            job_id (int): ID of the job.
+            used (int): Credits the job actually spent.
+            commit (bool): Commit immediately, False lets the caller write the
+                settlement in the same transaction as other changes.
+
+        Returns:
+            int: Number of refunded credits.
+        """
+        row = self.db.execute(
+            select(GenerationJob.reservation_id, GenerationJob.credits).where(
+                GenerationJob.id == job_id
+            )
+        ).first()
+        if row is None or not row.credits:
+            return 0
+        reservation_id, share = row
+
+        # compare-and-set so only one settlement claims the share
+        claimed = cast(
+            CursorResult,
+            self.db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id, GenerationJob.credits == share)
+                .values(credits=0)
+            ),
+        ).rowcount
+        if not claimed:
+            return 0
+
+        charged = min(max(used, 0), share)
+        refund = share - charged
+        last = CreditReservation.held == share
+        settled = literal(ReservationStatus.SETTLED, CreditReservation.status.type)
+        user_id = self.db.execute(
+            update(CreditReservation)
+            .where(CreditReservation.id == reservation_id)
+            .values(
+                held=CreditReservation.held - share,
+                charged=CreditReservation.charged + charged,
+                status=case((last, settled), else_=CreditReservation.status),
+                settled_at=case((last, utcnow()), else_=CreditReservation.settled_at),
+            )
+            .returning(CreditReservation.user_id)
+        ).scalar()
+
+        if refund and user_id is not None:
+            email = self.db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(credits=User.credits + refund)
+                .returning(User.email)
+            ).scalar()
+            if email:
+                _invalidate_after_commit(self.db, email)
+
+        if commit:
+            self.db.commit()
+        return refund
+
+
+class AsyncCreditRepository:
+    """Async repository taking credit reservations on the request path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def count_held(self, user_id: int) -> int:
+        """
+        Count a user's reservations whose jobs have not all finished.
+
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            int: Number of requests the user has in flight.
+        """
+        count = await self.db.scalar(
+            select(func.count(CreditReservation.id)).where(
+                CreditReservation.user_id == user_id,
+                CreditReservation.status == ReservationStatus.HELD,
+            )
+        )
+        return count or 0
+
+    async def reserve(
+        self, user_id: int, image_id: int, credits: int
+    ) -> Optional[CreditReservation]:
+        """
+        Take credits off a user's balance if enough are left.
+
+        The reservation is flushed but not committed, so it lands in the
+        same transaction as the jobs that spend it.
+
+        Args:
+            user_id (int): ID of the user.
+            image_id (int): ID of the image the credits are spent on.
+            credits (int): Number of credits to reserve.
+
+        Returns:
+            Optional[CreditReservation]: The reservation, or None if the
+                user has fewer credits.
+        """
+        email = await self.db.scalar(
+            update(User)
+            .where(User.id == user_id, User.credits >= credits)
+            .values(credits=User.credits - credits)
+            .returning(User.email)
+        )
+        if email is None:
+            return None
+        _invalidate_after_commit(self.db.sync_session, email)
+
+        reservation = CreditReservation(
+            user_id=user_id,
+            image_id=image_id,
+            credits=credits,
+            held=credits,
+            charged=0,
+            status=ReservationStatus.HELD,
+            created_at=utcnow(),
+        )
+        self.db.add(reservation)
+        await self.db.flush()
+        return reservation
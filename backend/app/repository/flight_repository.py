@@ -0,0 +1,94 @@
+"""
+Single-flight repository.
+
+This module claims generation keys in generation_flights. A claim is an
+INSERT on the key's primary key in the transaction that queues the work,
+so of two identical requests racing on any worker exactly one commits and
+the other fails with an IntegrityError. A claim only holds while its
+image still has queued or running jobs of the claimed kinds, a finished
+one is taken over by the next request.
+"""
+
+import hashlib
+from typing import Optional, Sequence
+
+from db import AsyncSession
+from enums import JobKind, JobStatus
+from models import GenerationFlight, GenerationJob
+from sqlalchemy import delete, exists, select
+from utils import utcnow
+
+LIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+def flight_key(*parts: object) -> str:
+    """
+    Key of a generation, hashed from the values that make it identical.
+
+    Args:
+        *parts (object): User, kind and inputs of the generation.
+
+    Returns:
+        str: Hex SHA-256 of the parts.
+    """
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+
+class AsyncFlightRepository:
+    """Async repository for the single-flight claims of the image routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _live(kinds: Sequence[JobKind]):
+        return exists().where(
+            GenerationJob.image_id == GenerationFlight.image_id,
+            GenerationJob.kind.in_(kinds),
+            GenerationJob.status.in_(LIVE_STATUSES),
+        )
+
+    async def get_live(self, key: str, kinds: Sequence[JobKind]) -> Optional[int]:
+        """
+        Find the image whose jobs are doing the work of a key.
+
+        Args:
+            key (str): Generation key from flight_key.
+            kinds (Sequence[JobKind]): Job kinds doing the work.
+
+        Returns:
+            Optional[int]: ID of the image, or None if no claim is live.
+        """
+        return await self.db.scalar(
+            select(GenerationFlight.image_id).where(
+                GenerationFlight.flight_key == key, self._live(kinds)
+            )
+        )
+
+    async def claim(
+        self, key: str, kinds: Sequence[JobKind], user_id: int, image_id: int
+    ) -> None:
+        """
+        Claim a key for an image, without committing.
+
+        A finished claim on the key is replaced. Committing raises an
+        IntegrityError if the key is claimed by live work, including work
+        a concurrent request queued first.
+
+        Args:
+            key (str): Generation key from flight_key.
+            kinds (Sequence[JobKind]): Job kinds doing the work.
+            user_id (int): ID of the user.
+            image_id (int): ID of the image doing the work.
+        """
+        await self.db.execute(
+            delete(GenerationFlight).where(
+                GenerationFlight.flight_key == key, ~self._live(kinds)
+            )
+        )
+        self.db.add(
+            GenerationFlight(
+                flight_key=key, user_id=user_id, image_id=image_id, created_at=utcnow()
+            )
+        )
+        await self.db.flush()
@@ -0,0 +1,80 @@
+"""
+Generation result repository.
+
+This module reads and writes the output reuse cache. Lookups only read,
+hits and new results are written by the job in its settlement commit, and
+concurrent workers storing the same result keep whichever row was
+inserted first.
+"""
+
+from typing import Iterable, Optional
+
+from db import Session
+from models import GenerationResult
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from utils import utcnow
+
+
+class GenerationResultRepository:
+    """Repository for the cached outputs of generations."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_output(self, cache_key: str) -> Optional[str]:
+        """
+        Look up the output of an identical generation.
+
+        Args:
+            cache_key (str): Content hash of the generation inputs.
+
+        Returns:
+            Optional[str]: URL of the stored output, or None on a miss.
+        """
+        return self.db.scalar(
+            select(GenerationResult.output_url).where(
+                GenerationResult.cache_key == cache_key
+            )
+        )
+
+    def count_hits(self, cache_keys: Iterable[str]) -> None:
+        """
+        Count reuses of cached outputs, without committing.
+
+        Args:
+            cache_keys (Iterable[str]): Keys of the reused outputs, a key
+                reused several times is counted as often.
+        """
+        reused: dict[str, int] = {}
+        for cache_key in cache_keys:
+            reused[cache_key] = reused.get(cache_key, 0) + 1
+        now = utcnow()
+        # a fixed order, so jobs sharing outputs never lock rows crosswise
+        for cache_key in sorted(reused):
+            self.db.execute(
+                update(GenerationResult)
+                .where(GenerationResult.cache_key == cache_key)
+                .values(hits=GenerationResult.hits + reused[cache_key], last_hit_at=now)
+            )
+
+    def save(self, cache_key: str, output_url: str) -> None:
+        """
+        Record the output of a generation, without committing.
+
+        Args:
+            cache_key (str): Content hash of the generation inputs.
+            output_url (str): URL of the stored output.
+        """
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        self.db.execute(
+            insert(GenerationResult)
+            .values(
+                cache_key=cache_key,
+                output_url=output_url,
+                hits=0,
+                created_at=utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=[GenerationResult.cache_key])
+        )
@@ -0,0 +1,109 @@
+"""
+Idempotency key repository.
+
+This module records the response of a request made under an
+Idempotency-Key header, in the same transaction as the work the request
+queued, so either both are committed or neither is.
+"""
+
+import datetime
+from typing import Optional, cast
+
+from db import AsyncSession, Session
+from models import IdempotencyKey
+from sqlalchemy import CursorResult, delete, select
+from utils import utcnow
+
+
+class AsyncIdempotencyRepository:
+    """Async repository for the idempotent image routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(
+        self, user_id: int, key: str, since: datetime.datetime
+    ) -> Optional[IdempotencyKey]:
+        """
+        Look up a recorded request.
+
+        Args:
+            user_id (int): ID of the user.
+            key (str): Client's Idempotency-Key.
+            since (datetime.datetime): Records older than this have expired.
+
+        Returns:
+            Optional[IdempotencyKey]: The record, or None.
+        """
+        return await self.db.scalar(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.created_at >= since,
+            )
+        )
+
+    async def save(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        response: dict,
+        since: datetime.datetime,
+    ) -> None:
+        """
+        Record the response of a request, without committing.
+
+        An expired record of the key is replaced. Committing raises an
+        IntegrityError if a concurrent request recorded the key first.
+
+        Args:
+            user_id (int): ID of the user.
+            key (str): Client's Idempotency-Key.
+            request_hash (str): Hash of the route and body of the request.
+            response (dict): Response body to replay.
+            since (datetime.datetime): Records older than this have expired.
+        """
+        await self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.created_at < since,
+            )
+        )
+        self.db.add(
+            IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                response=response,
+                created_at=utcnow(),
+            )
+        )
+        await self.db.flush()
+
+
+class IdempotencyRepository:
+    """Repository for the maintenance of idempotency keys."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def purge_expired(self, before: datetime.datetime) -> int:
+        """
+        Delete the records that can no longer be replayed.
+
+        Args:
+            before (datetime.datetime): Records created before this are deleted.
+
+        Returns:
+            int: Number of deleted records.
+        """
+        deleted = cast(
+            CursorResult,
+            self.db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.created_at < before)
+            ),
+        ).rowcount
+        self.db.commit()
+        return deleted
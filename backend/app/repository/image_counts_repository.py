@@ -0,0 +1,176 @@
+"""
+User image counters repository.
+
+This module keeps the per-user gallery counters in UserImageCounts. An
+after_flush hook turns every inserted, deleted, liked or status-changed
+GeneratedImage into counter deltas and upserts them in the same
+transaction, so the counters follow the images whichever code path wrote
+them. The repositories read the counters and rebuild them from
+generated_images when they drift, e.g. after bulk SQL.
+"""
+
+from collections import defaultdict
+from typing import Optional, cast
+
+from db import AsyncSession, Session
+from enums import ImageStatus
+from models import GeneratedImage, UserImageCounts
+from sqlalchemy import CursorResult, case, delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import InstanceState, UOWTransaction
+
+COUNTERS = ("total", "favourites", "completed")
+
+# attribute, counter position and whether a value is counted
+TRACKED = (
+    ("liked", 1, lambda value: value is True),
+    ("status", 2, lambda value: value == ImageStatus.COMPLETED),
+)
+
+
+def _contribution(image: GeneratedImage, stored: bool = False) -> list[int]:
+    contribution = [1, 0, 0]
+    state: InstanceState = inspect(image)
+    for name, position, counted in TRACKED:
+        value = getattr(image, name)
+        history = state.attrs[name].history
+        if stored and history.deleted:
+            # a deleted row counts with its values as last written
+            value = history.deleted[0]
+        contribution[position] = int(counted(value))
+    return contribution
+
+
+def _changes(image: GeneratedImage) -> list[int]:
+    change = [0, 0, 0]
+    state: InstanceState = inspect(image)
+    for name, position, counted in TRACKED:
+        history = state.attrs[name].history
+        if not history.has_changes():
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        change[position] = int(counted(new)) - int(counted(old))
+    return change
+
+
+def _upsert(session: Session, user_id: int, deltas: list[int]) -> None:
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    values = dict(zip(COUNTERS, deltas))
+    statement = insert(UserImageCounts).values(user_id=user_id, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserImageCounts.user_id],
+        set_={
+            name: getattr(UserImageCounts, name) + getattr(statement.excluded, name)
+            for name in COUNTERS
+        },
+    )
+    session.execute(statement)
+
+
+@event.listens_for(Session, "after_flush")
+def track_image_counts(session: Session, flush_context: UOWTransaction) -> None:
+    """Apply the counter changes of a flush within its transaction."""
+    deltas: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def add(user_id: int, change: list[int], sign: int = 1) -> None:
+        deltas[user_id] = [a + sign * b for a, b in zip(deltas[user_id], change)]
+
+    for obj in session.new:
+        if isinstance(obj, GeneratedImage):
+            add(obj.user_id, _contribution(obj))
+
+    for obj in session.deleted:
+        if isinstance(obj, GeneratedImage):
+            add(obj.user_id, _contribution(obj, stored=True), sign=-1)
+
+    for obj in session.dirty:
+        if isinstance(obj, GeneratedImage) and obj not in session.deleted:
+            add(obj.user_id, _changes(obj))
+
+    for user_id, change in deltas.items():
+        if any(change):
+            _upsert(session, user_id, change)
+
+
+class ImageCountsRepository:
+    """Repository for reading and repairing per-user image counters."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_counts(self, user_id: int) -> UserImageCounts:
+        """
+        Retrieve the counters of a user.
+
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            UserImageCounts: The counters, zero for users without images.
+        """
+        counts = self.db.get(UserImageCounts, user_id, populate_existing=True)
+        return counts or UserImageCounts(
+            user_id=user_id, total=0, favourites=0, completed=0
+        )
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Recount the counters from generated_images.
+
+        Args:
+            user_id (Optional[int]): Only rebuild this user's counters.
+                Defaults to every user.
+
+        Returns:
+            int: Number of users whose counters were written.
+        """
+        aggregate = select(
+            GeneratedImage.user_id,
+            func.count(GeneratedImage.id),
+            func.sum(case((GeneratedImage.liked.is_(True), 1), else_=0)),
+            func.sum(
+                case((GeneratedImage.status == ImageStatus.COMPLETED, 1), else_=0)
+            ),
+        ).group_by(GeneratedImage.user_id)
+
+        clear = delete(UserImageCounts)
+        if user_id is not None:
+            aggregate = aggregate.where(GeneratedImage.user_id == user_id)
+            clear = clear.where(UserImageCounts.user_id == user_id)
+
+        self.db.execute(clear)
+        result = cast(
+            CursorResult,
+            self.db.execute(
+                UserImageCounts.__table__.insert().from_select(
+                    ["user_id", *COUNTERS], aggregate
+                )
+            ),
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncImageCountsRepository:
+    """Async counterpart of ImageCountsRepository for request handlers."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_counts(self, user_id: int) -> UserImageCounts:
+        """
+        Retrieve the counters of a user.
+
+        Args:
+            user_id (int): ID of the user.
+
+        Returns:
+            UserImageCounts: The counters, zero for users without images.
+        """
+        counts = await self.db.get(UserImageCounts, user_id, populate_existing=True)
+        return counts or UserImageCounts(
+            user_id=user_id, total=0, favourites=0, completed=0
+        )
@@ -2,15 +2,17 @@
 Generated image repository for database operations.
 
 This module provides data access layer for GeneratedImage model operations
-including creation, updates, and retrieval of image generation records.
+including creation, updates, and retrieval of image generation records,
+with an async variant for request handlers.
 """
 
+import datetime
 from typing import List, Optional
 
-from db import Session
-from enums import ImageStatus
-from models import GeneratedImage
-from sqlalchemy import func
+from db import AsyncSession, Session
+from enums import ImageStatus, JobStatus
+from models import GeneratedImage, GenerationJob
+from sqlalchemy import and_, exists, func, or_, select
 from sqlalchemy.orm import joinedload
 
 
@@ -131,6 +133,58 @@ class GeneratedImageRepository:
             self.db.query(GeneratedImage).filter(GeneratedImage.id == image_id).first()
         )
 
+    @staticmethod
+    def _orphaned(before: datetime.datetime):
+        # unfinished, old enough, and no job left that could finish it
+        return and_(
+            GeneratedImage.status.in_((ImageStatus.PENDING, ImageStatus.PROCESSING)),
+            GeneratedImage.created_at < before,
+            ~exists().where(
+                GenerationJob.image_id == GeneratedImage.id,
+                GenerationJob.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)),
+            ),
+        )
+
+    def get_orphaned_ids(self, before: datetime.datetime, limit: int) -> List[int]:
+        """
+        Find images stuck unfinished without a queued or running job.
+
+        Args:
+            before (datetime.datetime): Only images created before this.
+            limit (int): Maximum number of images to return.
+
+        Returns:
+            List[int]: IDs of the orphaned images, oldest first.
+        """
+        return list(
+            self.db.scalars(
+                select(GeneratedImage.id)
+                .where(self._orphaned(before))
+                .order_by(GeneratedImage.created_at)
+                .limit(limit)
+            )
+        )
+
+    def lock_orphaned(
+        self, image_id: int, before: datetime.datetime
+    ) -> Optional[GeneratedImage]:
+        """
+        Lock an image for closing if it is still orphaned.
+
+        Args:
+            image_id (int): ID of the image.
+            before (datetime.datetime): Cut-off used to find the image.
+
+        Returns:
+            Optional[GeneratedImage]: The locked image, or None if a job
+                picked it up or it finished in the meantime.
+        """
+        return self.db.scalar(
+            select(GeneratedImage)
+            .where(GeneratedImage.id == image_id, self._orphaned(before))
+            .with_for_update(skip_locked=True)
+        )
+
     def get_image_by_user_and_id(
         self, user_id: int, image_id: int
     ) -> Optional[GeneratedImage]:
@@ -179,7 +233,7 @@ class GeneratedImageRepository:
         )
 
         if favourites:
-            query = query.filter(GeneratedImage.liked == favourites)
+            query = query.filter(GeneratedImage.liked.is_(True))
 
         if sort_desc:
             query = query.order_by(GeneratedImage.created_at.desc())
@@ -272,3 +326,168 @@ class GeneratedImageRepository:
         self.db.commit()
         self.db.refresh(image)
         return image
+
+
+class AsyncGeneratedImageRepository:
+    """Async repository for GeneratedImage operations on the request path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_image_object(
+        self,
+        user_id: int,
+        style_id: int,
+        output_image_url: str | None,
+        input_image_url: str,
+        description: str = "",
+        commit: bool = True,
+    ) -> GeneratedImage:
+        """
+        Create a new image object in the database.
+
+        Args:
+            user_id (int): ID of the user who owns the image.
+            style_id (int): ID of the style applied to the image.
+            output_image_url (str | None): URL of the generated image.
+            input_image_url (str): URL of the input image.
+            description (str): Description copied from the style.
+            commit (bool): Commit immediately, False only flushes so the
+                image is written together with its queued job.
+
+        Returns:
+            GeneratedImage: The created image object.
+        """
+        new_image = GeneratedImage(
+            user_id=user_id,
+            style_id=style_id,
+            output_image_url=output_image_url,
+            input_image_url=input_image_url,
+            description=description,
+        )
+        self.db.add(new_image)
+        if commit:
+            await self.db.commit()
+            await self.db.refresh(new_image)
+        else:
+            await self.db.flush()
+        return new_image
+
+    async def get_image_by_user_and_id(
+        self, user_id: int, image_id: int
+    ) -> Optional[GeneratedImage]:
+        """Retrieve an image object by its ID and user ID.
+
+        Args:
+            user_id (int): ID of the user who owns the image.
+            image_id (int): ID of the image to retrieve.
+
+        Returns:
+            Optional[GeneratedImage]: The retrieved image object, or None if not found.
+        """
+        return await self.db.scalar(
+            select(GeneratedImage).where(
+                GeneratedImage.id == image_id,
+                GeneratedImage.user_id == user_id,
+            )
+        )
+
+    async def get_images_by_user_id(
+        self,
+        user_id: int,
+        page: int = 1,
+        limit: int = 10,
+        sort_desc: bool = True,
+        favourites: bool = False,
+        after: Optional[tuple[datetime.datetime, int]] = None,
+        lookahead: int = 0,
+    ) -> List[GeneratedImage]:
+        """
+        Retrieve images by user ID with pagination.
+
+        Images are ordered by creation time, then ID. With ``after`` set the
+        page starts right behind that position (keyset pagination) and
+        ``page`` is ignored, so deep pages cost as much as the first one.
+
+        Args:
+            user_id (int): ID of the user who owns the images.
+            page (int): Page number for pagination. Defaults to 1.
+            limit (int): Number of images per page. Defaults to 10.
+            sort_desc (bool): Whether to sort in descending order. Defaults to True.
+            favourites (bool): If True, fetch only favourite images. Defaults to False.
+            after (Optional[tuple[datetime.datetime, int]]): Creation time and
+                ID of the last image of the previous page.
+            lookahead (int): Extra rows to fetch past the page, so callers can
+                tell whether another page follows without counting.
+
+        Returns:
+            List[GeneratedImage]: List of images with their style loaded.
+        """
+        query = (
+            select(GeneratedImage)
+            .options(joinedload(GeneratedImage.style))
+            .where(GeneratedImage.user_id == user_id)
+        )
+
+        if favourites:
+            # a literal IS TRUE lets the partial favourites index match
+            query = query.where(GeneratedImage.liked.is_(True))
+
+        if sort_desc:
+            query = query.order_by(
+                GeneratedImage.created_at.desc(), GeneratedImage.id.desc()
+            )
+        else:
+            query = query.order_by(
+                GeneratedImage.created_at.asc(), GeneratedImage.id.asc()
+            )
+
+        if after is None:
+            query = query.offset((page - 1) * limit)
+        else:
+            created_at, image_id = after
+            if sort_desc:
+                query = query.where(
+                    or_(
+                        GeneratedImage.created_at < created_at,
+                        and_(
+                            GeneratedImage.created_at == created_at,
+                            GeneratedImage.id < image_id,
+                        ),
+                    )
+                )
+            else:
+                query = query.where(
+                    or_(
+                        GeneratedImage.created_at > created_at,
+                        and_(
+                            GeneratedImage.created_at == created_at,
+                            GeneratedImage.id > image_id,
+                        ),
+                    )
+                )
+
+        return list(await self.db.scalars(query.limit(limit + lookahead)))
+
+    async def like_image(
+        self, user_id: int, image_id: int, liked: bool
+    ) -> Optional[GeneratedImage]:
+        """
+        Like or unlike an image.
+
+        Args:
+            user_id (int): ID of the user who owns the image.
+            image_id (int): ID of the image to like or unlike.
+            liked (bool): True to like the image, False to unlike.
+
+        Returns:
+            Optional[GeneratedImage]: The updated image object, or None if not found.
+        """
+        image = await self.get_image_by_user_and_id(user_id=user_id, image_id=image_id)
+        if not image:
+            return None
+
+        image.liked = liked
+
+        await self.db.commit()
+        return image
@@ -0,0 +1,393 @@
+"""
+Generation job repository for database operations.
+
+This module provides data access layer for the durable generation job
+queue including enqueueing, lease based claiming and completion.
+"""
+
+import datetime
+from typing import Optional
+
+from core.stage_timings import merge_stages
+from db import AsyncSession, Session
+from enums import JobKind, JobStatus
+from models import GenerationJob
+from sqlalchemy import and_, func, or_, select
+from utils import utcnow
+
+
+class JobRepository:
+    """Repository for managing GenerationJob entities in the database."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_job_by_id(self, job_id: int) -> Optional[GenerationJob]:
+        """
+        Retrieve a job by its ID.
+
+        Args:
+            job_id (int): ID of the job to retrieve.
+
+        Returns:
+            Optional[GenerationJob]: The job, or None if not found.
+        """
+        return self.db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+
+    def claim_next(
+        self,
+        worker_id: str,
+        lease_seconds: int,
+        max_attempts: int,
+        max_running: int = 0,
+    ) -> Optional[GenerationJob]:
+        """
+        Claim the oldest runnable job for a worker.
+
+        A job is runnable when it is queued, or when it is running under a
+        lease that has expired because its worker died. The claim is a
+        guarded UPDATE so two workers can never hold the same job, even on
+        databases without row locks.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker.
+            lease_seconds (int): How long the claim is valid without renewal.
+            max_attempts (int): Jobs claimed this many times are not retried.
+            max_running (int): Claim nothing while this many jobs hold a live
+                lease across all workers, 0 for no limit. Workers claiming at
+                the same instant may overshoot it by one job each.
+
+        Returns:
+            Optional[GenerationJob]: The claimed job, or None if the queue is
+                empty or saturated.
+        """
+        now = utcnow()
+        if max_running and self._count_running(now) >= max_running:
+            self.db.rollback()
+            return None
+
+        runnable = and_(
+            GenerationJob.attempts < max_attempts,
+            or_(
+                GenerationJob.status == JobStatus.QUEUED,
+                and_(
+                    GenerationJob.status == JobStatus.RUNNING,
+                    GenerationJob.lease_expires_at < now,
+                ),
+            ),
+        )
+
+        candidate = (
+            self.db.query(GenerationJob.id)
+            .filter(runnable)
+            .order_by(GenerationJob.id.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar()
+        )
+        if candidate is None:
+            self.db.rollback()
+            return None
+
+        claimed = (
+            self.db.query(GenerationJob)
+            .filter(GenerationJob.id == candidate, runnable)
+            .update(
+                {
+                    GenerationJob.status: JobStatus.RUNNING,
+                    GenerationJob.worker_id: worker_id,
+                    GenerationJob.lease_expires_at: now
+                    + datetime.timedelta(seconds=lease_seconds),
+                    GenerationJob.attempts: GenerationJob.attempts + 1,
+                    GenerationJob.started_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+
+        if not claimed:
+            # another worker won the race for this row
+            return None
+        return self.get_job_by_id(candidate)
+
+    def extend_lease(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Renew the lease on a running job.
+
+        Args:
+            job_id (int): ID of the job.
+            worker_id (str): Worker that must currently own the lease.
+            lease_seconds (int): New lease duration from now.
+
+        Returns:
+            bool: False if the worker no longer owns the job.
+        """
+        renewed = (
+            self.db.query(GenerationJob)
+            .filter(
+                GenerationJob.id == job_id,
+                GenerationJob.worker_id == worker_id,
+                GenerationJob.status == JobStatus.RUNNING,
+            )
+            .update(
+                {
+                    GenerationJob.lease_expires_at: utcnow()
+                    + datetime.timedelta(seconds=lease_seconds)
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return bool(renewed)
+
+    def finish(
+        self, job_id: int, status: JobStatus, error: Optional[str] = None
+    ) -> None:
+        """
+        Mark a job as completed or failed and release its lease.
+
+        Args:
+            job_id (int): ID of the job.
+            status (JobStatus): Final status of the job.
+            error (Optional[str]): Error message for failed jobs.
+        """
+        self.db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+            {
+                GenerationJob.status: status,
+                GenerationJob.last_error: error,
+                GenerationJob.lease_expires_at: None,
+                GenerationJob.finished_at: utcnow(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def finish_running(
+        self,
+        job_id: int,
+        status: JobStatus,
+        error: Optional[str] = None,
+        commit: bool = True,
+    ) -> bool:
+        """
+        Finish a job unless something else finished it first.
+
+        Args:
+            job_id (int): ID of the job.
+            status (JobStatus): Final status of the job.
+            error (Optional[str]): Error message for failed jobs.
+            commit (bool): Commit immediately, False leaves the update in
+                the session's transaction.
+
+        Returns:
+            bool: True if this call moved the job out of RUNNING.
+        """
+        finished = (
+            self.db.query(GenerationJob)
+            .filter(
+                GenerationJob.id == job_id,
+                GenerationJob.status == JobStatus.RUNNING,
+            )
+            .update(
+                {
+                    GenerationJob.status: status,
+                    GenerationJob.last_error: error,
+                    GenerationJob.lease_expires_at: None,
+                    GenerationJob.finished_at: utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        if commit:
+            self.db.commit()
+        return bool(finished)
+
+    def record_stages(
+        self, job_id: int, stage_ms: dict[str, int], commit: bool = True
+    ) -> None:
+        """
+        Merge stage durations into those already recorded for a job.
+
+        The worker and the completions of a job's predictions each record
+        their own stages, a stage recorded twice keeps the slower duration.
+
+        Args:
+            job_id (int): ID of the job.
+            stage_ms (dict[str, int]): Milliseconds spent per stage.
+            commit (bool): Commit immediately, False leaves the update in
+                the session's transaction.
+        """
+        if not stage_ms:
+            return
+        job = self.db.scalar(
+            select(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        if job is None:
+            return
+        job.stage_ms = merge_stages(job.stage_ms, stage_ms)
+        if commit:
+            self.db.commit()
+
+    def get_exhausted(
+        self, now: datetime.datetime, max_attempts: int, limit: int
+    ) -> list[GenerationJob]:
+        """
+        Find running jobs that lost their lease and will not be retried.
+
+        Args:
+            now (datetime.datetime): Current time.
+            max_attempts (int): Jobs claimed this many times are not retried.
+            limit (int): Maximum number of jobs to return.
+
+        Returns:
+            list[GenerationJob]: The exhausted jobs, oldest first.
+        """
+        return (
+            self.db.query(GenerationJob)
+            .filter(
+                GenerationJob.status == JobStatus.RUNNING,
+                GenerationJob.lease_expires_at < now,
+                GenerationJob.attempts >= max_attempts,
+            )
+            .order_by(GenerationJob.id.asc())
+            .limit(limit)
+            .all()
+        )
+
+    def _count_running(self, now: datetime.datetime) -> int:
+        return (
+            self.db.query(func.count(GenerationJob.id))
+            .filter(
+                GenerationJob.status == JobStatus.RUNNING,
+                GenerationJob.lease_expires_at >= now,
+            )
+            .scalar()
+        )
+
+    def count_queued(self) -> int:
+        """
+        Count the jobs waiting for a worker.
+
+        Returns:
+            int: Number of queued jobs.
+        """
+        return (
+            self.db.query(func.count(GenerationJob.id))
+            .filter(GenerationJob.status == JobStatus.QUEUED)
+            .scalar()
+        )
+
+
+class AsyncJobRepository:
+    """Async repository used by request handlers to enqueue jobs."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(
+        self,
+        image_id: int,
+        kind: JobKind,
+        view: Optional[str] = None,
+        reservation_id: Optional[int] = None,
+        credits: int = 0,
+        commit: bool = True,
+    ) -> GenerationJob:
+        """
+        Add a new job to the queue.
+
+        Args:
+            image_id (int): ID of the image the job works on.
+            kind (JobKind): Kind of generation to run.
+            view (Optional[str]): Side view to generate for VIEW jobs.
+            reservation_id (Optional[int]): Credit reservation the job spends.
+            credits (int): Share of the reservation held by the job.
+            commit (bool): Commit immediately, False only flushes so several
+                jobs and their reservation are written in one transaction.
+
+        Returns:
+            GenerationJob: The queued job.
+        """
+        job = GenerationJob(
+            image_id=image_id,
+            kind=kind,
+            view=view,
+            status=JobStatus.QUEUED,
+            reservation_id=reservation_id,
+            credits=credits,
+            created_at=utcnow(),
+        )
+        self.db.add(job)
+        if commit:
+            await self.db.commit()
+            await self.db.refresh(job)
+        else:
+            await self.db.flush()
+        return job
+
+    async def count_queued(self) -> int:
+        """
+        Count the jobs waiting for a worker.
+
+        Returns:
+            int: Number of queued jobs.
+        """
+        count = await self.db.scalar(
+            select(func.count(GenerationJob.id)).where(
+                GenerationJob.status == JobStatus.QUEUED
+            )
+        )
+        return count or 0
+
+    async def get_queue_stats(self) -> dict:
+        """
+        Summarize the backlog of the queue.
+
+        Returns:
+            dict: Queued and running job counts, and how long the oldest
+                queued job has waited in seconds.
+        """
+        now = utcnow()
+        queued, oldest = (
+            await self.db.execute(
+                select(
+                    func.count(GenerationJob.id), func.min(GenerationJob.created_at)
+                ).where(GenerationJob.status == JobStatus.QUEUED)
+            )
+        ).one()
+        running = await self.db.scalar(
+            select(func.count(GenerationJob.id)).where(
+                GenerationJob.status == JobStatus.RUNNING,
+                GenerationJob.lease_expires_at >= now,
+            )
+        )
+        return {
+            "queued": queued,
+            "running": running or 0,
+            "oldest_wait_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+        }
+
+    async def get_recent_stages(self, limit: int) -> list[dict]:
+        """
+        Stage durations of the most recently finished jobs.
+
+        Args:
+            limit (int): Maximum number of jobs to return.
+
+        Returns:
+            list[dict]: Milliseconds spent per stage, one dict per job.
+        """
+        rows = await self.db.scalars(
+            select(GenerationJob.stage_ms)
+            .where(
+                GenerationJob.finished_at.is_not(None),
+                GenerationJob.stage_ms.is_not(None),
+            )
+            .order_by(GenerationJob.id.desc())
+            .limit(limit)
+        )
+        return list(rows)
@@ -0,0 +1,253 @@
+"""
+Replicate prediction repository.
+
+This module tracks the predictions of generation jobs that complete
+through webhooks. A completion is claimed by moving its row out of
+PENDING in a single conditional update, so a webhook delivered twice, or
+racing the polling fallback, stores the output once.
+"""
+
+import datetime
+from typing import Optional, cast
+
+from db import Session
+from enums import PredictionStatus
+from models import ReplicatePrediction
+from sqlalchemy import CursorResult, func, select, update
+from utils import utcnow
+
+# outcomes a re-dispatched job keeps instead of predicting again
+RESOLVED = (
+    PredictionStatus.SUCCEEDED,
+    PredictionStatus.FAILED,
+    PredictionStatus.CACHED,
+)
+
+
+class PredictionRepository:
+    """Repository for the predictions of webhook-driven generation jobs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(
+        self,
+        prediction_id: str,
+        job_id: int,
+        view: Optional[str],
+        cache_key: Optional[str],
+        status: PredictionStatus = PredictionStatus.PENDING,
+        commit: bool = True,
+    ) -> ReplicatePrediction:
+        """
+        Record a prediction created for a job, or an output it reused.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+            job_id (int): ID of the job waiting on the prediction.
+            view (Optional[str]): Side view produced, None for the main image.
+            cache_key (Optional[str]): Key to store the output under.
+            status (PredictionStatus): PENDING, or CACHED for a cache hit.
+            commit (bool): Commit immediately.
+
+        Returns:
+            ReplicatePrediction: The recorded prediction.
+        """
+        prediction = ReplicatePrediction(
+            id=prediction_id,
+            job_id=job_id,
+            view=view,
+            cache_key=cache_key,
+            status=status,
+            completed_at=None if status == PredictionStatus.PENDING else utcnow(),
+        )
+        self.db.add(prediction)
+        if commit:
+            self.db.commit()
+        return prediction
+
+    def get(self, prediction_id: str) -> Optional[ReplicatePrediction]:
+        """
+        Retrieve a prediction by its ID.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+
+        Returns:
+            Optional[ReplicatePrediction]: The prediction, or None.
+        """
+        return self.db.get(ReplicatePrediction, prediction_id)
+
+    def claim(self, prediction_id: str) -> bool:
+        """
+        Take a pending prediction to store its output.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+
+        Returns:
+            bool: False if the prediction is no longer pending.
+        """
+        claimed = cast(
+            CursorResult,
+            self.db.execute(
+                update(ReplicatePrediction)
+                .where(
+                    ReplicatePrediction.id == prediction_id,
+                    ReplicatePrediction.status == PredictionStatus.PENDING,
+                )
+                .values(status=PredictionStatus.COMPLETING)
+            ),
+        ).rowcount
+        self.db.commit()
+        return bool(claimed)
+
+    def release(self, prediction_id: str) -> None:
+        """
+        Hand a claimed prediction back after its completion failed.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+        """
+        self.db.execute(
+            update(ReplicatePrediction)
+            .where(
+                ReplicatePrediction.id == prediction_id,
+                ReplicatePrediction.status == PredictionStatus.COMPLETING,
+            )
+            .values(status=PredictionStatus.PENDING)
+        )
+        self.db.commit()
+
+    def resolve(
+        self, prediction_id: str, status: PredictionStatus, commit: bool = True
+    ) -> None:
+        """
+        Record the outcome of a claimed prediction.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+            status (PredictionStatus): SUCCEEDED, FAILED or ABANDONED.
+            commit (bool): Commit immediately, False leaves the update in
+                the transaction storing the output.
+        """
+        self.db.execute(
+            update(ReplicatePrediction)
+            .where(ReplicatePrediction.id == prediction_id)
+            .values(status=status, completed_at=utcnow())
+        )
+        if commit:
+            self.db.commit()
+
+    def get_pending(self, job_id: int) -> list[ReplicatePrediction]:
+        """
+        Retrieve the pending predictions of a job.
+
+        Args:
+            job_id (int): ID of the job.
+
+        Returns:
+            list[ReplicatePrediction]: Predictions awaiting their completion.
+        """
+        return list(
+            self.db.scalars(
+                select(ReplicatePrediction).where(
+                    ReplicatePrediction.job_id == job_id,
+                    ReplicatePrediction.status == PredictionStatus.PENDING,
+                )
+            )
+        )
+
+    def abandon(self, prediction_ids: list[str]) -> None:
+        """
+        Give up on pending predictions.
+
+        Args:
+            prediction_ids (list[str]): IDs of the predictions.
+        """
+        if prediction_ids:
+            # a completion claimed in between keeps its row
+            self.db.execute(
+                update(ReplicatePrediction)
+                .where(
+                    ReplicatePrediction.id.in_(prediction_ids),
+                    ReplicatePrediction.status == PredictionStatus.PENDING,
+                )
+                .values(status=PredictionStatus.ABANDONED, completed_at=utcnow())
+            )
+        self.db.commit()
+
+    def abandon_pending(self, job_id: int) -> list[str]:
+        """
+        Give up on the pending predictions of a job.
+
+        Args:
+            job_id (int): ID of the job.
+
+        Returns:
+            list[str]: IDs of the abandoned predictions, to cancel on Replicate.
+        """
+        prediction_ids = [prediction.id for prediction in self.get_pending(job_id)]
+        self.abandon(prediction_ids)
+        return prediction_ids
+
+    def resolved_views(self, job_id: int) -> set[Optional[str]]:
+        """
+        Outputs of a job that are already settled.
+
+        Args:
+            job_id (int): ID of the job.
+
+        Returns:
+            set[Optional[str]]: Views with a final outcome, None standing
+                for the main image.
+        """
+        return set(
+            self.db.scalars(
+                select(ReplicatePrediction.view).where(
+                    ReplicatePrediction.job_id == job_id,
+                    ReplicatePrediction.status.in_(RESOLVED),
+                )
+            )
+        )
+
+    def count_by_status(self, job_id: int) -> dict[PredictionStatus, int]:
+        """
+        Count the predictions of a job per status.
+
+        Args:
+            job_id (int): ID of the job.
+
+        Returns:
+            dict[PredictionStatus, int]: Number of predictions per status.
+        """
+        rows = self.db.execute(
+            select(ReplicatePrediction.status, func.count())
+            .where(ReplicatePrediction.job_id == job_id)
+            .group_by(ReplicatePrediction.status)
+        ).all()
+        return {status: count for status, count in rows}
+
+    def get_overdue(self, before: datetime.datetime, limit: int) -> list[str]:
+        """
+        Pending predictions whose webhook should have arrived by now.
+
+        Args:
+            before (datetime.datetime): Predictions created before this are
+                overdue.
+            limit (int): Maximum number of predictions to return.
+
+        Returns:
+            list[str]: IDs of the overdue predictions, oldest first.
+        """
+        return list(
+            self.db.scalars(
+                select(ReplicatePrediction.id)
+                .where(
+                    ReplicatePrediction.status == PredictionStatus.PENDING,
+                    ReplicatePrediction.created_at < before,
+                )
+                .order_by(ReplicatePrediction.created_at)
+                .limit(limit)
+            )
+        )
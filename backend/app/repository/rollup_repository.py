@@ -0,0 +1,349 @@
+"""
+Generation analytics rollup repository.
+
+This module keeps GenerationRollup, one row of aggregates per day, style
+and final status of generated images, so analytics never scan
+generated_images. A refresh folds only the images past a watermark, and
+stops at the first one not settled yet so the watermark never skips a row.
+Likes keep changing after an image is folded, so an after_flush hook
+applies them to the image's rollup in the same transaction, the way the
+per-user counters are kept. Later status or time_taken changes of a folded
+image, e.g. side views generated days after it, are not reflected.
+"""
+
+import bisect
+import datetime
+from collections import defaultdict
+from typing import Iterable, Optional, cast
+
+from db import AsyncSession, Session
+from enums import ImageStatus
+from models import GeneratedImage, GenerationRollup, RollupWatermark
+from sqlalchemy import CursorResult, event, exists, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import InstanceState, UOWTransaction
+
+# watermark of generated_images in rollup_watermarks
+WATERMARK = "generation_rollups"
+
+# upper bounds in seconds of the time_taken histogram slots
+TIME_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+
+SETTLED = (ImageStatus.COMPLETED, ImageStatus.FAILED)
+
+
+def empty_histogram() -> list[int]:
+    """Histogram of no time at all, with a slot past the last bound."""
+    return [0] * (len(TIME_BUCKETS) + 1)
+
+
+def histogram_percentile(
+    histogram: list[int], quantile: float, maximum: Optional[float]
+) -> Optional[float]:
+    """
+    Estimate a percentile of time_taken from a rollup histogram.
+
+    Args:
+        histogram (list[int]): Counts per TIME_BUCKETS slot.
+        quantile (float): Quantile between 0 and 1, e.g. 0.95.
+        maximum (Optional[float]): Largest time counted, bounds the estimate.
+
+    Returns:
+        Optional[float]: Upper bound of the slot holding the percentile, or
+            None for an empty histogram.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = quantile * total
+    seen = 0
+    for slot, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            bound = TIME_BUCKETS[slot] if slot < len(TIME_BUCKETS) else maximum
+            if bound is None or maximum is None:
+                return bound
+            return min(float(bound), maximum)
+    return maximum
+
+
+class _Aggregate:
+    """Running aggregates of the images folded into one rollup row."""
+
+    def __init__(self):
+        self.images = 0
+        self.liked = 0
+        self.timed = 0
+        self.time_sum = 0.0
+        self.time_min: Optional[float] = None
+        self.time_max: Optional[float] = None
+        self.time_histogram = empty_histogram()
+
+    def add(self, image: GeneratedImage) -> None:
+        self.images += 1
+        self.liked += int(image.liked is True)
+        seconds = image.time_taken
+        if seconds is None:
+            return
+        self.timed += 1
+        self.time_sum += seconds
+        self.time_min = (
+            seconds if self.time_min is None else min(self.time_min, seconds)
+        )
+        self.time_max = (
+            seconds if self.time_max is None else max(self.time_max, seconds)
+        )
+        self.time_histogram[bisect.bisect_left(TIME_BUCKETS, seconds)] += 1
+
+
+def summarize_rollups(rollups: Iterable[GenerationRollup]) -> dict:
+    """
+    Combine rollups of any days and styles.
+
+    Args:
+        rollups (Iterable[GenerationRollup]): Rollups to combine.
+
+    Returns:
+        dict: Image counts, failure and like rates, and time_taken
+            statistics of the completed images, in seconds.
+    """
+    images = completed = failed = liked = timed = 0
+    time_sum = 0.0
+    time_min: Optional[float] = None
+    time_max: Optional[float] = None
+    histogram = empty_histogram()
+
+    for rollup in rollups:
+        images += rollup.images
+        if rollup.status == ImageStatus.FAILED:
+            failed += rollup.images
+            continue
+        completed += rollup.images
+        liked += rollup.liked
+        if not rollup.timed:
+            continue
+        timed += rollup.timed
+        time_sum += rollup.time_sum
+        time_min = _bounded(time_min, rollup.time_min, min)
+        time_max = _bounded(time_max, rollup.time_max, max)
+        histogram = [a + b for a, b in zip(histogram, rollup.time_histogram)]
+
+    return {
+        "images": images,
+        "completed": completed,
+        "failed": failed,
+        "failure_rate": failed / images if images else 0.0,
+        "like_rate": liked / completed if completed else 0.0,
+        "avg_time_taken": time_sum / timed if timed else None,
+        "min_time_taken": time_min,
+        "max_time_taken": time_max,
+        "p95_time_taken": histogram_percentile(histogram, 0.95, time_max),
+    }
+
+
+def _bounded(current: Optional[float], new: Optional[float], pick) -> Optional[float]:
+    if current is None or new is None:
+        return new if current is None else current
+    return pick(current, new)
+
+
+@event.listens_for(Session, "after_flush")
+def track_rollup_likes(session: Session, flush_context: UOWTransaction) -> None:
+    """Apply like changes of already folded images to their rollups."""
+    for obj in session.dirty:
+        if not isinstance(obj, GeneratedImage) or obj in session.deleted:
+            continue
+        state: InstanceState = inspect(obj)
+        history = state.attrs.liked.history
+        if not history.has_changes():
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        change = int(new is True) - int(old is True)
+        if not change or obj.status not in SETTLED:
+            continue
+
+        # matches nothing until the refresh has folded the image
+        folded = exists().where(
+            RollupWatermark.name == WATERMARK, RollupWatermark.last_id >= obj.id
+        )
+        session.execute(
+            update(GenerationRollup)
+            .where(
+                GenerationRollup.day == obj.created_at.date(),
+                GenerationRollup.style_id == obj.style_id,
+                GenerationRollup.status == obj.status,
+                folded,
+            )
+            .values(liked=GenerationRollup.liked + change)
+        )
+
+
+class RollupRepository:
+    """Repository folding generated images into their rollups."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_watermark(self) -> int:
+        """
+        ID of the last generated image folded into the rollups.
+
+        Returns:
+            int: The watermark, 0 before the first refresh.
+        """
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        self.db.execute(
+            insert(RollupWatermark)
+            .values(name=WATERMARK, last_id=0)
+            .on_conflict_do_nothing(index_elements=[RollupWatermark.name])
+        )
+        return (
+            self.db.scalar(
+                select(RollupWatermark.last_id).where(RollupWatermark.name == WATERMARK)
+            )
+            or 0
+        )
+
+    def get_settled_after(
+        self, last_id: int, limit: int
+    ) -> tuple[list[GeneratedImage], bool]:
+        """
+        Settled generated images past the watermark, in ID order.
+
+        The images stop before the first one still pending or processing,
+        which holds the watermark until it settles. The rows are
+        share-locked on PostgreSQL, so a like committed while they are
+        folded waits and then finds the watermark moved.
+
+        Args:
+            last_id (int): The watermark.
+            limit (int): Maximum number of images to read.
+
+        Returns:
+            tuple[list[GeneratedImage], bool]: The images, oldest first, and
+                whether no settled image is left past them.
+        """
+        images = list(
+            self.db.scalars(
+                select(GeneratedImage)
+                .where(GeneratedImage.id > last_id)
+                .order_by(GeneratedImage.id)
+                .limit(limit)
+                .with_for_update(read=True)
+            )
+        )
+        for position, image in enumerate(images):
+            if image.status not in SETTLED:
+                return images[:position], True
+        return images, len(images) < limit
+
+    def fold(self, images: list[GeneratedImage], last_id: int) -> bool:
+        """
+        Add settled images to their rollups and move the watermark past them.
+
+        Args:
+            images (list[GeneratedImage]): Images read after the watermark,
+                oldest first.
+            last_id (int): The watermark they were read after.
+
+        Returns:
+            bool: False if another refresh moved the watermark first, in
+                which case nothing is written.
+        """
+        aggregates: dict[tuple, _Aggregate] = defaultdict(_Aggregate)
+        for image in images:
+            key = (image.created_at.date(), image.style_id, image.status)
+            aggregates[key].add(image)
+
+        moved = cast(
+            CursorResult,
+            self.db.execute(
+                update(RollupWatermark)
+                .where(
+                    RollupWatermark.name == WATERMARK,
+                    RollupWatermark.last_id == last_id,
+                )
+                .values(last_id=images[-1].id)
+            ),
+        ).rowcount
+        if not moved:
+            self.db.rollback()
+            return False
+
+        for (day, style_id, status), aggregate in aggregates.items():
+            rollup = self.db.get(
+                GenerationRollup,
+                (day, style_id, status),
+                with_for_update=True,
+                populate_existing=True,
+            )
+            if rollup is None:
+                self.db.add(
+                    GenerationRollup(
+                        day=day,
+                        style_id=style_id,
+                        status=status,
+                        images=aggregate.images,
+                        liked=aggregate.liked,
+                        timed=aggregate.timed,
+                        time_sum=aggregate.time_sum,
+                        time_min=aggregate.time_min,
+                        time_max=aggregate.time_max,
+                        time_histogram=aggregate.time_histogram,
+                    )
+                )
+                continue
+            rollup.images += aggregate.images
+            rollup.liked += aggregate.liked
+            rollup.timed += aggregate.timed
+            rollup.time_sum += aggregate.time_sum
+            rollup.time_min = _bounded(rollup.time_min, aggregate.time_min, min)
+            rollup.time_max = _bounded(rollup.time_max, aggregate.time_max, max)
+            rollup.time_histogram = [
+                a + b for a, b in zip(rollup.time_histogram, aggregate.time_histogram)
+            ]
+        self.db.commit()
+        return True
+
+
+class AsyncRollupRepository:
+    """Async repository reading the rollups for the analytics routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_rollups(
+        self,
+        since: datetime.date,
+        until: datetime.date,
+        style_id: Optional[int] = None,
+    ) -> list[GenerationRollup]:
+        """
+        Rollups of a range of days.
+
+        Args:
+            since (datetime.date): First day, inclusive.
+            until (datetime.date): Last day, inclusive.
+            style_id (Optional[int]): Only this style's rollups.
+
+        Returns:
+            list[GenerationRollup]: The rollups, by day.
+        """
+        query = select(GenerationRollup).where(
+            GenerationRollup.day >= since, GenerationRollup.day <= until
+        )
+        if style_id is not None:
+            query = query.where(GenerationRollup.style_id == style_id)
+        return list(await self.db.scalars(query.order_by(GenerationRollup.day)))
+
+    async def get_watermark(self) -> Optional[RollupWatermark]:
+        """
+        Watermark of the rollups, for their freshness.
+
+        Returns:
+            Optional[RollupWatermark]: The watermark, None before the first
+                refresh.
+        """
+        return await self.db.get(RollupWatermark, WATERMARK)
@@ -7,8 +7,9 @@ including retrieval of styles by ID and listing all available styles.
 
 from typing import List, Optional
 
-from db import Session
+from db import AsyncSession, Session
 from models import Styles
+from sqlalchemy import select
 
 
 class StyleRepository:
@@ -36,3 +37,30 @@ class StyleRepository:
             List[Styles]: The list of all available styles.
         """
         return self.db.query(Styles).all()
+
+
+class AsyncStyleRepository:
+    """Async repository for Styles reads on the request path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_style_by_id(self, style_id: int) -> Optional[Styles]:
+        """Retrieve a style object by its ID.
+
+        Args:
+            style_id (int): ID of the style to retrieve.
+
+        Returns:
+            Optional[Styles]: The retrieved style object, or None if not found.
+        """
+        return await self.db.get(Styles, style_id)
+
+    async def get_all_styles(self) -> List[Styles]:
+        """
+        Get all available styles.
+
+        Returns:
+            List[Styles]: The list of all available styles.
+        """
+        return list(await self.db.scalars(select(Styles)))
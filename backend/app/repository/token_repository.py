@@ -12,10 +12,13 @@ __version__ = "0.1.0"
 
 
 import datetime
+from typing import List, cast
 
 from db import Session
 from enums import TokenType
 from models import BlackListTokens
+from sqlalchemy import CursorResult, and_, delete, or_, select
+from utils import utcnow
 
 
 class TokenRepository:
@@ -43,6 +46,7 @@ class TokenRepository:
         jti: str,
         blacklisted_on: datetime.datetime | None = None,
         token_type: TokenType = TokenType.ACCESS,
+        expires_at: datetime.datetime | None = None,
     ) -> None:
         """
         Blacklist a token by its JWT ID.
@@ -50,13 +54,72 @@ class TokenRepository:
         Args:
             jti (str): The JWT ID of the token.
             blacklisted_on (datetime.datetime): The time the token was blacklisted.
+            token_type (TokenType): Kind of the token.
+            expires_at (datetime.datetime | None): Expiry of the token, after
+                which the row can be purged.
         """
         if blacklisted_on is None:
-            blacklisted_on = datetime.datetime.now(datetime.timezone.utc)
+            blacklisted_on = utcnow()
 
         blacklisted_token = BlackListTokens(
-            jti=jti, blacklisted_on=blacklisted_on, token_type=token_type
+            jti=jti,
+            blacklisted_on=blacklisted_on,
+            token_type=token_type,
+            expires_at=expires_at,
         )
         self.db.add(blacklisted_token)
         self.db.commit()
+
+    def get_active_jtis(
+        self, now: datetime.datetime, since: datetime.datetime | None = None
+    ) -> List[str]:
+        """
+        Retrieve the JWT IDs of blacklisted tokens that have not expired.
+
+        Args:
+            now (datetime.datetime): Current time, naive UTC.
+            since (datetime.datetime | None): Only tokens blacklisted at or
+                after this time. Defaults to all.
+
+        Returns:
+            List[str]: JWT IDs.
+        """
+        query = select(BlackListTokens.jti).where(
+            or_(BlackListTokens.expires_at.is_(None), BlackListTokens.expires_at > now)
+        )
+        if since is not None:
+            query = query.where(BlackListTokens.blacklisted_on >= since)
+        return list(self.db.scalars(query))
+
+    def purge_expired(
+        self, now: datetime.datetime, max_lifetime: datetime.timedelta
+    ) -> int:
+        """
+        Delete blacklisted tokens that expired.
+
+        Rows written before expiries were recorded are kept for the longest
+        token lifetime after they were blacklisted.
+
+        Args:
+            now (datetime.datetime): Current time, naive UTC.
+            max_lifetime (datetime.timedelta): Longest lifetime of any token.
+
+        Returns:
+            int: Number of deleted rows.
+        """
+        result = cast(
+            CursorResult,
+            self.db.execute(
+                delete(BlackListTokens).where(
+                    or_(
+                        BlackListTokens.expires_at <= now,
+                        and_(
+                            BlackListTokens.expires_at.is_(None),
+                            BlackListTokens.blacklisted_on < now - max_lifetime,
+                        ),
+                    )
+                )
+            ),
+        )
         self.db.commit()
+        return result.rowcount
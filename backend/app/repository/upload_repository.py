@@ -0,0 +1,96 @@
+"""
+User upload repository.
+
+This module records the distinct input images of each user in UserUpload.
+An after_flush hook upserts one row per new GeneratedImage in the same
+transaction, bumping the use count and last-used time of URLs seen before,
+so listing a user's uploads never aggregates their image history.
+"""
+
+import datetime
+from typing import List, Optional
+
+from db import AsyncSession, Session
+from models import GeneratedImage, UserUpload
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import UOWTransaction
+from utils import utcnow
+
+
+@event.listens_for(Session, "after_flush")
+def track_uploads(session: Session, flush_context: UOWTransaction) -> None:
+    """Record the input images of the images inserted by a flush."""
+    uses: dict[tuple[int, str], int] = {}
+    for obj in session.new:
+        if isinstance(obj, GeneratedImage):
+            key = (obj.user_id, obj.input_image_url)
+            uses[key] = uses.get(key, 0) + 1
+    if not uses:
+        return
+
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    now = utcnow()
+
+    for (user_id, input_image_url), count in uses.items():
+        statement = insert(UserUpload).values(
+            user_id=user_id,
+            input_image_url=input_image_url,
+            use_count=count,
+            last_used_at=now,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserUpload.user_id, UserUpload.input_image_url],
+            set_={
+                "use_count": UserUpload.use_count + statement.excluded.use_count,
+                "last_used_at": statement.excluded.last_used_at,
+            },
+        )
+        session.execute(statement)
+
+
+class AsyncUploadRepository:
+    """Async repository for reading the uploads of a user."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_recent_uploads(
+        self,
+        user_id: int,
+        limit: int = 5,
+        after: Optional[tuple[datetime.datetime, int]] = None,
+        lookahead: int = 0,
+    ) -> List[UserUpload]:
+        """
+        Retrieve the uploads of a user, most recently used first.
+
+        Args:
+            user_id (int): ID of the user.
+            limit (int): Number of uploads to retrieve. Defaults to 5.
+            after (Optional[tuple[datetime.datetime, int]]): Last-used time
+                and ID of the last upload of the previous page.
+            lookahead (int): Extra rows to fetch past the page, so callers can
+                tell whether another page follows.
+
+        Returns:
+            List[UserUpload]: The user's uploads.
+        """
+        query = (
+            select(UserUpload)
+            .where(UserUpload.user_id == user_id)
+            .order_by(UserUpload.last_used_at.desc(), UserUpload.id.desc())
+        )
+        if after is not None:
+            last_used_at, upload_id = after
+            query = query.where(
+                or_(
+                    UserUpload.last_used_at < last_used_at,
+                    and_(
+                        UserUpload.last_used_at == last_used_at,
+                        UserUpload.id < upload_id,
+                    ),
+                )
+            )
+        return list(await self.db.scalars(query.limit(limit + lookahead)))
@@ -2,13 +2,17 @@
 User repository for database operations.
 
 This module provides data access layer for User model operations
-including retrieval and creation.
+including retrieval and creation, with an async variant for request
+handlers.
 """
 
 from typing import Optional
 
-from db import Session
+from core.cache import user_cache
+from db import AsyncSession, Session
 from models import User
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 class UserRepository:
@@ -100,6 +104,7 @@ class UserRepository:
         """
         self.db.commit()
         self.db.refresh(user)
+        user_cache.invalidate(user.email)
         return user
 
     def mark_user_as_verified(self, user: User) -> User:
@@ -116,11 +121,56 @@ class UserRepository:
         return user
 
     def inc_user_credits(self, user: User, credits: int) -> User:
-        user.credits += credits
-        self.update_user(user)
-        return user
+        """
+        Add credits with a single UPDATE rather than a read-modify-write.
 
-    def dec_user_credits(self, user: User, credits: int) -> User:
-        user.credits -= credits
-        self.update_user(user)
+        Args:
+            user (User): The user to credit.
+            credits (int): Number of credits to add.
+
+        Returns:
+            User: The user carrying the new balance.
+        """
+        balance = self.db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(credits=User.credits + credits)
+            .returning(User.credits)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        self.db.commit()
+        if balance is not None:
+            set_committed_value(user, "credits", balance)
+        user_cache.invalidate(user.email)
         return user
+
+
+class AsyncUserRepository:
+    """Async repository for the User reads on the request path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        """
+        Get a user by their email.
+
+        Args:
+            email (str): The email of the user to retrieve.
+
+        Returns:
+            User | None: The retrieved user object, or None if not found.
+        """
+        return await self.db.scalar(select(User).where(User.email == email))
+
+    async def get_user_by_id(self, user_id: int) -> User | None:
+        """
+        Get a user by their ID.
+
+        Args:
+            user_id (int): The ID of the user to retrieve.
+
+        Returns:
+            User | None: The retrieved user object, or None if not found.
+        """
+        return await self.db.get(User, user_id)
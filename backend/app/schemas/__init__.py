@@ -1,5 +1,12 @@
 "Pydantic schemas for request and response models."
 
+from .analytics import (
+    DailyAnalytics,
+    DailyAnalyticsResponse,
+    GenerationAnalytics,
+    StyleAnalytics,
+    StyleAnalyticsResponse,
+)
 from .auth import (
     CheckEmailStatusRequest,
     CheckEmailStatusResponse,
@@ -30,9 +37,11 @@ from .image_gen import (
     ImageGenResponse,
     ImageGenStatusResponse,
     SideViewsResponse,
+    StyleCatalogEntry,
     StylesResponse,
     UserImages,
     UserImagesResponse,
+    UserUploadsResponse,
     ViewImageRequest,
 )
 from .image_upload import ImageUploadResponse
@@ -52,10 +61,12 @@ __all__ = [
     "GoogleOAuthToken",
     "UserBase",
     "UserImagesResponse",
+    "UserUploadsResponse",
     "ImageUploadResponse",
     "ImageGenRequest",
     "ImageGenResponse",
     "StylesResponse",
+    "StyleCatalogEntry",
     "ImageGenStatusResponse",
     "SideViewsResponse",
     "UserImages",
@@ -82,4 +93,9 @@ __all__ = [
     "WebhookRequest",
     "TransactionResponse",
     "ViewImageRequest",
+    "GenerationAnalytics",
+    "StyleAnalytics",
+    "StyleAnalyticsResponse",
+    "DailyAnalytics",
+    "DailyAnalyticsResponse",
 ]
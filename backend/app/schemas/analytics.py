@@ -0,0 +1,51 @@
+"""
+Generation analytics Pydantic schemas for response validation.
+
+This module defines the response schemas of the analytics routes, which
+are computed from the daily generation rollups.
+"""
+
+import datetime
+
+from pydantic import BaseModel
+
+
+class GenerationAnalytics(BaseModel):
+    """Outcome, likes and time taken of a set of settled generations."""
+
+    images: int
+    completed: int
+    failed: int
+    failure_rate: float
+    # share of completed images the user liked
+    like_rate: float
+    # time_taken of completed images in seconds, p95 estimated from buckets
+    avg_time_taken: float | None
+    min_time_taken: float | None
+    max_time_taken: float | None
+    p95_time_taken: float | None
+
+
+class StyleAnalytics(GenerationAnalytics):
+    style_id: int
+    style_name: str | None
+
+
+class DailyAnalytics(GenerationAnalytics):
+    day: datetime.date
+
+
+class StyleAnalyticsResponse(BaseModel):
+    since: datetime.date
+    until: datetime.date
+    # generated images up to this ID are counted, later ones are not yet
+    folded_through_id: int
+    styles: list[StyleAnalytics]
+
+
+class DailyAnalyticsResponse(BaseModel):
+    since: datetime.date
+    until: datetime.date
+    style_id: int | None
+    folded_through_id: int
+    days: list[DailyAnalytics]
@@ -35,6 +35,13 @@ class StylesResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StyleCatalogEntry(StylesResponse):
+    """Cached style, including the fields kept out of the styles response."""
+
+    description: str | None
+    prompt: str
+
+
 class ImageGenStatusResponse(BaseModel):
     id: int
     status: ImageStatus
@@ -75,7 +82,15 @@ class UserImagesResponse(BaseModel):
     """Response schema for user's generated images with model config."""
 
     images: list[UserImages]
-    page: int
+    page: int | None
     limit: int
     next_page: int | None
-    total_images: int
+    next_cursor: str | None = None
+    total_images: int | None
+
+
+class UserUploadsResponse(BaseModel):
+    """Page of a user's uploaded input images, most recently used first."""
+
+    uploads: list[HttpUrl]
+    next_cursor: str | None
@@ -1,19 +1,45 @@
 "Business logic services to communicate between API and database."
 
+from .analytics import AnalyticsService, GenerationRollups, generation_rollups
 from .auth import AuthService
 from .blacklist_token import BlacklistTokenService
+from .generation_cache import GenerationCache, generation_cache
+from .generation_requests import GenerationRequestService
 from .google_auth import GoogleAuthService
-from .image_gen import ImageGenService
+from .image_gen import AsyncImageGenService, ImageGenService
 from .image_upload import ImageUploadService
+from .job_queue import JobQueueService
+from .job_reaper import JobReaper, job_reaper
 from .mail_service import MailService
 from .payment import PaymentService
+from .replicate_client import ReplicateClient, replicate_client
+from .styles_catalog import StylesCatalog, styles_catalog
+from .token_revocation import TokenRevocationStore, revocation_store
+from .worker import WorkerPool
 
 __all__ = [
     "AuthService",
     "GoogleAuthService",
     "ImageUploadService",
     "ImageGenService",
+    "AsyncImageGenService",
     "MailService",
     "BlacklistTokenService",
     "PaymentService",
+    "JobQueueService",
+    "WorkerPool",
+    "StylesCatalog",
+    "styles_catalog",
+    "TokenRevocationStore",
+    "revocation_store",
+    "ReplicateClient",
+    "replicate_client",
+    "GenerationCache",
+    "generation_cache",
+    "GenerationRequestService",
+    "JobReaper",
+    "job_reaper",
+    "AnalyticsService",
+    "GenerationRollups",
+    "generation_rollups",
 ]
@@ -0,0 +1,197 @@
+"""
+Generation analytics over daily rollups.
+
+GenerationRollups folds settled generated images into generation_rollups.
+Every worker pool refreshes them, and a database advisory lock lets only
+one process fold at a time. AnalyticsService answers the analytics routes
+from the rollups alone, so a query costs the days and styles it covers,
+however many images there are.
+"""
+
+import asyncio
+import datetime
+from collections import defaultdict
+from typing import Optional
+
+import logfire
+from core.config import settings
+from db import AsyncSession, SessionLocal, advisory_lock
+from models import GenerationRollup
+from repository import AsyncRollupRepository, RollupRepository, summarize_rollups
+from schemas import (
+    DailyAnalytics,
+    DailyAnalyticsResponse,
+    StyleAnalytics,
+    StyleAnalyticsResponse,
+)
+from utils import utcnow
+
+from .styles_catalog import styles_catalog
+
+folded_images = logfire.metric_counter(
+    "generation.rollups.folded",
+    description="Generated images folded into the analytics rollups",
+)
+
+# arbitrary, shared by every process folding the same database
+ROLLUP_LOCK_KEY = 7_342_108_552
+
+
+class GenerationRollups:
+    """Folds settled generated images into the daily rollups."""
+
+    def __init__(self):
+        self._runs = 0
+        self._skipped = 0
+        self._conflicts = 0
+        self._folded = 0
+        self._last_run: Optional[dict] = None
+
+    async def refresh(self) -> Optional[int]:
+        """
+        Fold the images past the watermark, unless another process is.
+
+        Returns:
+            Optional[int]: Number of images folded, or None if the lock was
+                held elsewhere.
+        """
+        return await asyncio.to_thread(self._refresh)
+
+    def _refresh(self) -> Optional[int]:
+        with advisory_lock(ROLLUP_LOCK_KEY) as acquired:
+            if not acquired:
+                self._skipped += 1
+                return None
+            folded = 0
+            with SessionLocal() as db:
+                repository = RollupRepository(db)
+                while True:
+                    count, caught_up = self._fold_batch(repository)
+                    folded += count
+                    if caught_up:
+                        break
+
+        self._runs += 1
+        self._folded += folded
+        self._last_run = {"at": utcnow().isoformat(), "folded": folded}
+        if folded:
+            folded_images.add(folded)
+        return folded
+
+    def _fold_batch(self, repository: RollupRepository) -> tuple[int, bool]:
+        last_id = repository.get_watermark()
+        images, caught_up = repository.get_settled_after(
+            last_id, settings.ANALYTICS_ROLLUP_BATCH_SIZE
+        )
+        if not images:
+            repository.db.rollback()
+            return 0, True
+        if not repository.fold(images, last_id):
+            # another process folded the same images, stop for this run
+            self._conflicts += 1
+            return 0, True
+        return len(images), caught_up
+
+    def stats(self) -> dict:
+        """
+        Rollup refresh statistics of the process.
+
+        Returns:
+            dict: Runs, runs skipped for the lock, conflicting runs, images
+                folded and the last run.
+        """
+        return {
+            "runs": self._runs,
+            "skipped": self._skipped,
+            "conflicts": self._conflicts,
+            "folded": self._folded,
+            "last_run": self._last_run,
+        }
+
+
+generation_rollups = GenerationRollups()
+
+
+class AnalyticsService:
+    """Service answering the analytics routes from the rollups."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.rollup_repository = AsyncRollupRepository(db)
+
+    @staticmethod
+    def day_range(days: int) -> tuple[datetime.date, datetime.date]:
+        """First and last day of the trailing ``days`` days, today included."""
+        until = utcnow().date()
+        return until - datetime.timedelta(days=days - 1), until
+
+    async def _folded_through_id(self) -> int:
+        watermark = await self.rollup_repository.get_watermark()
+        return watermark.last_id if watermark else 0
+
+    async def get_style_analytics(self, days: int) -> StyleAnalyticsResponse:
+        """
+        Analytics per style over the trailing days.
+
+        Args:
+            days (int): Number of days, today included.
+
+        Returns:
+            StyleAnalyticsResponse: One entry per style with generations,
+                most generations first.
+        """
+        since, until = self.day_range(days)
+        by_style: dict[int, list[GenerationRollup]] = defaultdict(list)
+        for rollup in await self.rollup_repository.get_rollups(since, until):
+            by_style[rollup.style_id].append(rollup)
+
+        styles = []
+        for style_id, rollups in by_style.items():
+            style = await styles_catalog.get_style(style_id, self.db)
+            styles.append(
+                StyleAnalytics(
+                    style_id=style_id,
+                    style_name=style.name if style else None,
+                    **summarize_rollups(rollups),
+                )
+            )
+        styles.sort(key=lambda entry: entry.images, reverse=True)
+
+        return StyleAnalyticsResponse(
+            since=since,
+            until=until,
+            folded_through_id=await self._folded_through_id(),
+            styles=styles,
+        )
+
+    async def get_daily_analytics(
+        self, days: int, style_id: Optional[int] = None
+    ) -> DailyAnalyticsResponse:
+        """
+        Analytics per day over the trailing days.
+
+        Args:
+            days (int): Number of days, today included.
+            style_id (Optional[int]): Only count this style.
+
+        Returns:
+            DailyAnalyticsResponse: One entry per day with generations,
+                oldest first.
+        """
+        since, until = self.day_range(days)
+        by_day: dict[datetime.date, list[GenerationRollup]] = defaultdict(list)
+        for rollup in await self.rollup_repository.get_rollups(
+            since, until, style_id=style_id
+        ):
+            by_day[rollup.day].append(rollup)
+
+        return DailyAnalyticsResponse(
+            since=since,
+            until=until,
+            style_id=style_id,
+            folded_through_id=await self._folded_through_id(),
+            days=[
+                DailyAnalytics(day=day, **summarize_rollups(rollups))
+                for day, rollups in sorted(by_day.items())
+            ],
+        )
@@ -150,7 +150,8 @@ class AuthService:
         Returns:
             str: JWT access token.
         """
-        return create_access_token({"sub": user.email})
+        # the user id lets the rate limiter key requests without a lookup
+        return create_access_token({"sub": user.email, "uid": user.id})
 
     def generate_refresh_token(self, user: User) -> str:
         """
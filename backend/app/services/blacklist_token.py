@@ -11,10 +11,14 @@ __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
 
+import datetime
+
 from enums import TokenType
 from repository import TokenRepository
 from sqlalchemy.orm import Session
-from utils import get_jti_from_token
+from utils import decode_access_token, decode_refresh_token
+
+from .token_revocation import revocation_store
 
 
 class BlacklistTokenService:
@@ -24,18 +28,29 @@ class BlacklistTokenService:
         self.db = db
         self.token_repository = TokenRepository(db)
 
+    @staticmethod
+    def _decode(token: str) -> dict | None:
+        # refresh tokens are signed with their own secret
+        return decode_access_token(token) or decode_refresh_token(token)
+
     def blacklist_token(self, token: str, token_type: TokenType) -> None:
         """
-        Blacklist a JWT token to invalidate it.
+        Blacklist a JWT token to invalidate it until it expires.
 
         Args:
             token (str): JWT token to blacklist.
+            token_type (TokenType): Kind of the token.
         Returns:
             None
         """
-        jti = get_jti_from_token(token)
-        if jti:
-            self.token_repository.blacklist_token(jti, token_type=token_type)
+        payload = self._decode(token)
+        if payload and payload.get("jti"):
+            expires_at = None
+            if payload.get("exp"):
+                expires_at = datetime.datetime.fromtimestamp(
+                    payload["exp"], datetime.timezone.utc
+                ).replace(tzinfo=None)
+            revocation_store.revoke(payload["jti"], token_type, expires_at, self.db)
         return None
 
     def is_token_blacklisted(self, token: str) -> bool:
@@ -47,8 +62,7 @@ class BlacklistTokenService:
         Returns:
             bool: True if token is blacklisted, False otherwise.
         """
-
-        jti = get_jti_from_token(token)
-        if jti:
-            return self.token_repository.is_token_blacklisted(jti)
+        payload = self._decode(token)
+        if payload and payload.get("jti"):
+            return revocation_store.is_revoked(payload["jti"], self.db)
         return False
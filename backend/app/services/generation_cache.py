@@ -0,0 +1,176 @@
+"""
+Output reuse cache for generations.
+
+This module keys a generation on a SHA-256 of its input image bytes, model
+and model parameters, prompt included, so re-running a style on the same
+picture reuses the stored output instead of paying for a new prediction
+and S3 upload. Input images are hashed once per process and URL, uploads
+get a fresh name each time so a URL always points at the same bytes.
+Results live in generation_results and are shared by every worker. A
+lookup only reads, a job collects its hits and new results and writes them
+with record() in its settlement commit, so no row lock or write
+transaction is held while sibling generations await Replicate.
+"""
+
+import hashlib
+import json
+from typing import Iterable, Optional
+
+import logfire
+from core.cache import MemoryCache
+from core.config import settings
+from core.http_clients import http_clients
+from db import Session
+from loguru import logger
+from repository import GenerationResultRepository
+
+from .image_upload import DOWNLOAD_CHUNK_SIZE
+
+generation_cache_lookups = logfire.metric_counter(
+    "generation_cache.lookups", description="Generation cache lookups by result"
+)
+
+# uploads are never overwritten, the hash of a URL never goes stale
+INPUT_HASH_TTL_SECONDS = 24 * 3600
+
+
+class GenerationCache:
+    """Content-addressed cache of generation outputs."""
+
+    def __init__(self):
+        self._input_hashes = MemoryCache(
+            max_entries=settings.GENERATION_CACHE_INPUT_HASHES,
+            ttl_seconds=INPUT_HASH_TTL_SECONDS,
+        )
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.GENERATION_CACHE_ENABLED
+
+    async def _hash_input(self, image_url: str) -> str:
+        digest = self._input_hashes.get(image_url)
+        if digest is not None:
+            return digest
+
+        sha = hashlib.sha256()
+        async with http_clients.session.get(image_url) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to download image: {response.status}")
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                sha.update(chunk)
+
+        digest = sha.hexdigest()
+        self._input_hashes.set(image_url, digest)
+        return digest
+
+    async def key_for(self, model: str, params: dict, image_url: str) -> Optional[str]:
+        """
+        Cache key of a generation.
+
+        Args:
+            model (str): Model reference of the prediction.
+            params (dict): Model input apart from the input image.
+            image_url (str): URL of the input image.
+
+        Returns:
+            Optional[str]: Hex SHA-256 of the inputs, or None when the cache
+                is disabled or the input image could not be read.
+        """
+        if not self.enabled:
+            return None
+        try:
+            image_hash = await self._hash_input(image_url)
+        except Exception as e:
+            # a cache that cannot hash only costs a prediction, never a job
+            self._errors += 1
+            logger.warning(f"Could not hash generation input {image_url}: {e}")
+            return None
+
+        payload = json.dumps(
+            {"model": model, "params": params, "image": image_hash},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, db: Session, key: Optional[str]) -> Optional[str]:
+        """
+        Find the output of an identical generation.
+
+        Args:
+            db (Session): Session of the running job.
+            key (Optional[str]): Cache key from key_for.
+
+        Returns:
+            Optional[str]: URL of the stored output, or None on a miss.
+        """
+        if key is None:
+            return None
+        output_url = GenerationResultRepository(db).get_output(key)
+        result = "hit" if output_url else "miss"
+        if output_url:
+            self._hits += 1
+        else:
+            self._misses += 1
+        generation_cache_lookups.add(1, {"result": result})
+        return output_url
+
+    def record(
+        self,
+        db: Session,
+        hits: Iterable[str] = (),
+        results: Iterable[tuple[str, str]] = (),
+    ) -> None:
+        """
+        Write a job's hits and new results, without committing.
+
+        Args:
+            db (Session): Session of the job, committed by its settlement.
+            hits (Iterable[str]): Keys of the outputs the job reused.
+            results (Iterable[tuple[str, str]]): Key and output URL of each
+                output the job generated.
+        """
+        repository = GenerationResultRepository(db)
+        for key, output_url in sorted(results):
+            repository.save(key, output_url)
+        repository.count_hits(hits)
+
+    @staticmethod
+    def credits_for(generated: int, hits: int) -> int:
+        """
+        Credits charged for a job under the cache hit policy.
+
+        Args:
+            generated (int): Outputs the job produced, hits included.
+            hits (int): Outputs reused from the cache.
+
+        Returns:
+            int: Credits to charge.
+        """
+        if settings.GENERATION_CACHE_CHARGE_HITS:
+            return generated
+        return generated - hits
+
+    def stats(self) -> dict:
+        """
+        Generation cache statistics of the process.
+
+        Returns:
+            dict: Hits, misses, hashing errors and memoized input hashes.
+        """
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "charge_hits": settings.GENERATION_CACHE_CHARGE_HITS,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+            "hash_errors": self._errors,
+            "input_hashes": len(self._input_hashes),
+        }
+
+
+generation_cache = GenerationCache()
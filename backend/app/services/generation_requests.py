@@ -0,0 +1,248 @@
+"""
+Generation request service.
+
+This module turns the image routes' requests into queued work exactly
+once. A request made under an Idempotency-Key header is recorded with its
+response, and a retry under the same key replays that response. Identical
+requests without a key are coalesced: while a user's image from the same
+input and style, or the side views of the same image, is queued or
+running, a repeated request joins it instead of paying for a second
+prediction. Both are enforced through unique keys in the database, so
+they hold across every API worker.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional, Sequence
+
+import logfire
+from core.config import settings
+from core.exceptions import IdempotencyKeyMismatchException
+from db import AsyncSession, SessionLocal
+from enums import JobKind
+from loguru import logger
+from models import GeneratedImage
+from repository import (
+    AsyncFlightRepository,
+    AsyncIdempotencyRepository,
+    IdempotencyRepository,
+    flight_key,
+)
+from schemas import ImageGenResponse
+from sqlalchemy.exc import IntegrityError
+from utils import utcnow
+
+from .image_gen import AsyncImageGenService
+from .job_queue import JobQueueService
+
+generation_requests = logfire.metric_counter(
+    "generation.requests",
+    description="Generation requests by outcome: queued, joined or replayed",
+)
+
+STARTED_MESSAGE = "Image generation started successfully."
+JOINED_MESSAGE = "Image generation already in progress."
+
+
+def request_hash(route: str, body: dict) -> str:
+    """Hash of the route and body an Idempotency-Key was used for."""
+    payload = json.dumps({"route": route, "body": body}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GenerationRequestService:
+    """Service to queue generation requests once, whatever the retries."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.flight_repository = AsyncFlightRepository(db)
+        self.idempotency_repository = AsyncIdempotencyRepository(db)
+        self.image_service = AsyncImageGenService(db)
+        self.job_queue = JobQueueService(db)
+
+    async def generate_image(
+        self,
+        user_id: int,
+        style_id: int,
+        input_image_url: str,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[ImageGenResponse, bool]:
+        """
+        Queue the generation of an image, or join an identical one.
+
+        Args:
+            user_id (int): ID of requesting user.
+            style_id (int): ID of hairstyle to apply.
+            input_image_url (str): URL of input image.
+            idempotency_key (Optional[str]): Client's Idempotency-Key header.
+
+        Returns:
+            tuple[ImageGenResponse, bool]: The response and whether it was
+                replayed from an earlier request under the same key.
+
+        Raises:
+            IdempotencyKeyMismatchException: If the key was used for
+                another request.
+            NotEnoughCreditsException: If the user cannot pay for the image.
+        """
+
+        async def start() -> int:
+            # the record, its credit reservation and the job commit together,
+            # so a request the user cannot pay for leaves nothing behind
+            image = await self.image_service.create_image_generation_record(
+                style_id=style_id,
+                input_image_url=input_image_url,
+                user_id=user_id,
+                commit=False,
+            )
+            await self.job_queue.enqueue_image(image, commit=False)
+            return image.id
+
+        return await self._submit(
+            user_id=user_id,
+            key=flight_key(user_id, JobKind.IMAGE.value, style_id, input_image_url),
+            kinds=(JobKind.IMAGE,),
+            start=start,
+            idempotency_key=idempotency_key,
+            fingerprint=request_hash(
+                "generate",
+                {"style_id": style_id, "image_input_url": input_image_url},
+            ),
+        )
+
+    async def generate_views(
+        self,
+        user_id: int,
+        image: GeneratedImage,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[ImageGenResponse, bool]:
+        """
+        Queue the side views of an image, or join the ones already queued.
+
+        Args:
+            user_id (int): ID of requesting user.
+            image (GeneratedImage): Completed image generation record.
+            idempotency_key (Optional[str]): Client's Idempotency-Key header.
+
+        Returns:
+            tuple[ImageGenResponse, bool]: The response and whether it was
+                replayed from an earlier request under the same key.
+
+        Raises:
+            IdempotencyKeyMismatchException: If the key was used for
+                another request.
+            NotEnoughCreditsException: If the user cannot pay for the views.
+        """
+
+        async def start() -> int:
+            await self.job_queue.enqueue_views(image, commit=False)
+            return image.id
+
+        return await self._submit(
+            user_id=user_id,
+            key=flight_key(user_id, JobKind.VIEWS.value, image.id),
+            kinds=(JobKind.VIEWS, JobKind.VIEW),
+            start=start,
+            idempotency_key=idempotency_key,
+            fingerprint=request_hash("view-generate", {"image_id": image.id}),
+        )
+
+    async def _submit(
+        self,
+        user_id: int,
+        key: str,
+        kinds: Sequence[JobKind],
+        start: Callable[[], Awaitable[int]],
+        idempotency_key: Optional[str],
+        fingerprint: str,
+    ) -> tuple[ImageGenResponse, bool]:
+        if idempotency_key:
+            replay = await self._replay(user_id, idempotency_key, fingerprint)
+            if replay is not None:
+                return replay, True
+
+        try:
+            image_id = await self.flight_repository.get_live(key, kinds)
+            joined = image_id is not None
+            if image_id is None:
+                image_id = await start()
+                await self.flight_repository.claim(key, kinds, user_id, image_id)
+
+            response = ImageGenResponse(
+                image_id=image_id,
+                message=JOINED_MESSAGE if joined else STARTED_MESSAGE,
+            )
+            if idempotency_key:
+                await self.idempotency_repository.save(
+                    user_id,
+                    idempotency_key,
+                    fingerprint,
+                    response.model_dump(),
+                    since=self._replayable_since(),
+                )
+            await self.db.commit()
+
+        except IntegrityError:
+            # an identical request committed first, answer with its outcome
+            await self.db.rollback()
+            if idempotency_key:
+                replay = await self._replay(user_id, idempotency_key, fingerprint)
+                if replay is not None:
+                    return replay, True
+            image_id = await self.flight_repository.get_live(key, kinds)
+            if image_id is None:
+                raise
+            joined = True
+            response = ImageGenResponse(image_id=image_id, message=JOINED_MESSAGE)
+
+        generation_requests.add(1, {"outcome": "joined" if joined else "queued"})
+        return response, False
+
+    @staticmethod
+    def _replayable_since() -> datetime.datetime:
+        return utcnow() - datetime.timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS
+        )
+
+    async def _replay(
+        self, user_id: int, idempotency_key: str, fingerprint: str
+    ) -> Optional[ImageGenResponse]:
+        since = utcnow() - datetime.timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS
+        )
+        record = await self.idempotency_repository.get(user_id, idempotency_key, since)
+        if record is None:
+            return None
+        if record.request_hash != fingerprint:
+            raise IdempotencyKeyMismatchException()
+        generation_requests.add(1, {"outcome": "replayed"})
+        return ImageGenResponse.model_validate(record.response)
+
+    @staticmethod
+    def purge_idempotency_keys() -> int:
+        """
+        Delete the idempotency keys that can no longer be replayed.
+
+        Returns:
+            int: Number of deleted keys.
+        """
+        with SessionLocal() as db:
+            return IdempotencyRepository(db).purge_expired(
+                GenerationRequestService._replayable_since()
+            )
+
+    @staticmethod
+    async def run_purge_loop() -> None:
+        """Purge expired idempotency keys every IDEMPOTENCY_KEY_PURGE_SECONDS."""
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_KEY_PURGE_SECONDS)
+            try:
+                deleted = await asyncio.to_thread(
+                    GenerationRequestService.purge_idempotency_keys
+                )
+                if deleted:
+                    logger.info(f"Purged {deleted} expired idempotency keys")
+            except Exception as e:
+                logger.warning(f"Idempotency key purge failed: {e}")
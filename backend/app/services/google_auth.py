@@ -5,10 +5,10 @@ This module handles Google OAuth 2.0 authentication flow including
 authorization redirect, callback processing, and user creation/retrieval.
 """
 
-import aiohttp
 from authlib.integrations.starlette_client import OAuth
 from core.config import settings
 from core.exceptions import GoogleAuthException
+from core.http_clients import HttpClientRegistry
 from db import Session
 from fastapi import Request
 from repository import UserRepository
@@ -37,8 +37,9 @@ oauth.register(
 class GoogleAuthService:
     """Service to handle Google OAuth authentication."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, http_clients: HttpClientRegistry):
         self.db = db
+        self.http_clients = http_clients
         self.user_repo = UserRepository(db)
         self.auth_service = AuthService(db)
 
@@ -147,8 +148,9 @@ class GoogleAuthService:
         """
         userinfo_endpoint = "https://www.googleapis.com/oauth2/v3/userinfo"
         headers = {"Authorization": f"Bearer {access_token}"}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(userinfo_endpoint, headers=headers) as response:
-                if not response.ok:
-                    return None
-                return GoogleUserInfo(**await response.json())
+        async with self.http_clients.session.get(
+            userinfo_endpoint, headers=headers
+        ) as response:
+            if not response.ok:
+                return None
+            return GoogleUserInfo(**await response.json())
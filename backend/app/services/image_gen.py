@@ -3,72 +3,137 @@ Image generation service using Replicate API.
 
 This module handles the complete image generation workflow including
 record creation, Replicate API integration, and S3 storage management.
+ImageGenService runs generations in the workers on a sync session, whose
+queries it runs in worker threads so an embedded worker pool never blocks
+the API, while AsyncImageGenService serves the image routes on an async
+session. In webhook mode a worker only dispatches a job's predictions,
+and their completions arrive through the Replicate webhook or the polling
+fallback.
 """
 
+import asyncio
+import datetime
+import json
 import time
-from typing import List, Literal, Optional, cast
+import uuid
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar, cast
 
+import logfire
 from core.config import settings
-from core.exceptions import StyleNotFoundException
-from db import Session
-from enums import ImageStatus
+from core.events import event_broker
+from core.exceptions import InvalidCursorException, StyleNotFoundException
+from core.stage_timings import StageTimings
+from db import AsyncSession, AsyncSessionLocal, Session
+from enums import ImageStatus, JobKind, JobStatus, PredictionStatus
 from loguru import logger
-from models import GeneratedImage
+from models import GeneratedImage, GenerationJob, ReplicatePrediction
 from pydantic import HttpUrl
-from replicate.client import Client
-from repository import GeneratedImageRepository, StyleRepository, UserRepository
-from schemas import SideViewsResponse, UserImages, UserImagesResponse
-from utils import get_file_info, get_view_prompt, save_image_from_url
+from repository import (
+    AsyncGeneratedImageRepository,
+    AsyncImageCountsRepository,
+    AsyncUploadRepository,
+    CreditRepository,
+    GeneratedImageRepository,
+    JobRepository,
+    PredictionRepository,
+)
+from schemas import (
+    ImageGenStatusResponse,
+    SideViewsResponse,
+    UserImages,
+    UserImagesResponse,
+    UserUploadsResponse,
+)
+from utils import (
+    SIDE_VIEWS,
+    ViewName,
+    decode_cursor,
+    encode_cursor,
+    get_view_prompt,
+    utcnow,
+)
 
+from .generation_cache import generation_cache
 from .image_upload import ImageUploadService
+from .replicate_client import replicate_client
+from .styles_catalog import StylesCatalog, styles_catalog
+
+REPLICATE_MODEL = "bytedance/seedream-4"
+
+T = TypeVar("T")
+
+# overdue predictions looked up per polling round
+POLL_BATCH_SIZE = 50
+
+prediction_completions = logfire.metric_counter(
+    "replicate.webhook.completions",
+    description="Webhook-mode predictions completed, by source and status",
+)
+
+
+def status_channel(image_id: int) -> str:
+    """Event channel carrying the status changes of an image."""
+    return f"image:{image_id}"
+
+
+async def publish_status(image: GeneratedImage) -> None:
+    """Announce the current status of an image to its status streams."""
+    status = ImageGenStatusResponse.model_validate(image)
+    await event_broker.publish(status_channel(image.id), status.model_dump(mode="json"))
+
+
+def prediction_params(prompt: str) -> dict:
+    """Model input of a prediction, apart from the input image."""
+    return {
+        "size": "1K",
+        "width": 2048,
+        "height": 2048,
+        "prompt": prompt,
+        "max_images": 1,
+        "aspect_ratio": "match_input_image",
+        "enhance_prompt": False,
+        "sequential_image_generation": "disabled",
+    }
 
 
 class ImageGenService:
     """Service to handle image generation logic."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, timings: Optional[StageTimings] = None):
         self.db = db
-        self.style_repository = StyleRepository(db)
+        # stage durations of the job the worker runs, if any
+        self.timings = timings
         self.image_repository = GeneratedImageRepository(db)
-        self.user_repository = UserRepository(db)
-
-    def create_image_generation_record(
-        self,
-        user_id: int,
-        style_id: int,
-        input_image_url: str,
-    ) -> GeneratedImage:
-        """
-        Create database record for image generation request.
-
-        Args:
-            user_id (int): ID of requesting user.
-            style_id (int): ID of hairstyle to apply.
-            input_image_url (str): URL of input image.
-
-        Returns:
-            GeneratedImage: Created database record.
-        """
-        style = self.style_repository.get_style_by_id(style_id)
-        image_instance = self.image_repository.create_image_object(
-            user_id=user_id,
-            style_id=style_id,
-            output_image_url=None,
-            input_image_url=input_image_url,
-            description=style.description if style else "",
-        )
-        return image_instance
+        self.credit_repository = CreditRepository(db)
+        self.job_repository = JobRepository(db)
+        self.prediction_repository = PredictionRepository(db)
+        # cache writes of the job, made in its settlement commit
+        self._cache_hits: list[str] = []
+        self._cache_results: list[tuple[str, str]] = []
+        # the session is used from one worker thread at a time
+        self._db_lock = asyncio.Lock()
 
     async def start_image_generation(
         self,
         image: GeneratedImage,
-        view: Optional[Literal["right", "left", "back"]] = None,
+        view: Optional[ViewName] = None,
+        job_id: Optional[int] = None,
     ) -> int:
         """
         Execute image generation workflow using Replicate API.
 
+        The output of an identical earlier generation is reused when the
+        cache has one. The job's credit is charged when the image is
+        generated, subject to the cache hit policy, and refunded otherwise,
+        in the same commit as the image record.
+
         Args:
             image (GeneratedImage): Image generation record with metadata.
+            view (Optional[ViewName]): Side view to generate instead of the
+                main image.
+            job_id (Optional[int]): Queued job whose credit reservation pays
+                for the generation.
 
         Returns:
             int: Image record ID.
@@ -81,10 +146,11 @@ class ImageGenService:
 
         start_time = time.perf_counter()
         output_url = None
+        cached = False
         status = ImageStatus.FAILED  # default fallback
 
         try:
-            style = self.style_repository.get_style_by_id(style_id)
+            style = await self._run_db(styles_catalog.get_style_sync, style_id, self.db)
             if not style:
                 raise StyleNotFoundException()
 
@@ -97,29 +163,17 @@ class ImageGenService:
             else:
                 raise ValueError("Invalid view")
 
-            self.image_repository.update_image_status(
+            await self._run_db(
+                self.image_repository.update_image_status,
                 image_id=image.id,
                 status=ImageStatus.PROCESSING,
             )
+            await self._publish_status(image)
 
-            prediction = await self.generate_image_from_replicate(prompt, input_image)
-            # # test prediction structure
-            # prediction = [
-            #     SimpleNamespace(
-            #         url="https://media.istockphoto.com/id/814423752/photo/eye-of-model-with-colorful-art-make-up-close-up.jpg?s=612x612&w=0&k=20&c=l15OdMWjgCKycMMShP8UK94ELVlEGvt7GmB_esHWPYE="
-            #     )
-            # ]
-
-            if prediction and len(prediction) > 0:
+            output_url, cached = await self._generate_output(prompt, input_image)
+            if output_url:
                 status = ImageStatus.COMPLETED
 
-                # upload to S3
-                output_url = await self._save_output_to_s3(prediction[0].url)  # type: ignore
-                self.user_repository.dec_user_credits(
-                    user=image.user,
-                    credits=1,
-                )
-
         except StyleNotFoundException:
             status = ImageStatus.FAILED
             logger.exception("Style not found for image %s", image.id)
@@ -134,27 +188,225 @@ class ImageGenService:
 
         finally:
             duration = time.perf_counter() - start_time
-            self._update_image_url(
-                image=image,
-                output_url=output_url,
-                status=status,
-                time_taken=duration,
-                view=view,
-            )
+            generated = int(status == ImageStatus.COMPLETED)
+            with self._stage("commit"):
+                await self._run_db(
+                    self._settle_image,
+                    job_id,
+                    generation_cache.credits_for(generated, int(cached)),
+                    image=image,
+                    output_url=output_url,
+                    status=status,
+                    time_taken=duration,
+                    view=view,
+                )
+            await self._publish_status(image)
             logger.info(f"{image.id}={view} Image generated successfully")
 
         return image.id
 
+    async def start_view_generation(
+        self, image: GeneratedImage, job_id: Optional[int] = None
+    ) -> int:
+        """
+        Generate the right, left and back views of an image concurrently.
+
+        The three predictions run under one asyncio.gather, so the batch
+        takes as long as the slowest view. View URLs, time taken and the
+        settlement of the job's credits, charging generated views and
+        refunding failed ones, are written in a single commit.
+
+        Args:
+            image (GeneratedImage): Completed image generation record.
+            job_id (Optional[int]): Queued job whose credit reservation pays
+                for the views.
+
+        Returns:
+            int: Image record ID.
+
+        Raises:
+            ValueError: If the image has no output to generate views from.
+        """
+        front_url = image.output_image_url
+        if not front_url:
+            raise ValueError("Invalid view")
+
+        start_time = time.perf_counter()
+        await self._run_db(
+            self.image_repository.update_image_status,
+            image_id=image.id,
+            status=ImageStatus.PROCESSING,
+        )
+        await self._publish_status(image)
+
+        cached_views: set[ViewName] = set()
+
+        async def generate(view: ViewName) -> str:
+            url, cached = await self._generate_view(front_url, view)
+            if cached:
+                cached_views.add(view)
+            # announce each view as it lands, the commit happens once below
+            setattr(image, f"{view}_view_url", url)
+            await self._publish_status(image)
+            return url
+
+        results = await asyncio.gather(
+            *(generate(view) for view in SIDE_VIEWS),
+            return_exceptions=True,
+        )
+
+        errors = []
+        for view, result in zip(SIDE_VIEWS, results):
+            if isinstance(result, BaseException):
+                logger.opt(exception=result).error(
+                    f"{image.id}={view} view generation failed"
+                )
+                errors.append(result)
+                continue
+            setattr(image, f"{view}_view_url", result)
+
+        generated = len(SIDE_VIEWS) - len(errors)
+        image.status = ImageStatus.FAILED if errors else ImageStatus.COMPLETED
+        image.time_taken = time.perf_counter() - start_time
+
+        used = generation_cache.credits_for(generated, len(cached_views))
+        with self._stage("commit"):
+            await self._run_db(self._settle_views, job_id, used, image)
+        await self._publish_status(image)
+        logger.info(f"{image.id} generated {generated}/{len(SIDE_VIEWS)} views")
+
+        if errors:
+            raise errors[0]
+        return image.id
+
+    @staticmethod
+    async def _publish_status(image: GeneratedImage) -> None:
+        await publish_status(image)
+
+    def _stage(self, name: str) -> AbstractContextManager:
+        return self.timings.stage(name) if self.timings else nullcontext()
+
+    async def _run_db(self, step: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a step on the sync session in a worker thread, off the loop."""
+        async with self._db_lock:
+            return await asyncio.to_thread(step, *args, **kwargs)
+
+    def _settle_image(
+        self,
+        job_id: Optional[int],
+        used: int,
+        image: GeneratedImage,
+        output_url: Optional[str],
+        status: ImageStatus,
+        time_taken: float,
+        view: Optional[ViewName] = None,
+    ) -> None:
+        """Settle a job's credits and store its image in one commit."""
+        if job_id is not None:
+            self.credit_repository.settle_job(job_id, used=used, commit=False)
+        self._record_cache()
+        self._update_image_url(
+            image=image,
+            output_url=output_url,
+            status=status,
+            time_taken=time_taken,
+            view=view,
+        )
+
+    def _settle_views(
+        self, job_id: Optional[int], used: int, image: GeneratedImage
+    ) -> None:
+        """Settle a views job's credits and store its views in one commit."""
+        if job_id is not None:
+            self.credit_repository.settle_job(job_id, used=used, commit=False)
+        self._record_cache()
+        self.image_repository.raw_update_image(image)
+
+    def _record_cache(self) -> None:
+        """Add the job's cache hits and results to its pending commit."""
+        generation_cache.record(
+            self.db, hits=self._cache_hits, results=self._cache_results
+        )
+        self._cache_hits.clear()
+        self._cache_results.clear()
+
+    async def _generate_view(
+        self, input_image: str, view: ViewName
+    ) -> tuple[str, bool]:
+        """
+        Generate a single side view and store it in S3.
+
+        Args:
+            input_image (str): URL of the generated front image.
+            view (ViewName): Side view to generate.
+
+        Returns:
+            tuple[str, bool]: Permanent S3 URL of the view and whether it
+                was reused from the cache.
+        """
+        url, cached = await self._generate_output(get_view_prompt(view), input_image)
+        if not url:
+            raise ValueError(f"Empty prediction for {view} view")
+        return url, cached
+
+    async def _generate_output(
+        self, prompt: str, input_image: str
+    ) -> tuple[Optional[str], bool]:
+        """
+        Produce the output of a prompt on an input image.
+
+        An identical earlier generation is reused from the cache, otherwise
+        the prediction runs on Replicate and its output is stored in S3.
+        Hits and new results are only collected here, the settlement commit
+        of the job writes them, so nothing is locked while sibling views
+        await Replicate.
+
+        Args:
+            prompt (str): Prompt of the generation.
+            input_image (str): URL of the input image.
+
+        Returns:
+            tuple[Optional[str], bool]: Permanent S3 URL of the output, None
+                for an empty prediction, and whether it came from the cache.
+        """
+        key = await generation_cache.key_for(
+            REPLICATE_MODEL, prediction_params(prompt), input_image
+        )
+        cached_url = await self._run_db(generation_cache.lookup, self.db, key)
+        if cached_url:
+            self._cache_hits.append(cast(str, key))
+            return cached_url, True
+
+        with self._stage("predict"):
+            prediction = await self.generate_image_from_replicate(
+                prompt, input_image, self.timings
+            )
+        if not prediction:
+            return None, False
+
+        # FileOutput for https URLs, a plain string for the local stand-in
+        output_url = await self._save_output_to_s3(str(prediction[0]), self.timings)
+        if key is not None:
+            self._cache_results.append((key, output_url))
+        return output_url, False
+
     def _update_image_url(
         self,
         image: GeneratedImage,
         output_url: Optional[str],
         status: ImageStatus,
         time_taken: float,
-        view: Optional[Literal["right", "left", "back"]] = None,
+        view: Optional[ViewName] = None,
     ):
         image.status = status
         image.time_taken = time_taken
+        self._set_output_url(image, output_url, view)
+        self.image_repository.raw_update_image(image)
+
+    @staticmethod
+    def _set_output_url(
+        image: GeneratedImage, output_url: Optional[str], view: Optional[str]
+    ) -> None:
         if not view:
             image.output_image_url = output_url
         elif view == "right":
@@ -163,74 +415,450 @@ class ImageGenService:
             image.left_view_url = output_url
         elif view == "back":
             image.back_view_url = output_url
+
+    async def dispatch_generation(
+        self, image: GeneratedImage, job: GenerationJob
+    ) -> None:
+        """
+        Start a job's predictions on Replicate without waiting for them.
+
+        Outputs found in the cache are applied right away, every other
+        output gets a prediction that reports to REPLICATE_WEBHOOK_URL. The
+        job stays RUNNING and is finished by the completion of its last
+        prediction. A job dispatched again after its lease expired keeps
+        the outputs already settled and the predictions Replicate still
+        knows, and only replaces the ones that were lost or cancelled.
+
+        Args:
+            image (GeneratedImage): Image generation record of the job.
+            job (GenerationJob): Claimed job to dispatch.
+
+        Raises:
+            StyleNotFoundException: If style ID is invalid.
+            ValueError: If a view is requested for an image without output.
+            CircuitOpenError: If Replicate is considered down.
+        """
+        webhook = cast(str, settings.REPLICATE_WEBHOOK_URL)
+        targets = await self._run_db(self._generation_targets, image, job)
+
+        in_flight = await self._resume_pending(job.id)
+        resolved = in_flight | await self._run_db(
+            self.prediction_repository.resolved_views, job.id
+        )
+
+        await self._run_db(
+            self.image_repository.update_image_status,
+            image_id=image.id,
+            status=ImageStatus.PROCESSING,
+        )
+        await self._publish_status(image)
+
+        try:
+            for view, prompt, input_image in targets:
+                if view in resolved:
+                    continue
+                params = prediction_params(prompt)
+                key = await generation_cache.key_for(
+                    REPLICATE_MODEL, params, input_image
+                )
+                cached_url = await self._run_db(generation_cache.lookup, self.db, key)
+                if cached_url:
+                    self._set_output_url(image, cached_url, view)
+                    await self._run_db(
+                        self._add_cached_prediction, job.id, view, cast(str, key)
+                    )
+                    await self._publish_status(image)
+                    continue
+
+                prediction = await replicate_client.create(
+                    REPLICATE_MODEL,
+                    input={**params, "image_input": [input_image]},
+                    webhook=webhook,
+                )
+                # recorded one by one, a crash never loses a created prediction
+                await self._run_db(
+                    self.prediction_repository.add, prediction.id, job.id, view, key
+                )
+
+        except BaseException:
+            # the job is failed and refunded, its predictions are not needed
+            for prediction_id in await self._run_db(self._abandon_dispatch, job.id):
+                replicate_client.cancel(prediction_id)
+            raise
+
+        logger.info(f"{image.id} dispatched job {job.id} to Replicate")
+        # a job served entirely from the cache is already done
+        await self._finish_dispatched_job(job, image)
+
+    def _add_cached_prediction(
+        self, job_id: int, view: Optional[str], key: str
+    ) -> None:
+        """Record an output reused from the cache, its hit in the same commit."""
+        generation_cache.record(self.db, hits=[key])
+        self.prediction_repository.add(
+            uuid.uuid4().hex, job_id, view, key, status=PredictionStatus.CACHED
+        )
+
+    def _abandon_dispatch(self, job_id: int) -> list[str]:
+        """Drop a failed dispatch, returning the predictions to cancel."""
+        self.db.rollback()
+        return self.prediction_repository.abandon_pending(job_id)
+
+    async def _resume_pending(self, job_id: int) -> set[Optional[str]]:
+        """
+        Keep the pending predictions of an earlier dispatch that still count.
+
+        Returns:
+            set[Optional[str]]: Views whose prediction is kept, None standing
+                for the main image.
+        """
+        kept: set[Optional[str]] = set()
+        lost = []
+        pending = await self._run_db(self.prediction_repository.get_pending, job_id)
+        for prediction in pending:
+            try:
+                remote = await replicate_client.get(prediction.id)
+            except Exception as e:
+                logger.warning(f"Could not look up prediction {prediction.id}: {e}")
+                remote = None
+            if remote is None or remote.status == "canceled":
+                lost.append(prediction.id)
+                continue
+            # running, or finished with a completion the poller will store
+            kept.add(prediction.view)
+
+        await self._run_db(self.prediction_repository.abandon, lost)
+        for prediction_id in lost:
+            replicate_client.cancel(prediction_id)
+        return kept
+
+    def _generation_targets(
+        self, image: GeneratedImage, job: GenerationJob
+    ) -> list[tuple[Optional[str], str, str]]:
+        """View, prompt and input image of each output of a job."""
+        if job.kind == JobKind.IMAGE:
+            style = styles_catalog.get_style_sync(image.style_id, self.db)
+            if not style:
+                raise StyleNotFoundException()
+            return [(None, style.prompt, image.input_image_url)]
+
+        if not image.output_image_url:
+            raise ValueError("Invalid view")
+        views = SIDE_VIEWS if job.kind == JobKind.VIEWS else (job.view,)
+        return [
+            (view, get_view_prompt(cast(ViewName, view)), image.output_image_url)
+            for view in views
+        ]
+
+    async def complete_prediction(
+        self, payload: dict[str, Any], source: str = "webhook"
+    ) -> bool:
+        """
+        Store the output of a finished webhook-mode prediction.
+
+        The prediction is claimed first, so a duplicate delivery or the
+        polling fallback racing the webhook is a no-op. The output is copied
+        to S3, recorded in the cache and set on the image in one commit, and
+        the job is finished once none of its predictions is pending. A
+        failure hands the prediction back for the next delivery or poll.
+        The stages of the completion are merged into the job's timings.
+        Queries run in worker threads, so neither the webhook route nor the
+        poller blocks the event loop on the sync session.
+
+        Args:
+            payload (dict[str, Any]): The finished prediction as Replicate
+                reports it, with its ``id``, ``status``, ``output``,
+                timestamps and ``metrics``.
+            source (str): ``webhook`` or ``poll``, for the metrics.
+
+        Returns:
+            bool: False if no job is waiting on the prediction.
+        """
+        prediction_id = payload["id"]
+        known, prediction = await self._run_db(self._claim_prediction, prediction_id)
+        if prediction is None:
+            return known
+
+        try:
+            job, image = await self._run_db(
+                self._get_running_job_image, prediction.job_id
+            )
+            if job is None or image is None:
+                # the job was failed and refunded in the meantime
+                await self._run_db(
+                    self.prediction_repository.resolve,
+                    prediction_id,
+                    PredictionStatus.ABANDONED,
+                )
+                return True
+
+            timings = StageTimings(job.kind.value)
+            timings.record_prediction(
+                payload.get("created_at"),
+                payload.get("started_at"),
+                payload.get("completed_at"),
+                payload.get("metrics"),
+                include_predict=True,
+            )
+            output_url = None
+            remote_url = self._remote_output_url(payload.get("output"))
+            if payload.get("status") == "succeeded" and remote_url:
+                output_url = await self._save_output_to_s3(remote_url, timings)
+            with timings.stage("commit"):
+                await self._run_db(
+                    self._store_completion, prediction, job, image, output_url
+                )
+
+        except BaseException:
+            await self._run_db(self._release_prediction, prediction_id)
+            raise
+
+        prediction_completions.add(
+            1, {"source": source, "status": "succeeded" if output_url else "failed"}
+        )
+        # published before the next commit expires the image
+        await self._publish_status(image)
+        await self._run_db(self.job_repository.record_stages, job.id, timings.as_dict())
+        await self._finish_dispatched_job(job, image)
+        return True
+
+    @staticmethod
+    def _remote_output_url(output: Any) -> Optional[str]:
+        if isinstance(output, list):
+            output = output[0] if output else None
+        return output if isinstance(output, str) else None
+
+    async def _finish_dispatched_job(
+        self, job: GenerationJob, image: GeneratedImage
+    ) -> None:
+        """
+        Finish a dispatched job once none of its predictions is pending.
+
+        Completions of the same job may race here, the job leaves RUNNING
+        once and only that call settles its credits.
+        """
+        if await self._run_db(self._settle_dispatched_job, job, image):
+            await self._publish_status(image)
+
+    def _settle_dispatched_job(self, job: GenerationJob, image: GeneratedImage) -> bool:
+        """Finish and settle a job with nothing pending, True if this call did."""
+        counts = self.prediction_repository.count_by_status(job.id)
+        pending = counts.get(PredictionStatus.PENDING, 0) + counts.get(
+            PredictionStatus.COMPLETING, 0
+        )
+        if pending:
+            return False
+
+        hits = counts.get(PredictionStatus.CACHED, 0)
+        generated = counts.get(PredictionStatus.SUCCEEDED, 0) + hits
+        failed = bool(counts.get(PredictionStatus.FAILED, 0)) or not generated
+        finished = self.job_repository.finish_running(
+            job.id,
+            JobStatus.FAILED if failed else JobStatus.COMPLETED,
+            error="Prediction failed" if failed else None,
+            commit=False,
+        )
+        if not finished:
+            self.db.rollback()
+            return False
+
+        job_id = job.id
+        self.credit_repository.settle_job(
+            job_id, used=generation_cache.credits_for(generated, hits), commit=False
+        )
+        image.status = ImageStatus.FAILED if failed else ImageStatus.COMPLETED
+        started_at = job.started_at or job.created_at
+        image.time_taken = (utcnow() - started_at).total_seconds()
+        self.image_repository.raw_update_image(image)
+        logger.info(f"{image.id} finished job {job_id} with {generated} outputs")
+        return True
+
+    def _claim_prediction(
+        self, prediction_id: str
+    ) -> tuple[bool, Optional[ReplicatePrediction]]:
+        """Whether a prediction is known, and the prediction if this call claimed it."""
+        prediction = self.prediction_repository.get(prediction_id)
+        if prediction is None:
+            return False, None
+        if not self.prediction_repository.claim(prediction_id):
+            return True, None
+        self.db.refresh(prediction)
+        return True, prediction
+
+    def _release_prediction(self, prediction_id: str) -> None:
+        """Hand a claimed prediction back for the next delivery or poll."""
+        self.db.rollback()
+        self.prediction_repository.release(prediction_id)
+
+    def _get_running_job_image(
+        self, job_id: int
+    ) -> tuple[Optional[GenerationJob], Optional[GeneratedImage]]:
+        """Job of a prediction and its image, the image only while it runs."""
+        job = self.job_repository.get_job_by_id(job_id)
+        if job is None or job.status != JobStatus.RUNNING:
+            return job, None
+        return job, self.image_repository.get_image_by_id(job.image_id)
+
+    def _store_completion(
+        self,
+        prediction: ReplicatePrediction,
+        job: GenerationJob,
+        image: GeneratedImage,
+        output_url: Optional[str],
+    ) -> None:
+        """Set a prediction's output on its image and resolve it in one commit."""
+        if output_url and prediction.cache_key is not None:
+            generation_cache.record(
+                self.db, results=[(prediction.cache_key, output_url)]
+            )
+        self._set_output_url(image, output_url, prediction.view)
+        self.prediction_repository.resolve(
+            prediction.id,
+            PredictionStatus.SUCCEEDED if output_url else PredictionStatus.FAILED,
+            commit=False,
+        )
+        # refreshed in this thread, the event loop never lazy-loads them
         self.image_repository.raw_update_image(image)
+        self.db.refresh(job)
+
+    async def poll_overdue_predictions(self) -> int:
+        """
+        Complete the predictions whose webhook has not arrived.
+
+        Predictions pending for longer than REPLICATE_WEBHOOK_GRACE_SECONDS
+        are fetched from Replicate, and the finished ones completed as if
+        their webhook had been delivered.
+
+        Returns:
+            int: Number of predictions completed.
+        """
+        overdue = await self._run_db(self._get_overdue)
+
+        completed = 0
+        for prediction_id in overdue:
+            try:
+                prediction = await replicate_client.get(prediction_id)
+                if prediction.status in ("starting", "processing"):
+                    continue
+                await self.complete_prediction(prediction.dict(), source="poll")
+                completed += 1
+            except Exception as e:
+                logger.warning(f"Polling prediction {prediction_id} failed: {e}")
+        return completed
+
+    def _get_overdue(self) -> list[str]:
+        overdue = self.prediction_repository.get_overdue(
+            before=utcnow()
+            - datetime.timedelta(seconds=settings.REPLICATE_WEBHOOK_GRACE_SECONDS),
+            limit=POLL_BATCH_SIZE,
+        )
+        # hold no transaction across the calls to Replicate
+        self.db.rollback()
+        return overdue
 
-    async def _save_output_to_s3(self, output_url: str) -> str:
+    async def _save_output_to_s3(
+        self, output_url: str, timings: Optional[StageTimings] = None
+    ) -> str:
         """
         Transfer generated image from Replicate to S3 bucket.
 
         Args:
             output_url (str): Temporary URL of generated image.
+            timings (Optional[StageTimings]): Receives the download and
+                upload stages.
 
         Returns:
             str: Permanent S3 URL of uploaded image.
         """
-        # Save to local temp storage
-        local_path = await save_image_from_url(output_url)
-        file_info = get_file_info(local_path)
-
-        name = file_info["name"]
-        mimetype = file_info["mime"]
-        file_data = file_info["data"]
-
-        s3_url = ImageUploadService.upload_image_to_s3(
-            file_path=name,
-            file_data=file_data,
-            file_type=mimetype,
+        s3_url = await ImageUploadService.upload_image_from_url(
+            image_url=output_url,
             folder=settings.GENERATED_IMAGES_FOLDER,
+            timings=timings,
         )
         return s3_url
 
     @staticmethod
-    async def generate_image_from_replicate(prompt: str, image_input: str) -> str:
+    async def generate_image_from_replicate(
+        prompt: str, image_input: str, timings: Optional[StageTimings] = None
+    ) -> str:
         """
         Call Replicate API to generate styled image.
 
+        The call is bounded by a deadline, retried on transient errors and
+        refused while the Replicate circuit breaker is open.
+
         Args:
             prompt (str): Style prompt for generation.
             image_input (str): URL of input image.
+            timings (Optional[StageTimings]): Receives Replicate's queueing
+                and inference time.
 
         Returns:
             str: Prediction response with output URLs.
+
+        Raises:
+            CircuitOpenError: If Replicate is considered down.
         """
-        replicate_client = Client(api_token=settings.REPLICATE_API_TOKEN)
-        prediction = await replicate_client.async_run(
-            "bytedance/seedream-4",
-            input={
-                "size": "1K",
-                "width": 2048,
-                "height": 2048,
-                "prompt": prompt,
-                "max_images": 1,
-                "image_input": [image_input],
-                "aspect_ratio": "match_input_image",
-                "enhance_prompt": False,
-                "sequential_image_generation": "disabled",
-            },
+        prediction = await replicate_client.run(
+            REPLICATE_MODEL,
+            input={**prediction_params(prompt), "image_input": [image_input]},
+            timings=timings,
         )
         return prediction  # type: ignore
 
-    def get_available_styles(self):
+
+class AsyncImageGenService:
+    """Async service for the image generation routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.image_repository = AsyncGeneratedImageRepository(db)
+        self.counts_repository = AsyncImageCountsRepository(db)
+        self.upload_repository = AsyncUploadRepository(db)
+
+    async def create_image_generation_record(
+        self,
+        user_id: int,
+        style_id: int,
+        input_image_url: str,
+        commit: bool = True,
+    ) -> GeneratedImage:
+        """
+        Create database record for image generation request.
+
+        Args:
+            user_id (int): ID of requesting user.
+            style_id (int): ID of hairstyle to apply.
+            input_image_url (str): URL of input image.
+            commit (bool): Commit immediately, False leaves the record in
+                the session's transaction for the job queue to commit.
+
+        Returns:
+            GeneratedImage: Created database record.
+        """
+        style = await styles_catalog.get_style(style_id, self.db)
+        image_instance = await self.image_repository.create_image_object(
+            user_id=user_id,
+            style_id=style_id,
+            output_image_url=None,
+            input_image_url=input_image_url,
+            description=(style.description if style else None) or "",
+            commit=commit,
+        )
+        return image_instance
+
+    async def get_available_styles(self) -> StylesCatalog:
         """
-        Retrieve all hairstyles from database.
+        Retrieve all hairstyles from the cached catalog.
 
         Returns:
-            List[Style]: List of available style records.
+            StylesCatalog: Catalog with the serialized styles and their ETag.
         """
-        styles = self.style_repository.get_all_styles()
-        return styles
+        return await styles_catalog.load(self.db)
 
-    def get_image_record(self, image_id: int, user_id: int) -> GeneratedImage:
+    async def get_image_record(
+        self, image_id: int, user_id: int
+    ) -> Optional[GeneratedImage]:
         """
         Retrieve image generation record by ID and user.
 
@@ -239,42 +867,142 @@ class ImageGenService:
             user_id (int): ID of user who owns the record.
 
         Returns:
-            GeneratedImage: Image generation record with status.
+            Optional[GeneratedImage]: Image generation record with status.
         """
-        image_record = self.image_repository.get_image_by_user_and_id(
+        image_record = await self.image_repository.get_image_by_user_and_id(
             user_id=user_id,
             image_id=image_id,
         )
         return image_record
 
-    def get_images_by_user_id(
+    async def stream_status(
+        self, image_id: int, user_id: int, wait_for_views: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream status changes of an image as Server-Sent Events.
+
+        The first event carries the current state. Events published by the
+        generation service follow, and the record is re-read whenever none
+        arrived within STATUS_STREAM_RECHECK_SECONDS, which also covers
+        events lost between processes when REDIS_URL is not set. The
+        stream ends once the image is COMPLETED or FAILED.
+
+        Each read uses its own short session so no connection is held for
+        the lifetime of the stream.
+
+        Args:
+            image_id (int): ID of image generation record.
+            user_id (int): ID of user who owns the record.
+            wait_for_views (bool): Keep a COMPLETED image's stream open
+                until its side views are generated or have FAILED.
+
+        Yields:
+            str: SSE frames, ``status`` events and keep-alive comments.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.STATUS_STREAM_MAX_SECONDS
+
+        async with event_broker.subscribe(status_channel(image_id)) as queue:
+            # read after subscribing so no transition falls in between
+            current = await self._read_status(image_id, user_id)
+            if current is None:
+                return
+            yield self._status_event(current)
+
+            while not self._is_final(current, wait_for_views):
+                if loop.time() >= deadline:
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.STATUS_STREAM_RECHECK_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    message = await self._read_status(image_id, user_id)
+                    if message is None:
+                        return
+                    if message == current:
+                        yield ": keep-alive\n\n"
+                        continue
+                current = message
+                yield self._status_event(current)
+
+    @staticmethod
+    async def _read_status(image_id: int, user_id: int) -> Optional[dict]:
+        async with AsyncSessionLocal() as db:
+            image = await AsyncGeneratedImageRepository(db).get_image_by_user_and_id(
+                user_id=user_id, image_id=image_id
+            )
+            if image is None:
+                return None
+            return ImageGenStatusResponse.model_validate(image).model_dump(mode="json")
+
+    @staticmethod
+    def _is_final(status: dict, wait_for_views: bool) -> bool:
+        if status["status"] == ImageStatus.FAILED:
+            return True
+        if status["status"] != ImageStatus.COMPLETED:
+            return False
+        return not wait_for_views or all(
+            status[f"{view}_view_url"] for view in SIDE_VIEWS
+        )
+
+    @staticmethod
+    def _status_event(status: dict) -> str:
+        return f"event: status\ndata: {json.dumps(status)}\n\n"
+
+    async def get_images_by_user_id(
         self,
         user_id: int,
         page: int = 1,
         limit: int = 10,
         sort_desc: bool = True,
         favourites: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> UserImagesResponse:
         """
         Retrieve images by user ID with pagination.
 
+        Pages are addressed either by number or by the opaque ``next_cursor``
+        of the previous response. Cursor pages cost the same at any depth,
+        and the total comes from the user's maintained image counters.
+
         Args:
             user_id (int): ID of the user who owns the images.
             page (int): Page number for pagination. Defaults to 1.
             limit (int): Number of images per page. Defaults to 10.
             sort_desc (bool): Whether to sort images in descending order. Defaults to True.
             favourites (bool): If True, fetch only favourite images. Defaults to False.
+            cursor (Optional[str]): Cursor of the page to fetch, overrides page.
+            include_total (bool): Whether to return the number of images
+                matching the favourites filter. Defaults to True.
 
         Returns:
-            List[GeneratedImage]: List of images.
+            UserImagesResponse: Page of images with pagination details.
+
+        Raises:
+            InvalidCursorException: If the cursor cannot be decoded.
         """
-        images = self.image_repository.get_images_by_user_id(
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise InvalidCursorException()
+
+        # one extra row tells whether another page follows
+        images = await self.image_repository.get_images_by_user_id(
             user_id=user_id,
             page=page,
             limit=limit,
             sort_desc=sort_desc,
             favourites=favourites,
+            after=after,
+            lookahead=1,
         )
+        has_more = len(images) > limit
+        images = images[:limit]
+
         formatted_images = []
         for row in images:
             side_views = self.to_side_views(row)
@@ -291,33 +1019,64 @@ class ImageGenService:
             )
             formatted_images.append(user_image)
 
-        total_count = self.image_repository.count_images_by_user_id(user_id=user_id)
-        next_page = page + 1 if (page * limit) < total_count else None
+        total_count = None
+        if include_total:
+            counts = await self.counts_repository.get_counts(user_id=user_id)
+            total_count = counts.favourites if favourites else counts.total
+
+        next_cursor = None
+        if has_more:
+            last = images[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
 
         response = UserImagesResponse(
             images=formatted_images,
-            page=page,
+            page=None if after else page,
             limit=limit,
             total_images=total_count,
-            next_page=next_page,
+            next_page=page + 1 if has_more and not after else None,
+            next_cursor=next_cursor,
         )
         return response
 
-    def get_user_input_images(self, user_id: int) -> List[HttpUrl]:
+    async def get_user_input_images(
+        self, user_id: int, limit: int = 5, cursor: Optional[str] = None
+    ) -> UserUploadsResponse:
         """
-        Retrieve input images uploaded by the user.
+        Retrieve input images uploaded by the user, most recently used first.
 
         Args:
             user_id (int): ID of the user.
+            limit (int): Number of uploads per page. Defaults to 5.
+            cursor (Optional[str]): ``next_cursor`` of the previous page.
 
         Returns:
-            List[HttpUrl]: List of input image URLs.
+            UserUploadsResponse: Input image URLs and the next page cursor.
+
+        Raises:
+            InvalidCursorException: If the cursor cannot be decoded.
         """
-        images = self.image_repository.get_user_input_images(user_id=user_id, limit=5)
-        input_image_urls = [cast(HttpUrl, row.input_image_url) for row in images]
-        return input_image_urls
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise InvalidCursorException()
+
+        uploads = await self.upload_repository.get_recent_uploads(
+            user_id=user_id, limit=limit, after=after, lookahead=1
+        )
+        next_cursor = None
+        if len(uploads) > limit:
+            uploads = uploads[:limit]
+            next_cursor = encode_cursor(uploads[-1].last_used_at, uploads[-1].id)
 
-    def like_image(self, image_id: int, user_id: int) -> bool:
+        return UserUploadsResponse(
+            uploads=[cast(HttpUrl, row.input_image_url) for row in uploads],
+            next_cursor=next_cursor,
+        )
+
+    async def like_image(self, image_id: int, user_id: int) -> bool:
         """
         Like an image on behalf of a user.
 
@@ -325,10 +1084,12 @@ class ImageGenService:
             image_id (int): ID of the image to like.
             user_id (int): ID of the user liking the image.
         """
-        self.image_repository.like_image(user_id=user_id, image_id=image_id, liked=True)
+        await self.image_repository.like_image(
+            user_id=user_id, image_id=image_id, liked=True
+        )
         return True
 
-    def dislike_image(self, image_id: int, user_id: int) -> bool:
+    async def dislike_image(self, image_id: int, user_id: int) -> bool:
         """
         Dislike an image on behalf of a user.
 
@@ -336,12 +1097,13 @@ class ImageGenService:
             image_id (int): ID of the image to dislike.
             user_id (int): ID of the user disliking the image.
         """
-        self.image_repository.like_image(
+        await self.image_repository.like_image(
             user_id=user_id, image_id=image_id, liked=False
         )
         return True
 
-    def to_side_views(self, row: GeneratedImage) -> SideViewsResponse | None:
+    @staticmethod
+    def to_side_views(row: GeneratedImage) -> SideViewsResponse | None:
         rv = row.right_view_url
         lv = row.left_view_url
         bv = row.back_view_url
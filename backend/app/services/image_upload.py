@@ -5,26 +5,26 @@ This module provides functionality for generating presigned URLs and
 uploading images directly to S3 buckets.
 """
 
-import os
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
 
-import boto3
-from botocore.config import Config
 from core.config import settings
+from core.http_clients import http_clients
+from core.stage_timings import StageTimings
+from core.storage import s3_client
+from loguru import logger
 from schemas import ImageUploadResponse
-from utils import get_file_info, save_image_from_url
+from utils import get_image_file_info
 
-s3_client = boto3.client(
-    "s3",
-    region_name=settings.AWS_REGION,
-    config=Config(signature_version="s3v4"),
-)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 class ImageUploadService:
     """Service to handle image uploads to S3."""
 
     @staticmethod
-    def generate_presigned_url(
+    async def generate_presigned_url(
         file_path: str,
         expiration: int = 3600,
         file_type: str = "image/jpeg",
@@ -42,7 +42,7 @@ class ImageUploadService:
         """
         object_name = f"{settings.UPLOADS_FOLDER}{file_path}"
 
-        response = s3_client.generate_presigned_post(
+        response = await s3_client.generate_presigned_post(
             Bucket=settings.BUCKET_NAME,
             Key=object_name,
             Fields={"Content-Type": file_type},
@@ -67,7 +67,7 @@ class ImageUploadService:
         )
 
     @staticmethod
-    def upload_image_to_s3(
+    async def upload_image_to_s3(
         file_path: str,
         file_data: bytes,
         file_type: str,
@@ -86,7 +86,7 @@ class ImageUploadService:
         """
         object_name = f"{folder}{file_path}"
 
-        s3_client.put_object(
+        await s3_client.put_object(
             Bucket=settings.BUCKET_NAME,
             Key=object_name,
             Body=file_data,
@@ -100,36 +100,145 @@ class ImageUploadService:
     # method to save to s3 from url
     @staticmethod
     async def upload_image_from_url(
-        image_url: str, folder: str = settings.UPLOADS_FOLDER
+        image_url: str,
+        folder: str = settings.UPLOADS_FOLDER,
+        timings: Optional[StageTimings] = None,
     ) -> str:
         """
-        Download image from URL and upload to S3.
+        Stream an image from a URL into S3 without touching disk.
+
+        The body is read in chunks into a buffer of one S3 part. Images that
+        fit in a single part are stored with one put_object, larger ones are
+        sent as a multipart upload part by part, so memory use per upload is
+        bounded by the part size whatever the image size.
 
         Args:
             image_url (str): URL of the image to download.
             folder (str): S3 folder to upload the image to.
+            timings (Optional[StageTimings]): Receives the time spent in S3
+                calls as the upload stage and the rest as the download stage.
         Returns:
             str: Public URL of uploaded image.
-        temp_file_path = await save_image_from_url(image_url)
         """
-        temp_file_path = await save_image_from_url(image_url)
+        part_size = settings.S3_UPLOAD_PART_SIZE_MB * 1024 * 1024
+        started = time.perf_counter()
+        # download and upload interleave, so the S3 calls are timed one by one
+        uploading = 0.0
+
+        async def s3_call(call: Awaitable[Any]) -> Any:
+            nonlocal uploading
+            call_started = time.perf_counter()
+            try:
+                return await call
+            finally:
+                uploading += time.perf_counter() - call_started
+
+        async with http_clients.session.get(image_url) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to download image: {response.status}")
+
+            file_info = get_image_file_info(
+                image_url, response.headers.get("Content-Type")
+            )
+            object_name = f"{folder}{file_info['name']}"
+
+            buffer = bytearray()
+            upload_id = None
+            parts: list[dict] = []
+            try:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    buffer.extend(chunk)
+                    if len(buffer) < part_size:
+                        continue
+
+                    if upload_id is None:
+                        upload_id = (
+                            await s3_call(
+                                s3_client.create_multipart_upload(
+                                    Bucket=settings.BUCKET_NAME,
+                                    Key=object_name,
+                                    ContentType=file_info["mime"],
+                                )
+                            )
+                        )["UploadId"]
+                    parts.append(
+                        await s3_call(
+                            ImageUploadService._upload_part(
+                                object_name, upload_id, len(parts) + 1, bytes(buffer)
+                            )
+                        )
+                    )
+                    buffer.clear()
+
+                if upload_id is None:
+                    # whole image fits in one part, a plain PUT is cheaper
+                    await s3_call(
+                        s3_client.put_object(
+                            Bucket=settings.BUCKET_NAME,
+                            Key=object_name,
+                            Body=bytes(buffer),
+                            ContentType=file_info["mime"],
+                        )
+                    )
+                else:
+                    if buffer:
+                        parts.append(
+                            await s3_call(
+                                ImageUploadService._upload_part(
+                                    object_name,
+                                    upload_id,
+                                    len(parts) + 1,
+                                    bytes(buffer),
+                                )
+                            )
+                        )
+                    await s3_call(
+                        s3_client.complete_multipart_upload(
+                            Bucket=settings.BUCKET_NAME,
+                            Key=object_name,
+                            UploadId=upload_id,
+                            MultipartUpload={"Parts": parts},
+                        )
+                    )
+            except BaseException:
+                # cancelled uploads too, their parts are billed until aborted
+                if upload_id is not None:
+                    await ImageUploadService._abort_upload(object_name, upload_id)
+                raise
+
+        if timings is not None:
+            timings.record("upload", uploading)
+            timings.record("download", time.perf_counter() - started - uploading)
+        return ImageUploadService.make_url(object_name)
+
+    @staticmethod
+    async def _abort_upload(object_name: str, upload_id: str) -> None:
+        logger.warning(f"Aborting multipart upload of {object_name}")
         try:
-            file_info = get_file_info(temp_file_path)
-            file_name = file_info["name"]
-            file_data = file_info["data"]
-            file_type = file_info["mime"] or "application/octet-stream"
-
-            file_url = ImageUploadService.upload_image_to_s3(
-                file_path=file_name,
-                file_data=file_data,
-                file_type=file_type,
-                folder=folder,
+            # finishes even if the failed upload is cancelled once more
+            await asyncio.shield(
+                s3_client.abort_multipart_upload(
+                    Bucket=settings.BUCKET_NAME,
+                    Key=object_name,
+                    UploadId=upload_id,
+                )
             )
-        finally:
-            # Clean up temporary file
-            os.remove(temp_file_path)
+        except Exception as e:
+            # the original error is what the caller needs to see
+            logger.error(f"Aborting multipart upload of {object_name} failed: {e}")
 
-        return file_url
+    @staticmethod
+    async def _upload_part(
+        object_name: str, upload_id: str, part_number: int, data: bytes
+    ) -> dict:
+        response = await s3_client.upload_part(
+            Bucket=settings.BUCKET_NAME,
+            Key=object_name,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
 
     @staticmethod
     def make_url(file_path: str) -> str:
@@ -0,0 +1,158 @@
+"""
+Generation job queue service.
+
+This module turns image generation requests into durable queue entries
+so the API only pays for an INSERT and the work survives restarts. The
+credits a request may spend are reserved in the same transaction, so a
+request the user cannot pay for is never queued. Admission control turns
+requests away up front while the queue is full, and counts the user's
+in-flight requests after the reservation has locked the user's row, so
+parallel requests of one user cannot all slip under the limit.
+"""
+
+from typing import List
+
+import logfire
+from core.config import settings
+from core.exceptions import (
+    GenerationQueueFullException,
+    NotEnoughCreditsException,
+    TooManyGenerationsException,
+)
+from db import AsyncSession
+from enums import JobKind
+from models import CreditReservation, GeneratedImage, GenerationJob
+from repository import AsyncCreditRepository, AsyncJobRepository
+from utils import SIDE_VIEWS
+
+# credits charged per generated image, the main image and each side view
+CREDITS_PER_IMAGE = 1
+
+queue_depth = logfire.metric_gauge(
+    "generation.queue.depth", description="Generation jobs waiting for a worker"
+)
+admission_rejections = logfire.metric_counter(
+    "generation.admission.rejected",
+    description="Generation requests turned away by admission control",
+)
+
+
+class JobQueueService:
+    """Service to enqueue generation work for the worker pool."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.job_repository = AsyncJobRepository(db)
+        self.credit_repository = AsyncCreditRepository(db)
+
+    async def _admit(self) -> None:
+        depth = await self.job_repository.count_queued()
+        queue_depth.set(depth)
+        # a soft bound, requests of different users are not serialized
+        if settings.GENERATION_MAX_QUEUED and depth >= settings.GENERATION_MAX_QUEUED:
+            admission_rejections.add(1, {"reason": "queue_full"})
+            raise GenerationQueueFullException(settings.GENERATION_RETRY_AFTER_SECONDS)
+
+    async def _reserve(self, image: GeneratedImage, credits: int) -> CreditReservation:
+        await self._admit()
+        reservation = await self.credit_repository.reserve(
+            user_id=image.user_id, image_id=image.id, credits=credits
+        )
+        if reservation is None:
+            raise NotEnoughCreditsException()
+
+        # the reservation holds the user's row, so the count includes every
+        # request of the user that got here first and none that come later
+        limit = settings.GENERATION_MAX_IN_FLIGHT_PER_USER
+        if limit and await self.credit_repository.count_held(image.user_id) > limit:
+            await self.db.rollback()
+            admission_rejections.add(1, {"reason": "user_in_flight"})
+            raise TooManyGenerationsException(settings.GENERATION_RETRY_AFTER_SECONDS)
+        return reservation
+
+    async def enqueue_image(
+        self, image: GeneratedImage, commit: bool = True
+    ) -> GenerationJob:
+        """
+        Reserve the credit of an image record and queue its main style
+        generation, committing both together.
+
+        Args:
+            image (GeneratedImage): Image generation record.
+            commit (bool): Commit immediately, False leaves the job in the
+                session's transaction for the caller to commit.
+
+        Returns:
+            GenerationJob: The queued job.
+
+        Raises:
+            GenerationQueueFullException: If the queue is saturated.
+            TooManyGenerationsException: If the user has too many requests
+                in flight.
+            NotEnoughCreditsException: If the user cannot pay for the image.
+        """
+        reservation = await self._reserve(image, CREDITS_PER_IMAGE)
+        job = await self.job_repository.enqueue(
+            image_id=image.id,
+            kind=JobKind.IMAGE,
+            reservation_id=reservation.id,
+            credits=CREDITS_PER_IMAGE,
+            commit=False,
+        )
+        if commit:
+            await self.db.commit()
+        return job
+
+    async def enqueue_views(
+        self, image: GeneratedImage, commit: bool = True
+    ) -> List[GenerationJob]:
+        """
+        Queue the right, left and back view generations for an image record.
+
+        The credits of all three views are taken as one reservation. With
+        BATCH_VIEW_GENERATION enabled a single job generates all three
+        views and holds the whole reservation, otherwise one job is queued
+        per view holding one credit each.
+
+        Args:
+            image (GeneratedImage): Completed image generation record.
+            commit (bool): Commit immediately, False leaves the jobs in the
+                session's transaction for the caller to commit.
+
+        Returns:
+            List[GenerationJob]: The queued jobs.
+
+        Raises:
+            GenerationQueueFullException: If the queue is saturated.
+            TooManyGenerationsException: If the user has too many requests
+                in flight.
+            NotEnoughCreditsException: If the user cannot pay for the views.
+        """
+        reservation = await self._reserve(image, CREDITS_PER_IMAGE * len(SIDE_VIEWS))
+
+        if settings.BATCH_VIEW_GENERATION:
+            jobs = [
+                await self.job_repository.enqueue(
+                    image_id=image.id,
+                    kind=JobKind.VIEWS,
+                    reservation_id=reservation.id,
+                    credits=reservation.credits,
+                    commit=False,
+                )
+            ]
+        else:
+            jobs = [
+                await self.job_repository.enqueue(
+                    image_id=image.id,
+                    kind=JobKind.VIEW,
+                    view=view,
+                    reservation_id=reservation.id,
+                    credits=CREDITS_PER_IMAGE,
+                    commit=False,
+                )
+                for view in SIDE_VIEWS
+            ]
+
+        if commit:
+            await self.db.commit()
+        return jobs
@@ -0,0 +1,160 @@
+"""
+Reaper for stuck generation work.
+
+Jobs whose lease runs out are claimed again by the worker pool until
+JOB_MAX_ATTEMPTS, after which nothing would ever touch them. The reaper
+fails those jobs and refunds their credits, then closes images left
+PENDING or PROCESSING for JOB_REAP_AFTER_SECONDS with no queued or
+running job, so their status streams and pollers stop. Every worker
+process runs it, and a database advisory lock lets only one of them reap
+at a time.
+"""
+
+import asyncio
+import datetime
+from collections import Counter
+from typing import Optional
+
+import logfire
+from core.config import settings
+from db import Session, SessionLocal, advisory_lock
+from enums import ImageStatus, JobStatus
+from loguru import logger
+from models import GeneratedImage
+from repository import (
+    CreditRepository,
+    GeneratedImageRepository,
+    JobRepository,
+    PredictionRepository,
+)
+from utils import utcnow
+
+from .image_gen import publish_status
+from .replicate_client import replicate_client
+
+reaped = logfire.metric_counter(
+    "generation.reaper.reaped", description="Stuck jobs and images reaped, by kind"
+)
+
+# arbitrary, shared by every process reaping the same database
+REAPER_LOCK_KEY = 7_342_108_551
+
+
+class JobReaper:
+    """Fails exhausted jobs and closes images no job will finish."""
+
+    def __init__(self):
+        self._runs = 0
+        self._skipped = 0
+        self._totals: Counter[str] = Counter()
+        self._last_run: Optional[dict] = None
+
+    async def reap(self) -> Optional[dict]:
+        """
+        Reap once, unless another process is reaping.
+
+        The queries run in a worker thread, the cancellations and status
+        events of the reaped work are sent from the event loop afterwards.
+
+        Returns:
+            Optional[dict]: Counts of failed jobs, cancelled predictions and
+                closed images, or None if the lock was held elsewhere.
+        """
+        reaped_work = await asyncio.to_thread(self._reap)
+        if reaped_work is None:
+            return None
+        counts, abandoned, closed = reaped_work
+        for prediction_id in abandoned:
+            replicate_client.cancel(prediction_id)
+        for image in closed:
+            await publish_status(image)
+        return counts
+
+    def _reap(self) -> Optional[tuple[dict, list[str], list[GeneratedImage]]]:
+        with advisory_lock(REAPER_LOCK_KEY) as acquired:
+            if not acquired:
+                self._skipped += 1
+                return None
+            with SessionLocal() as db:
+                counts = {
+                    "failed_jobs": 0,
+                    "cancelled_predictions": 0,
+                    "closed_images": 0,
+                }
+                abandoned = self._fail_exhausted_jobs(db, counts)
+                closed = self._close_orphaned_images(db, counts)
+
+        self._runs += 1
+        self._totals.update(counts)
+        self._last_run = {"at": utcnow().isoformat(), **counts}
+        for kind, count in counts.items():
+            if count:
+                reaped.add(count, {"kind": kind})
+        return counts, abandoned, closed
+
+    def _fail_exhausted_jobs(self, db: Session, counts: dict) -> list[str]:
+        job_repository = JobRepository(db)
+        prediction_repository = PredictionRepository(db)
+        jobs = job_repository.get_exhausted(
+            now=utcnow(),
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            limit=settings.JOB_REAP_BATCH_SIZE,
+        )
+        abandoned = []
+        for job in jobs:
+            # a late completion may have finished the job since the query
+            error = f"Lease expired after {job.attempts} attempts"
+            if not job_repository.finish_running(
+                job.id, JobStatus.FAILED, error=error, commit=False
+            ):
+                db.rollback()
+                continue
+            CreditRepository(db).settle_job(job.id, used=0, commit=False)
+            db.commit()
+            counts["failed_jobs"] += 1
+            logger.warning(f"Reaped generation job {job.id}: {error}")
+
+            cancelled = prediction_repository.abandon_pending(job.id)
+            abandoned.extend(cancelled)
+            counts["cancelled_predictions"] += len(cancelled)
+        return abandoned
+
+    def _close_orphaned_images(self, db: Session, counts: dict) -> list[GeneratedImage]:
+        image_repository = GeneratedImageRepository(db)
+        before = utcnow() - datetime.timedelta(seconds=settings.JOB_REAP_AFTER_SECONDS)
+        closed = []
+        for image_id in image_repository.get_orphaned_ids(
+            before, limit=settings.JOB_REAP_BATCH_SIZE
+        ):
+            image = image_repository.lock_orphaned(image_id, before)
+            if image is None:
+                db.rollback()
+                continue
+            # an image that has its output only lost a side view job
+            image.status = (
+                ImageStatus.COMPLETED if image.output_image_url else ImageStatus.FAILED
+            )
+            image_repository.raw_update_image(image)
+            # published from the event loop once the session is closed
+            db.expunge(image)
+            counts["closed_images"] += 1
+            logger.warning(f"Reaped image {image.id} as {image.status.value}")
+            closed.append(image)
+        return closed
+
+    def stats(self) -> dict:
+        """
+        Reaper statistics of the process.
+
+        Returns:
+            dict: Runs, runs skipped for the lock, totals and the last run.
+        """
+        return {
+            "runs": self._runs,
+            "skipped": self._skipped,
+            "totals": dict(self._totals),
+            "last_run": self._last_run,
+        }
+
+
+job_reaper = JobReaper()
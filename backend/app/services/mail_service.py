@@ -10,6 +10,7 @@ Description: Mail service utilities.
 __author__ = "Maria Kevin"
 __version__ = "0.1.0"
 
+from core.http_clients import HttpClientRegistry
 from pydantic import EmailStr
 from utils import send_mail_async
 
@@ -17,12 +18,17 @@ from utils import send_mail_async
 class MailService:
     """Service for sending emails."""
 
+    def __init__(self, http_clients: HttpClientRegistry):
+        self.http_clients = http_clients
+
     async def send_password_reset_email(self, email: EmailStr, reset_link: str) -> bool:
         """Send a password reset email."""
         subject = "Password Reset Request"
         template_name = "reset_password.html"
         body = {"reset_link": reset_link}
-        return await send_mail_async(subject, email, body, template_name)
+        return await send_mail_async(
+            subject, email, body, template_name, session=self.http_clients.session
+        )
 
     async def send_signup_verification_email(
         self, email: EmailStr, name: str, verification_code: str
@@ -31,7 +37,9 @@ class MailService:
         subject = "Verify Your Email Address"
         template_name = "verify_signup.html"
         body = {"name": name, "verification_code": verification_code}
-        return await send_mail_async(subject, email, body, template_name)
+        return await send_mail_async(
+            subject, email, body, template_name, session=self.http_clients.session
+        )
 
     async def send_login_otp_email(
         self, email: EmailStr, name: str, verification_code: str
@@ -40,4 +48,6 @@ class MailService:
         subject = "Your Login OTP Code"
         template_name = "verify_login.html"
         body = {"name": name, "verification_code": verification_code}
-        return await send_mail_async(subject, email, body, template_name)
+        return await send_mail_async(
+            subject, email, body, template_name, session=self.http_clients.session
+        )
@@ -19,8 +19,8 @@ from core.exceptions import (
     TransactionNotFoundException,
     UserNotFoundException,
 )
+from core.http_clients import HttpClientRegistry
 from db import Session
-from dodopayments import AsyncDodoPayments
 from dodopayments.types import CheckoutSessionResponse
 from dodopayments.types.checkout_session_status import CheckoutSessionStatus
 from enums import IntentStatus
@@ -33,12 +33,9 @@ from schemas import WebhookRequest
 class PaymentService:
     """Service for handling payment operations with Dodo Payments."""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, http_clients: HttpClientRegistry):
         self.session = session
-        self.client = AsyncDodoPayments(
-            bearer_token=settings.DODO_PAYMENTS_API_KEY,
-            environment=settings.DODO_PAYMENTS_MODE,
-        )
+        self.client = http_clients.dodo
         self.transaction_repository = TransactionRepository(self.session)
         self.user_repository = UserRepository(self.session)
 
@@ -0,0 +1,364 @@
+"""
+Resilient Replicate predictions.
+
+This module wraps every prediction the workers run on Replicate. Each
+attempt is bounded by REPLICATE_DEADLINE_SECONDS and cancelled on the
+provider once it is abandoned, so a hung prediction neither pins a worker
+nor keeps billing. Transport errors, timeouts, 429s and 5xx responses are
+retried with jittered exponential backoff, while a circuit breaker fails
+fast once the provider keeps failing. With REPLICATE_HEDGE_AFTER_SECONDS
+set, a prediction still running after that delay is raced against a
+second one and the loser is cancelled. In webhook mode only the creation
+of a prediction goes through the retries and the breaker, Replicate posts
+the outcome to REPLICATE_WEBHOOK_URL.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+
+import httpx
+import logfire
+from core.config import settings
+from core.http_clients import http_clients
+from core.resilience import CircuitBreaker, backoff_delay
+from core.stage_timings import StageTimings
+from loguru import logger
+from replicate.exceptions import ModelError, ReplicateError
+from replicate.helpers import transform_output
+from replicate.prediction import Prediction
+from replicate.webhook import WebhookSigningSecret, Webhooks
+
+T = TypeVar("T")
+
+# deliveries signed longer ago than this are refused as replays
+WEBHOOK_TOLERANCE_SECONDS = 300
+
+prediction_duration = logfire.metric_histogram(
+    "replicate.prediction.duration",
+    unit="s",
+    description="Duration of Replicate prediction attempts by outcome",
+)
+prediction_attempts = logfire.metric_counter(
+    "replicate.prediction.attempts", description="Replicate attempts by outcome"
+)
+prediction_retries = logfire.metric_counter(
+    "replicate.prediction.retries", description="Replicate attempts retried"
+)
+prediction_hedges = logfire.metric_counter(
+    "replicate.prediction.hedges", description="Hedged predictions by winner"
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed attempt may succeed when tried again.
+
+    Args:
+        error (BaseException): Error of the attempt.
+
+    Returns:
+        bool: True for deadlines, transport errors, 429s and 5xx responses.
+            Failed predictions and other client errors are final.
+    """
+    if isinstance(error, (TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, ReplicateError):
+        return error.status is None or error.status == 429 or error.status >= 500
+    return False
+
+
+class ReplicateClient:
+    """Runs Replicate predictions with deadlines, retries, breaker and hedging."""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            "replicate",
+            failure_threshold=settings.REPLICATE_BREAKER_FAILURES,
+            reset_seconds=settings.REPLICATE_BREAKER_RESET_SECONDS,
+        )
+        # remote cancellations outlive the attempt that abandoned them
+        self._cancelling: set[asyncio.Task] = set()
+        self._attempts = 0
+        self._retries = 0
+        self._timeouts = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    async def run(
+        self, model: str, input: dict, timings: Optional[StageTimings] = None
+    ) -> Any:
+        """
+        Run a prediction and return its output.
+
+        Args:
+            model (str): Model reference as ``owner/name``.
+            input (dict): Model input.
+            timings (Optional[StageTimings]): Receives Replicate's queueing
+                and inference time of the prediction that succeeded.
+
+        Returns:
+            Any: Prediction output, file URLs wrapped as ``FileOutput``.
+
+        Raises:
+            CircuitOpenError: If the breaker refuses the call.
+            TimeoutError: If the last attempt ran past its deadline.
+            ModelError: If the prediction failed on Replicate.
+            ReplicateError: If the API rejected the prediction.
+        """
+        return await self._with_retries(
+            "run", lambda: self._attempt(model, input, timings)
+        )
+
+    async def create(self, model: str, input: dict, webhook: str) -> Prediction:
+        """
+        Create a prediction that reports its completion to a webhook.
+
+        Only the creation is bounded and retried, the prediction itself runs
+        on Replicate without holding the caller.
+
+        Args:
+            model (str): Model reference as ``owner/name``.
+            input (dict): Model input.
+            webhook (str): URL Replicate posts the completed prediction to.
+
+        Returns:
+            Prediction: The created prediction.
+
+        Raises:
+            CircuitOpenError: If the breaker refuses the call.
+            TimeoutError: If the last attempt ran past its deadline.
+            ReplicateError: If the API rejected the prediction.
+        """
+        client = http_clients.replicate
+        return await self._with_retries(
+            "create",
+            lambda: asyncio.wait_for(
+                client.models.predictions.async_create(
+                    model=model,
+                    input=input,
+                    webhook=webhook,
+                    webhook_events_filter=["completed"],
+                ),
+                timeout=settings.REPLICATE_DEADLINE_SECONDS,
+            ),
+        )
+
+    async def get(self, prediction_id: str) -> Prediction:
+        """
+        Fetch the current state of a prediction.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+
+        Returns:
+            Prediction: The prediction.
+        """
+        return await http_clients.replicate.predictions.async_get(prediction_id)
+
+    async def _with_retries(
+        self, operation: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        attempt = 1
+        while True:
+            self.breaker.before_call()
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                outcome = "timeout" if isinstance(e, TimeoutError) else "error"
+                self._record(operation, outcome, started)
+                if not retryable:
+                    # the provider answered, it is the input it refused
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if (
+                    attempt >= settings.REPLICATE_MAX_ATTEMPTS
+                    or self.breaker.state == "open"
+                ):
+                    raise
+
+                delay = backoff_delay(
+                    attempt,
+                    settings.REPLICATE_BACKOFF_BASE_SECONDS,
+                    settings.REPLICATE_BACKOFF_MAX_SECONDS,
+                )
+                logger.warning(
+                    f"Replicate attempt {attempt} failed ({e!r}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                self._retries += 1
+                prediction_retries.add(1, {"operation": operation})
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record(operation, "success", started)
+            self.breaker.record_success()
+            return result
+
+    def _record(self, operation: str, outcome: str, started: float) -> None:
+        self._attempts += 1
+        if outcome == "timeout":
+            self._timeouts += 1
+        attributes = {"operation": operation, "outcome": outcome}
+        prediction_attempts.add(1, attributes)
+        prediction_duration.record(time.perf_counter() - started, attributes)
+
+    async def _attempt(
+        self, model: str, input: dict, timings: Optional[StageTimings]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.REPLICATE_DEADLINE_SECONDS
+        hedge_at: Optional[float] = None
+        if settings.REPLICATE_HEDGE_AFTER_SECONDS > 0:
+            hedge_at = loop.time() + settings.REPLICATE_HEDGE_AFTER_SECONDS
+
+        primary = asyncio.create_task(self._predict(model, input, timings))
+        pending = {primary}
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                wake_at = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, wake_at - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if hedged:
+                            self._record_hedge(task is primary)
+                        return task.result()
+                    error = task.exception()
+
+                if not pending or done:
+                    continue
+                if loop.time() >= deadline:
+                    raise TimeoutError(
+                        "Replicate prediction exceeded "
+                        f"{settings.REPLICATE_DEADLINE_SECONDS:g}s"
+                    )
+                # still running at the hedge delay, race a second prediction
+                # unless the provider is already struggling
+                if hedge_at is not None:
+                    hedge_at = None
+                    if self.breaker.state == "closed":
+                        hedged = True
+                        self._hedges += 1
+                        pending.add(
+                            asyncio.create_task(self._predict(model, input, timings))
+                        )
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        assert error is not None
+        raise error
+
+    def _record_hedge(self, primary_won: bool) -> None:
+        winner = "primary" if primary_won else "hedge"
+        if not primary_won:
+            self._hedge_wins += 1
+        prediction_hedges.add(1, {"winner": winner})
+
+    async def _predict(
+        self, model: str, input: dict, timings: Optional[StageTimings]
+    ) -> Any:
+        client = http_clients.replicate
+        prediction = await client.models.predictions.async_create(
+            model=model, input=input
+        )
+        try:
+            await prediction.async_wait()
+        except asyncio.CancelledError:
+            self.cancel(prediction.id)
+            raise
+
+        if prediction.status != "succeeded":
+            raise ModelError(prediction)
+        if timings is not None:
+            timings.record_prediction(
+                prediction.created_at,
+                prediction.started_at,
+                prediction.completed_at,
+                prediction.metrics,
+            )
+        return transform_output(prediction.output, client)
+
+    def cancel(self, prediction_id: str) -> None:
+        """
+        Cancel a prediction on Replicate in the background.
+
+        Args:
+            prediction_id (str): Replicate's prediction ID.
+        """
+
+        async def cancel() -> None:
+            try:
+                await http_clients.replicate.predictions.async_cancel(prediction_id)
+            except Exception as e:
+                logger.warning(f"Could not cancel prediction {prediction_id}: {e}")
+
+        task = asyncio.create_task(cancel())
+        self._cancelling.add(task)
+        task.add_done_callback(self._cancelling.discard)
+
+    @staticmethod
+    def verify_webhook(headers: Mapping[str, str], body: str) -> bool:
+        """
+        Check the signature of a webhook delivery.
+
+        Args:
+            headers (Mapping[str, str]): Request headers, with the
+                ``webhook-id``, ``webhook-timestamp`` and ``webhook-signature``
+                Standard Webhooks headers.
+            body (str): Raw request body.
+
+        Returns:
+            bool: True if REPLICATE_WEBHOOK_SECRET signed the delivery
+                recently enough.
+        """
+        if not settings.REPLICATE_WEBHOOK_SECRET:
+            logger.warning("Replicate webhook received without a signing secret")
+            return False
+        try:
+            Webhooks.validate(
+                headers=dict(headers),
+                body=body,
+                secret=WebhookSigningSecret(key=settings.REPLICATE_WEBHOOK_SECRET),
+                tolerance=WEBHOOK_TOLERANCE_SECONDS,
+            )
+        except ValueError:
+            # validation errors, malformed timestamps and bad base64 alike
+            return False
+        return True
+
+    def stats(self) -> dict:
+        """
+        Replicate call statistics of the process.
+
+        Returns:
+            dict: Completion mode, attempt, retry, timeout and hedge counts
+                with breaker state.
+        """
+        return {
+            "completion": "webhook" if settings.USE_REPLICATE_WEBHOOKS else "wait",
+            "attempts": self._attempts,
+            "retries": self._retries,
+            "timeouts": self._timeouts,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+            "breaker": self.breaker.stats(),
+        }
+
+
+replicate_client = ReplicateClient()
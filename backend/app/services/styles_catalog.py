@@ -0,0 +1,147 @@
+"""
+In-memory styles catalog.
+
+This module keeps a copy of the styles table for the styles endpoint and
+the generation workers. The catalog is dropped when an admin edits a
+style and otherwise reloaded after STYLES_CACHE_TTL_SECONDS. With
+REDIS_URL set, admin edits also bump a shared version so every API
+worker reloads on its next request.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import List, Optional, cast
+
+from core.cache import get_redis
+from core.config import settings
+from db import AsyncSession, Session
+from loguru import logger
+from models import Styles
+from pydantic import TypeAdapter
+from repository import AsyncStyleRepository, StyleRepository
+from schemas import StyleCatalogEntry, StylesResponse
+
+VERSION_KEY = "styles:version"
+
+styles_response_adapter = TypeAdapter(List[StylesResponse])
+
+
+class StylesCatalog:
+    """Cached styles with a pre-serialized response body and its ETag."""
+
+    def __init__(self):
+        self._styles: dict[int, StyleCatalogEntry] | None = None
+        self._body = b"[]"
+        self._etag = ""
+        self._version: Optional[str] = None
+        self._expires_at = 0.0
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def body(self) -> bytes:
+        """JSON body of the styles endpoint."""
+        return self._body
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of the current body."""
+        return self._etag
+
+    async def load(self, db: AsyncSession) -> "StylesCatalog":
+        """
+        Make sure the catalog is current, reloading it when needed.
+
+        Args:
+            db (AsyncSession): Session used when the catalog must be reloaded.
+
+        Returns:
+            StylesCatalog: The catalog itself.
+        """
+        version = await self._shared_version()
+        if self._is_stale() or version != self._version:
+            styles = await AsyncStyleRepository(db).get_all_styles()
+            self._fill(styles, version)
+        return self
+
+    async def get_style(
+        self, style_id: int, db: AsyncSession
+    ) -> Optional[StyleCatalogEntry]:
+        """
+        Get one style from the catalog.
+
+        Args:
+            style_id (int): ID of the style.
+            db (AsyncSession): Session used when the catalog must be reloaded.
+
+        Returns:
+            Optional[StyleCatalogEntry]: The style, or None if not found.
+        """
+        await self.load(db)
+        return (self._styles or {}).get(style_id)
+
+    def get_style_sync(self, style_id: int, db: Session) -> Optional[StyleCatalogEntry]:
+        """
+        Get one style from the catalog in synchronous code, e.g. workers.
+
+        Reloads on expiry only, the shared version is not checked here.
+
+        Args:
+            style_id (int): ID of the style.
+            db (Session): Session used when the catalog must be reloaded.
+
+        Returns:
+            Optional[StyleCatalogEntry]: The style, or None if not found.
+        """
+        if self._is_stale():
+            self._fill(StyleRepository(db).get_all_styles(), self._version)
+        return (self._styles or {}).get(style_id)
+
+    def invalidate(self) -> None:
+        """Drop the catalog after a style was created, edited or deleted."""
+        self._styles = None
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._bump_shared_version())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _is_stale(self) -> bool:
+        return self._styles is None or self._expires_at < time.monotonic()
+
+    def _fill(self, styles: List[Styles], version: Optional[str]) -> None:
+        entries = [StyleCatalogEntry.model_validate(style) for style in styles]
+        self._body = styles_response_adapter.dump_json(
+            [StylesResponse.model_validate(entry.model_dump()) for entry in entries]
+        )
+        self._etag = f'"{hashlib.sha256(self._body).hexdigest()[:32]}"'
+        self._styles = {entry.id: entry for entry in entries}
+        self._version = version
+        self._expires_at = time.monotonic() + settings.STYLES_CACHE_TTL_SECONDS
+
+    async def _shared_version(self) -> Optional[str]:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            # the shared client decodes responses to str
+            return cast(Optional[str], await client.get(VERSION_KEY))
+        except Exception as e:
+            # keep serving the loaded catalog until it expires
+            logger.warning(f"Styles catalog version check failed: {e}")
+            return self._version
+
+    @staticmethod
+    async def _bump_shared_version() -> None:
+        try:
+            await get_redis().incr(VERSION_KEY)  # type: ignore[union-attr]
+        except Exception as e:
+            logger.warning(f"Styles catalog version bump failed: {e}")
+
+
+styles_catalog = StylesCatalog()
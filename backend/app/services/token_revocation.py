@@ -0,0 +1,179 @@
+"""
+Token revocation store.
+
+This module answers "was this token revoked?" for the auth dependencies.
+Every process keeps a Bloom filter of the revoked JWT IDs, so the common
+case of a token that was never revoked is settled without a query and
+only filter hits are confirmed against blacklist_tokens. Revocations made
+by other workers are read incrementally every TOKEN_REVOCATION_SYNC_SECONDS,
+which bounds how long another process can miss one. Expired rows are
+purged every TOKEN_REVOCATION_PURGE_SECONDS to keep the table bounded.
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+from typing import Optional
+
+import logfire
+from core.config import settings
+from db import Session, SessionLocal
+from enums import TokenType
+from loguru import logger
+from repository import TokenRepository
+from utils import BloomFilter, utcnow
+
+revocation_checks = logfire.metric_counter(
+    "token_revocation.checks", description="Token revocation checks by result"
+)
+
+# rows committed late by a slow transaction are still picked up by the next
+# sync, as long as they were written within this window
+SYNC_OVERLAP = datetime.timedelta(seconds=30)
+
+
+class TokenRevocationStore:
+    """Process-wide filter of revoked JWT IDs backed by blacklist_tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._synced_at = 0.0
+        self._since: Optional[datetime.datetime] = None
+        self._checks = 0
+        self._filtered = 0
+        self._db_checks = 0
+        self._purged = 0
+
+    def _build(self, db: Session) -> None:
+        now = utcnow()
+        jtis = TokenRepository(db).get_active_jtis(now)
+        bloom = BloomFilter(
+            max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, 2 * len(jtis)),
+            settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+        self._since = now - SYNC_OVERLAP
+        self._synced_at = time.monotonic()
+
+    def _sync(self, db: Session) -> None:
+        if self._filter is None:
+            self._build(db)
+            return
+        if time.monotonic() - self._synced_at < settings.TOKEN_REVOCATION_SYNC_SECONDS:
+            return
+
+        now = utcnow()
+        for jti in TokenRepository(db).get_active_jtis(now, since=self._since):
+            # rows of the overlap window come back on every sync
+            if jti not in self._filter:
+                self._filter.add(jti)
+        self._since = now - SYNC_OVERLAP
+        self._synced_at = time.monotonic()
+
+        # past its capacity the false positive rate climbs, start over
+        if len(self._filter) > self._filter.capacity:
+            self._build(db)
+
+    def is_revoked(self, jti: str, db: Session) -> bool:
+        """
+        Check whether a token was revoked.
+
+        Args:
+            jti (str): The JWT ID of the token.
+            db (Session): Session used to sync the filter and confirm hits.
+
+        Returns:
+            bool: True if the token is revoked, False otherwise.
+        """
+        with self._lock:
+            self._sync(db)
+            bloom = self._filter
+            assert bloom is not None
+            self._checks += 1
+            if jti not in bloom:
+                self._filtered += 1
+                revocation_checks.add(1, {"result": "filtered"})
+                return False
+            self._db_checks += 1
+
+        revoked = TokenRepository(db).is_token_blacklisted(jti)
+        revocation_checks.add(1, {"result": "revoked" if revoked else "allowed"})
+        return revoked
+
+    def revoke(
+        self,
+        jti: str,
+        token_type: TokenType,
+        expires_at: Optional[datetime.datetime],
+        db: Session,
+    ) -> None:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti (str): The JWT ID of the token.
+            token_type (TokenType): Kind of the token.
+            expires_at (Optional[datetime.datetime]): Expiry of the token,
+                naive UTC.
+            db (Session): Session the revocation is written with.
+        """
+        TokenRepository(db).blacklist_token(
+            jti, token_type=token_type, expires_at=expires_at
+        )
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def purge(self) -> int:
+        """
+        Delete the revocations of expired tokens and rebuild the filter.
+
+        Returns:
+            int: Number of deleted revocations.
+        """
+        max_lifetime = datetime.timedelta(
+            minutes=max(
+                settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+                settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+            )
+        )
+        with SessionLocal() as db:
+            deleted = TokenRepository(db).purge_expired(utcnow(), max_lifetime)
+            with self._lock:
+                self._build(db)
+        self._purged += deleted
+        return deleted
+
+    async def run_purge_loop(self) -> None:
+        """Purge expired revocations every TOKEN_REVOCATION_PURGE_SECONDS."""
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_PURGE_SECONDS)
+            try:
+                deleted = await asyncio.to_thread(self.purge)
+                if deleted:
+                    logger.info(f"Purged {deleted} expired token revocations")
+            except Exception as e:
+                logger.warning(f"Token revocation purge failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Token revocation statistics of the process.
+
+        Returns:
+            dict: Filter size, check totals split by how they were settled
+                and purged rows.
+        """
+        return {
+            "entries": len(self._filter) if self._filter is not None else 0,
+            "checks": self._checks,
+            "filtered": self._filtered,
+            "db_checks": self._db_checks,
+            "purged": self._purged,
+        }
+
+
+revocation_store = TokenRevocationStore()
@@ -0,0 +1,248 @@
+"""
+Worker pool for the generation job queue.
+
+This module drains the durable job queue with a bounded number of
+concurrent coroutines. Each running job holds a lease that is renewed
+while it runs, so jobs of a worker that dies are picked up again once
+the lease expires. Claims pause while GENERATION_MAX_RUNNING jobs run
+across the fleet, so a burst waits in the queue rather than piling onto
+Replicate. Every pool also runs the reaper for work stuck past its
+retries and the refresh of the analytics rollups. In webhook mode a job
+only holds its slot while its predictions are created, and the pool also
+polls the predictions whose webhook is overdue.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Optional, cast
+
+import logfire
+from core.config import settings
+from core.stage_timings import StageTimings
+from db import Session, SessionLocal
+from enums import JobKind, JobStatus
+from loguru import logger
+from models import GeneratedImage, GenerationJob
+from repository import CreditRepository, GeneratedImageRepository, JobRepository
+from utils import ViewName
+
+from .analytics import generation_rollups
+from .image_gen import ImageGenService
+from .job_queue import queue_depth
+from .job_reaper import job_reaper
+
+queue_wait = logfire.metric_histogram(
+    "generation.queue.wait",
+    unit="s",
+    description="Time generation jobs waited in the queue before a worker claimed them",
+)
+
+
+class WorkerPool:
+    """Pool of coroutines that claim and run generation jobs."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL_SECONDS
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.worker_id = (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )[:64]
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Run the worker loops until stop() is called."""
+        logger.info(
+            f"Worker {self.worker_id} started with concurrency {self.concurrency}"
+        )
+        loops = [self._worker_loop(slot) for slot in range(self.concurrency)]
+        loops.append(self._reap_loop())
+        loops.append(self._rollup_loop())
+        if settings.USE_REPLICATE_WEBHOOKS:
+            loops.append(self._poll_loop())
+        await asyncio.gather(*loops)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Stop claiming new jobs, in-flight jobs are allowed to finish."""
+        self._stopping.set()
+
+    async def _worker_loop(self, slot: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = await asyncio.to_thread(self._claim_next)
+            except Exception:
+                logger.exception(f"Worker slot {slot} failed to claim a job")
+                job_id = None
+
+            if job_id is None:
+                await self._sleep(self.poll_interval)
+                continue
+
+            await self._run_job(job_id)
+
+    async def _reap_loop(self) -> None:
+        while not self._stopping.is_set():
+            await self._sleep(settings.JOB_REAP_INTERVAL_SECONDS)
+            try:
+                counts = await job_reaper.reap()
+                if counts and any(counts.values()):
+                    logger.info(f"Reaper run: {counts}")
+            except Exception:
+                logger.exception("Reaping stuck generation work failed")
+
+    async def _rollup_loop(self) -> None:
+        while not self._stopping.is_set():
+            await self._sleep(settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)
+            try:
+                folded = await generation_rollups.refresh()
+                if folded:
+                    logger.info(f"Folded {folded} images into the analytics rollups")
+            except Exception:
+                logger.exception("Refreshing the analytics rollups failed")
+
+    async def _poll_loop(self) -> None:
+        while not self._stopping.is_set():
+            await self._sleep(settings.REPLICATE_WEBHOOK_POLL_SECONDS)
+            db = SessionLocal()
+            try:
+                completed = await ImageGenService(db).poll_overdue_predictions()
+                if completed:
+                    logger.info(f"Completed {completed} predictions by polling")
+            except Exception:
+                logger.exception("Polling overdue predictions failed")
+            finally:
+                await asyncio.to_thread(db.close)
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except TimeoutError:
+            pass
+
+    def _claim_next(self) -> Optional[int]:
+        with SessionLocal() as db:
+            job_repository = JobRepository(db)
+            job = job_repository.claim_next(
+                worker_id=self.worker_id,
+                lease_seconds=self.lease_seconds,
+                max_attempts=self.max_attempts,
+                max_running=settings.GENERATION_MAX_RUNNING,
+            )
+            # kept current while the queue drains, not only on new requests
+            queue_depth.set(job_repository.count_queued())
+            if job is None:
+                return None
+            if job.attempts == 1 and job.started_at:
+                wait = job.started_at - job.created_at
+                queue_wait.record(wait.total_seconds(), {"kind": job.kind.value})
+            return job.id
+
+    def _extend_lease(self, job_id: int) -> bool:
+        with SessionLocal() as db:
+            return JobRepository(db).extend_lease(
+                job_id, worker_id=self.worker_id, lease_seconds=self.lease_seconds
+            )
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self._extend_lease, job_id):
+                logger.warning(
+                    f"Worker {self.worker_id} lost the lease on job {job_id}"
+                )
+                return
+
+    async def _run_job(self, job_id: int) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        # queries run in threads, objects must stay loaded across commits so
+        # the event loop never lazy-loads them
+        db = SessionLocal(expire_on_commit=False)
+        timings: Optional[StageTimings] = None
+        dispatched = False
+        try:
+            job, image = await asyncio.to_thread(self._load_job, db, job_id)
+            if job is None:
+                return
+            timings = StageTimings(job.kind.value)
+            if job.attempts == 1 and job.started_at:
+                # a reclaimed job's started_at is its retry, not its dequeue
+                timings.record(
+                    "queue_wait", (job.started_at - job.created_at).total_seconds()
+                )
+
+            if image is None:
+                raise ValueError(f"Image {job.image_id} not found")
+
+            service = ImageGenService(db, timings=timings)
+            if settings.USE_REPLICATE_WEBHOOKS:
+                await service.dispatch_generation(image, job)
+                dispatched = True
+            elif job.kind == JobKind.VIEWS:
+                await service.start_view_generation(image, job_id=job_id)
+            elif job.kind == JobKind.VIEW:
+                view = cast(ViewName, job.view)
+                await service.start_image_generation(image, view, job_id=job_id)
+            else:
+                await service.start_image_generation(image, job_id=job_id)
+
+        except Exception as e:
+            logger.exception(f"Generation job {job_id} failed: {e}")
+            stages = timings.as_dict() if timings is not None else None
+            await asyncio.to_thread(self._fail_job, db, job_id, stages, str(e))
+
+        else:
+            if dispatched:
+                # the last completion finishes the job, the heartbeat must
+                # not shorten the lease given for Replicate to answer
+                heartbeat.cancel()
+            stages = cast(StageTimings, timings).as_dict()
+            await asyncio.to_thread(self._complete_job, db, job_id, stages, dispatched)
+
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(db.close)
+
+    @staticmethod
+    def _load_job(
+        db: Session, job_id: int
+    ) -> tuple[Optional[GenerationJob], Optional[GeneratedImage]]:
+        job = JobRepository(db).get_job_by_id(job_id)
+        if job is None:
+            return None, None
+        return job, GeneratedImageRepository(db).get_image_by_id(job.image_id)
+
+    @staticmethod
+    def _fail_job(db: Session, job_id: int, stages: Optional[dict], error: str) -> None:
+        job_repository = JobRepository(db)
+        db.rollback()
+        if stages is not None:
+            job_repository.record_stages(job_id, stages, commit=False)
+        # refunds the job's credits unless the generation settled them
+        CreditRepository(db).settle_job(job_id, used=0, commit=False)
+        job_repository.finish(job_id, JobStatus.FAILED, error=error)
+
+    def _complete_job(
+        self, db: Session, job_id: int, stages: dict, dispatched: bool
+    ) -> None:
+        job_repository = JobRepository(db)
+        job_repository.record_stages(job_id, stages, commit=False)
+        if dispatched:
+            # the last completion finishes the job, until then it keeps a
+            # lease long enough for Replicate to answer
+            job_repository.extend_lease(
+                job_id,
+                worker_id=self.worker_id,
+                lease_seconds=settings.REPLICATE_WEBHOOK_TIMEOUT_SECONDS,
+            )
+        else:
+            job_repository.finish(job_id, JobStatus.COMPLETED)
@@ -8,8 +8,15 @@ from .auth import (
     hash_password,
     verify_password,
 )
-from .helpers import get_file_info, save_image_from_url
-from .prompt_builder import get_view_prompt
+from .bloom import BloomFilter
+from .helpers import (
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    get_image_file_info,
+    utcnow,
+)
+from .prompt_builder import SIDE_VIEWS, ViewName, get_view_prompt
 from .send_email import send_mail_async
 
 __all__ = [
@@ -18,11 +25,17 @@ __all__ = [
     "create_access_token",
     "decode_access_token",
     "generate_fake_password",
-    "save_image_from_url",
-    "get_file_info",
+    "get_image_file_info",
     "send_mail_async",
     "get_jti_from_token",
     "create_refresh_token",
     "decode_refresh_token",
     "get_view_prompt",
+    "utcnow",
+    "etag_matches",
+    "encode_cursor",
+    "decode_cursor",
+    "BloomFilter",
+    "SIDE_VIEWS",
+    "ViewName",
 ]
@@ -1,38 +1,17 @@
 """
 Helper utilities for file and image operations.
 
-This module provides utility functions for downloading images from URLs
-and extracting file metadata.
+This module provides utility functions for naming downloaded images,
+extracting file metadata and encoding pagination cursors.
 """
 
+import base64
+import binascii
+import datetime
 import mimetypes
 import os
-import tempfile
 import uuid
 
-import aiohttp
-
-
-async def save_image_from_url(image_url: str) -> str:
-    """
-    Downloads an image from the given URL and saves it to a temporary file.
-    Returns the path to the temporary file.
-    """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(image_url) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to download image: {response.status}")
-            img_data = await response.read()
-
-    temp_dir = tempfile.gettempdir()
-    ext = get_extension_from_url(image_url, default=".jpg")
-    filename = str(uuid.uuid4()) + ext
-
-    temp_file_path = os.path.join(temp_dir, filename)
-    with open(temp_file_path, "wb") as f:
-        f.write(img_data)
-    return temp_file_path
-
 
 def get_extension_from_url(url: str, default: str = ".jpg") -> str:
     """
@@ -47,19 +26,60 @@ def get_extension_from_url(url: str, default: str = ".jpg") -> str:
     return ext if ext else default
 
 
-def get_file_info(file_path: str) -> dict:
+def get_image_file_info(url: str, content_type: str | None = None) -> dict:
     """
-    Returns basic information about the file such as size and name.
+    Returns a unique file name and MIME type for an image fetched from a URL.
+    The Content-Type header wins when it names an image, otherwise the type
+    is guessed from the URL extension.
     """
+    ext = get_extension_from_url(url, default=".jpg")
+    if not content_type or not content_type.startswith("image/"):
+        content_type = mimetypes.guess_type(f"file{ext}")[0]
 
-    if not os.path.isfile(file_path):
-        raise FileNotFoundError(f"No such file: {file_path}")
-
-    file_info = {
-        "name": os.path.basename(file_path),
-        "size": os.path.getsize(file_path),
-        "path": file_path,
-        "data": open(file_path, "rb").read(),
-        "mime": mimetypes.guess_type(file_path)[0],
+    return {
+        "name": str(uuid.uuid4()) + ext,
+        "mime": content_type or "application/octet-stream",
     }
-    return file_info
+
+
+def utcnow() -> datetime.datetime:
+    """
+    Returns the current UTC time as a naive datetime, matching the
+    timezone-less DateTime columns used by the models.
+    """
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks an If-None-Match header against the current ETag, using the
+    weak comparison RFC 9110 prescribes for this header.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def encode_cursor(created_at: datetime.datetime, id: int) -> str:
+    """
+    Returns an opaque keyset pagination cursor pointing at a row, made of
+    its creation time and ID.
+    """
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """
+    Returns the creation time and ID encoded by encode_cursor.
+    Raises ValueError when the cursor was not produced by it.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
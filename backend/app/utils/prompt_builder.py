@@ -13,6 +13,10 @@ __version__ = "0.1.0"
 
 from typing import Literal
 
+ViewName = Literal["right", "left", "back"]
+
+SIDE_VIEWS: tuple[ViewName, ...] = ("right", "left", "back")
+
 VIEW_CONFIG = {
     "left": (
         "Portrait of the same person shown in the input headshot, rendered in matching age, "
@@ -35,5 +39,5 @@ VIEW_CONFIG = {
 }
 
 
-def get_view_prompt(view: Literal["right", "left", "back"]):
+def get_view_prompt(view: ViewName):
     return VIEW_CONFIG[view]
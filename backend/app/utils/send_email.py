@@ -8,7 +8,11 @@ from pydantic import EmailStr
 
 
 async def send_mail_async(
-    subject: str, email: EmailStr, body: dict, template_name: str
+    subject: str,
+    email: EmailStr,
+    body: dict,
+    template_name: str,
+    session: aiohttp.ClientSession,
 ):
     html_content = render_template(template_name, **body)
 
@@ -36,12 +40,11 @@ async def send_mail_async(
         "content-type": "application/json",
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload, headers=headers) as response:
-            # log properly
-            logger.info(f"Email sent to {email} with subject {subject}")
-            logger.info(f"Response: {response.status}")
-            logger.info(f"Response body: {await response.json()}")
+    async with session.post(url, json=payload, headers=headers) as response:
+        # log properly
+        logger.info(f"Email sent to {email} with subject {subject}")
+        logger.info(f"Response: {response.status}")
+        logger.info(f"Response body: {await response.json()}")
 
 
 def render_template(template_name: str, **kwargs: dict) -> str:
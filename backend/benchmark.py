@@ -0,0 +1,145 @@
+"""
+Benchmark comparing request throughput of the sync and async database paths.
+
+This module seeds a throwaway user with a page of images, then drives two
+in-process routes that run the same queries as GET /user/images: one on the
+blocking Session used before, one on the AsyncSession used now. Point
+DATABASE_URL at PostgreSQL to see the effect of network round trips.
+
+Keep --concurrency below DB_POOL_SIZE + DB_MAX_OVERFLOW: past it the sync
+path blocks the event loop waiting for a connection that only the blocked
+loop can release, and stalls until the pool times out.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import click
+
+# Add app directory to Python path
+app_dir = Path(__file__).parent / "app"
+sys.path.insert(0, str(app_dir))
+
+
+async def drive(client, path: str, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+@click.command()
+@click.option("--requests", default=500, help="Requests per path")
+@click.option("--concurrency", default=10, help="Concurrent requests")
+@click.option("--images", default=30, help="Images seeded for the test user")
+def run(requests, concurrency, images):
+    """Compare /user/images throughput on the sync and async database paths"""
+    import httpx
+    from db import (
+        AsyncSession,
+        Base,
+        Session,
+        async_engine,
+        engine,
+        get_async_db,
+        get_db,
+    )
+    from enums import StyleCategory
+    from fastapi import Depends, FastAPI
+    from models import GeneratedImage, Styles, User
+    from repository import (
+        AsyncGeneratedImageRepository,
+        AsyncUserRepository,
+        GeneratedImageRepository,
+        UserRepository,
+    )
+
+    Base.metadata.create_all(bind=engine)
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+
+    with Session(engine) as db:
+        style = Styles(
+            name="benchmark",
+            prompt="benchmark",
+            category=list(StyleCategory)[0],
+            image_url="https://example.com/style.png",
+        )
+        user = User(email=email, hashed_password="-", verified=True)
+        db.add_all([style, user])
+        db.flush()
+        db.add_all(
+            GeneratedImage(
+                user_id=user.id,
+                style_id=style.id,
+                input_image_url=f"https://example.com/in-{i}.png",
+            )
+            for i in range(images)
+        )
+        db.commit()
+        user_id, style_id = user.id, style.id
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_path(db: Session = Depends(get_db)):
+        user = UserRepository(db).get_user_by_email(email)
+        repository = GeneratedImageRepository(db)
+        rows = repository.get_images_by_user_id(user_id=user.id)
+        return {"count": repository.count_images_by_user_id(user.id), "n": len(rows)}
+
+    @app.get("/async")
+    async def async_path(db: AsyncSession = Depends(get_async_db)):
+        user = await AsyncUserRepository(db).get_user_by_email(email)
+        repository = AsyncGeneratedImageRepository(db)
+        rows = await repository.get_images_by_user_id(user_id=user.id)
+        count = await repository.count_images_by_user_id(user.id)
+        return {"count": count, "n": len(rows)}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            # warm up both connection pools
+            await drive(client, "/sync", concurrency, concurrency)
+            await drive(client, "/async", concurrency, concurrency)
+            for path in ("/sync", "/async"):
+                result = await drive(client, path, requests, concurrency)
+                click.echo(
+                    f"{path:<7} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms"
+                )
+        await async_engine.dispose()
+
+    try:
+        asyncio.run(main())
+    finally:
+        with Session(engine) as db:
+            db.query(GeneratedImage).filter(GeneratedImage.user_id == user_id).delete()
+            db.query(User).filter(User.id == user_id).delete()
+            db.query(Styles).filter(Styles.id == style_id).delete()
+            db.commit()
+
+
+if __name__ == "__main__":
+    run()
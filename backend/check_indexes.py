@@ -0,0 +1,140 @@
+"""
+Report hot-path queries that fall back to sequential scans.
+
+This module runs the gallery, uploads, image lookup and payment queries through the
+repositories, captures the statements they emit and asks the database for
+their plans. On PostgreSQL sequential scans are disabled for the check, so
+an empty development database still shows whether an index can serve each
+query. Exits with status 1 when any query scans a whole table, which makes
+it usable as a CI step after `alembic upgrade head`.
+"""
+
+import asyncio
+import datetime
+import json
+import sys
+from pathlib import Path
+
+import click
+
+# Add app directory to Python path
+app_dir = Path(__file__).parent / "app"
+sys.path.insert(0, str(app_dir))
+
+TABLES = ("generated_images", "transactions", "user_uploads")
+
+
+def seq_scans(connection, statement) -> list[str]:
+    """Plan a statement and return the tables it reads in full."""
+    from sqlalchemy import text
+
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = connection.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = rows.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                yield node.get("Relation Name")
+            for child in node.get("Plans", []):
+                yield from walk(child)
+
+        found = list(walk(plan[0]["Plan"]))
+    else:
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        # SEARCH seeks into an index, SCAN reads the table or a whole index
+        found = [detail.split()[1] for *_, detail in rows if detail.startswith("SCAN ")]
+
+    return [table for table in found if table in TABLES]
+
+
+@click.command()
+def run():
+    """Check that the hot-path queries are served by indexes"""
+    from db import AsyncSession, Session, async_engine, engine
+    from enums import IntentStatus
+    from repository import (
+        AsyncGeneratedImageRepository,
+        AsyncUploadRepository,
+        TransactionRepository,
+    )
+    from sqlalchemy import event
+
+    statements: list = []
+
+    def capture(conn, clauseelement, multiparams, params, execution_options):
+        statements.append(clauseelement)
+
+    async def image_queries():
+        async with AsyncSession(async_engine) as db:
+            repository = AsyncGeneratedImageRepository(db)
+            uploads = AsyncUploadRepository(db)
+            after = (datetime.datetime(2025, 1, 1), 1)
+            queries = {
+                "gallery page": repository.get_images_by_user_id(user_id=1, page=3),
+                "gallery cursor": repository.get_images_by_user_id(
+                    user_id=1, after=after
+                ),
+                "favourites": repository.get_images_by_user_id(
+                    user_id=1, favourites=True
+                ),
+                "gallery count": repository.count_images_by_user_id(user_id=1),
+                "image by user and id": repository.get_image_by_user_and_id(
+                    user_id=1, image_id=1
+                ),
+                "uploads": uploads.get_recent_uploads(user_id=1, after=after),
+            }
+            captured = {}
+            for name, query in queries.items():
+                del statements[:]
+                await query
+                captured[name] = list(statements)
+        await async_engine.dispose()
+        return captured
+
+    event.listen(async_engine.sync_engine, "before_execute", capture)
+    captured = asyncio.run(image_queries())
+
+    event.listen(engine, "before_execute", capture)
+    with Session(engine) as db:
+        repository = TransactionRepository(db)
+        queries = {
+            "transaction by session": lambda: repository.get_transaction_by_session_id(
+                "cs_check"
+            ),
+            "transaction by payment": lambda: repository.get_transaction_by_payment_id(
+                "pay_check", user_id=1
+            ),
+            "transactions by user": lambda: repository.get_transactions_by_user_id(
+                user_id=1, status=IntentStatus.SUCCEEDED
+            ),
+        }
+        for name, query in queries.items():
+            del statements[:]
+            query()
+            captured[name] = list(statements)
+    event.remove(engine, "before_execute", capture)
+
+    failures = 0
+    with engine.connect() as connection:
+        for name, emitted in captured.items():
+            scanned = set()
+            for statement in emitted:
+                with connection.begin():
+                    scanned.update(seq_scans(connection, statement))
+            if scanned:
+                failures += 1
+                click.echo(f"SEQ SCAN {name:<24} {', '.join(sorted(scanned))}")
+            else:
+                click.echo(f"ok       {name}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    run()
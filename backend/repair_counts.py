@@ -0,0 +1,32 @@
+"""
+Rebuild the per-user gallery counters from generated_images.
+
+The counters are maintained on every flush that touches an image, so they
+only drift after writes that bypass the ORM, such as manual SQL. Run this
+after such changes, for one user or for everybody.
+"""
+
+import sys
+from pathlib import Path
+
+import click
+
+# Add app directory to Python path
+app_dir = Path(__file__).parent / "app"
+sys.path.insert(0, str(app_dir))
+
+
+@click.command()
+@click.option("--user-id", default=None, type=int, help="Only repair this user")
+def run(user_id):
+    """Recount total, favourite and completed images per user"""
+    from db import SessionLocal
+    from repository import ImageCountsRepository
+
+    with SessionLocal() as db:
+        repaired = ImageCountsRepository(db).rebuild(user_id=user_id)
+    click.echo(f"Rebuilt image counters of {repaired} user(s)")
+
+
+if __name__ == "__main__":
+    run()
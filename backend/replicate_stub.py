@@ -0,0 +1,187 @@
+"""
+Local stand-in for the Replicate predictions API.
+
+This module serves the few Replicate endpoints the backend calls, so
+generations can run offline and without cost. Predictions succeed after
+--delay seconds with a small PNG served by the stub itself, and in webhook
+mode the completed prediction is posted, signed like Replicate does, to
+the webhook it was created with. Point the backend at it with
+REPLICATE_BASE_URL=http://127.0.0.1:8900 and, for webhook mode, set
+REPLICATE_WEBHOOK_SECRET to the secret printed at startup.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import struct
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+import click
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+
+
+def tiny_png() -> bytes:
+    """A 1x1 PNG, enough for the upload path to store."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\xc8\x96\x64")
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", pixels)
+        + chunk(b"IEND", b"")
+    )
+
+
+def sign(secret: str, webhook_id: str, timestamp: int, body: str) -> str:
+    """Standard Webhooks signature of a delivery, as Replicate sends it."""
+    key = base64.b64decode(secret.split("_", 1)[1])
+    digest = hmac.new(key, f"{webhook_id}.{timestamp}.{body}".encode(), hashlib.sha256)
+    return "v1," + base64.b64encode(digest.digest()).decode()
+
+
+def create_app(
+    base_url: str, secret: str, delay: float, fail_rate: float, drop_rate: float
+) -> FastAPI:
+    app = FastAPI(title="Replicate stub")
+    predictions: dict[str, dict] = {}
+    tasks: set[asyncio.Task] = set()
+    image = tiny_png()
+
+    def now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def public(prediction: dict) -> dict:
+        return {k: v for k, v in prediction.items() if not k.startswith("_")}
+
+    async def deliver(prediction: dict) -> None:
+        webhook = prediction["_webhook"]
+        if not webhook or random.random() < drop_rate:
+            return
+        body = json.dumps(public(prediction))
+        webhook_id = f"msg_{uuid.uuid4().hex}"
+        timestamp = int(time.time())
+        headers = {
+            "content-type": "application/json",
+            "webhook-id": webhook_id,
+            "webhook-timestamp": str(timestamp),
+            "webhook-signature": sign(secret, webhook_id, timestamp, body),
+        }
+        # Replicate retries failed deliveries a few times, so does the stub
+        async with httpx.AsyncClient(timeout=30) as client:
+            for attempt in range(3):
+                try:
+                    response = await client.post(webhook, content=body, headers=headers)
+                    if response.status_code < 300:
+                        return
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(2**attempt)
+
+    async def complete(prediction_id: str) -> None:
+        await asyncio.sleep(delay)
+        prediction = predictions[prediction_id]
+        if prediction["status"] == "canceled":
+            return
+        prediction["started_at"] = prediction["started_at"] or now()
+        prediction["completed_at"] = now()
+        prediction["metrics"] = {"predict_time": delay}
+        if random.random() < fail_rate:
+            prediction["status"] = "failed"
+            prediction["error"] = "Stub prediction failed"
+        else:
+            prediction["status"] = "succeeded"
+            prediction["output"] = [f"{base_url}/files/{prediction_id}.png"]
+        await deliver(prediction)
+
+    @app.post("/v1/models/{owner}/{name}/predictions", status_code=201)
+    async def create_prediction(owner: str, name: str, request: Request):
+        payload = await request.json()
+        prediction_id = uuid.uuid4().hex[:26]
+        prediction = {
+            "id": prediction_id,
+            "model": f"{owner}/{name}",
+            "version": "stub",
+            "status": "starting",
+            "input": payload.get("input"),
+            "output": None,
+            "logs": "",
+            "error": None,
+            "metrics": {},
+            "created_at": now(),
+            "started_at": None,
+            "completed_at": None,
+            "urls": {
+                "get": f"{base_url}/v1/predictions/{prediction_id}",
+                "cancel": f"{base_url}/v1/predictions/{prediction_id}/cancel",
+            },
+            "_webhook": payload.get("webhook"),
+        }
+        predictions[prediction_id] = prediction
+        task = asyncio.create_task(complete(prediction_id))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return public(prediction)
+
+    @app.get("/v1/predictions/{prediction_id}")
+    async def get_prediction(prediction_id: str):
+        if prediction_id not in predictions:
+            raise HTTPException(status_code=404, detail="Not found")
+        return public(predictions[prediction_id])
+
+    @app.post("/v1/predictions/{prediction_id}/cancel")
+    async def cancel_prediction(prediction_id: str):
+        prediction = predictions.get(prediction_id)
+        if prediction is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        if prediction["status"] in ("starting", "processing"):
+            prediction["status"] = "canceled"
+            prediction["completed_at"] = now()
+        return public(prediction)
+
+    @app.get("/files/{name}")
+    async def get_file(name: str):
+        return Response(content=image, media_type="image/png")
+
+    return app
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Host to bind to")
+@click.option("--port", default=8900, help="Port to bind to")
+@click.option("--delay", default=2.0, help="Seconds before a prediction completes")
+@click.option("--fail-rate", default=0.0, help="Share of predictions that fail")
+@click.option(
+    "--drop-rate",
+    default=0.0,
+    help="Share of webhooks never delivered, to exercise polling",
+)
+@click.option(
+    "--secret",
+    default=None,
+    envvar="REPLICATE_WEBHOOK_SECRET",
+    help="whsec_ signing secret, generated when not given",
+)
+def run(host, port, delay, fail_rate, drop_rate, secret):
+    """Run the Replicate stand-in"""
+    if not secret:
+        secret = "whsec_" + base64.b64encode(random.randbytes(24)).decode()
+        click.echo(f"REPLICATE_WEBHOOK_SECRET={secret}")
+    app = create_app(f"http://{host}:{port}", secret, delay, fail_rate, drop_rate)
+    uvicorn.run(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    run()
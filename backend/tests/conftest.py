@@ -0,0 +1,104 @@
+"""
+Shared test fixtures.
+
+Tests run against a throwaway SQLite database whose tables are created
+for each test, with placeholder credentials for the required settings.
+"""
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="hairtryon-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["REDIS_URL"] = ""
+for name in (
+    "GOOGLE_CLIENT_ID",
+    "GOOGLE_CLIENT_SECRET",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "REPLICATE_API_TOKEN",
+    "MAIL_FROM_NAME",
+    "BREVO_API_KEY",
+    "DODO_PAYMENTS_API_KEY",
+    "DODO_PAYMENTS_PRODUCT_ID",
+    "DODO_PAYMENTS_WEBHOOK_SECRET",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("REDIRECT_URL", "http://localhost:8000/callback")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:5173")
+os.environ.setdefault("MAIL_FROM", "noreply@example.com")
+
+import models  # noqa: E402, F401  registers every table
+import pytest  # noqa: E402
+from core.cache import user_cache  # noqa: E402
+from db import AsyncSessionLocal, Base, SessionLocal, async_engine, engine  # noqa: E402
+from enums import StyleCategory  # noqa: E402
+from models import GeneratedImage, Styles, User  # noqa: E402
+from services.styles_catalog import styles_catalog  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+    styles_catalog.invalidate()
+    user_cache.local.clear()
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+    # pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def user(db) -> User:
+    user = User(
+        name="Test User",
+        email="user@example.com",
+        hashed_password="x",
+        verified=True,
+        credits=5,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def style(db) -> Styles:
+    style = Styles(
+        name="Buzz cut",
+        description="Short all over",
+        prompt="Give the person a buzz cut",
+        category=StyleCategory.standard,
+        image_url="https://example.com/buzz.png",
+    )
+    db.add(style)
+    db.commit()
+    db.refresh(style)
+    return style
+
+
+@pytest.fixture
+def image(db, user, style) -> GeneratedImage:
+    image = GeneratedImage(
+        user_id=user.id,
+        style_id=style.id,
+        description=style.description,
+        input_image_url="https://example.com/input.png",
+    )
+    db.add(image)
+    db.commit()
+    db.refresh(image)
+    return image
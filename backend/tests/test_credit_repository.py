@@ -0,0 +1,89 @@
+from enums import JobKind, ReservationStatus
+from models import CreditReservation, User
+from repository import AsyncCreditRepository, AsyncJobRepository, CreditRepository
+
+
+async def _reserve_jobs(async_db, image, credits, shares):
+    reservation = await AsyncCreditRepository(async_db).reserve(
+        user_id=image.user_id, image_id=image.id, credits=credits
+    )
+    assert reservation is not None
+    jobs = [
+        await AsyncJobRepository(async_db).enqueue(
+            image_id=image.id,
+            kind=JobKind.VIEW,
+            reservation_id=reservation.id,
+            credits=share,
+            commit=False,
+        )
+        for share in shares
+    ]
+    await async_db.commit()
+    return reservation.id, [job.id for job in jobs]
+
+
+def _credits(db, user_id) -> int:
+    db.expire_all()
+    return db.get(User, user_id).credits
+
+
+async def test_reserve_takes_credits_off_the_balance(db, async_db, user, image):
+    reservation = await AsyncCreditRepository(async_db).reserve(
+        user_id=user.id, image_id=image.id, credits=3
+    )
+    await async_db.commit()
+
+    assert reservation is not None
+    assert reservation.held == 3
+    assert reservation.status == ReservationStatus.HELD
+    assert _credits(db, user.id) == 2
+
+
+async def test_reserve_refuses_more_than_the_balance(db, async_db, user, image):
+    reservation = await AsyncCreditRepository(async_db).reserve(
+        user_id=user.id, image_id=image.id, credits=6
+    )
+    await async_db.commit()
+
+    assert reservation is None
+    assert _credits(db, user.id) == 5
+
+
+async def test_settle_job_charges_used_and_refunds_the_rest(db, async_db, user, image):
+    reservation_id, (job_id,) = await _reserve_jobs(async_db, image, 3, [3])
+
+    refund = CreditRepository(db).settle_job(job_id, used=1)
+
+    assert refund == 2
+    assert _credits(db, user.id) == 5 - 1
+    reservation = db.get(CreditReservation, reservation_id)
+    assert (reservation.held, reservation.charged) == (0, 1)
+    assert reservation.status == ReservationStatus.SETTLED
+
+
+async def test_settle_job_twice_refunds_once(db, async_db, user, image):
+    _, (job_id,) = await _reserve_jobs(async_db, image, 1, [1])
+    repository = CreditRepository(db)
+
+    assert repository.settle_job(job_id, used=0) == 1
+    # a retried failure path settles again, the share is already gone
+    assert repository.settle_job(job_id, used=0) == 0
+    assert _credits(db, user.id) == 5
+
+
+async def test_reservation_settles_with_its_last_job(db, async_db, user, image):
+    reservation_id, jobs = await _reserve_jobs(async_db, image, 3, [1, 1, 1])
+    repository = CreditRepository(db)
+
+    repository.settle_job(jobs[0], used=1)
+    repository.settle_job(jobs[1], used=0)
+    reservation = db.get(CreditReservation, reservation_id)
+    assert reservation.status == ReservationStatus.HELD
+    assert reservation.held == 1
+
+    repository.settle_job(jobs[2], used=1)
+    db.expire_all()
+    reservation = db.get(CreditReservation, reservation_id)
+    assert reservation.status == ReservationStatus.SETTLED
+    assert (reservation.held, reservation.charged) == (0, 2)
+    assert _credits(db, user.id) == 5 - 2
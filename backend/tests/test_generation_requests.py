@@ -0,0 +1,111 @@
+import pytest
+from core.exceptions import (
+    IdempotencyKeyMismatchException,
+    NotEnoughCreditsException,
+    TooManyGenerationsException,
+)
+from models import CreditReservation, GeneratedImage, GenerationJob, User
+from services.generation_requests import (
+    JOINED_MESSAGE,
+    STARTED_MESSAGE,
+    GenerationRequestService,
+)
+
+INPUT_URL = "https://example.com/input.png"
+
+
+def _count(db, model) -> int:
+    return db.query(model).count()
+
+
+def _credits(db, user_id) -> int:
+    db.expire_all()
+    return db.get(User, user_id).credits
+
+
+async def test_request_queues_a_job_and_reserves_its_credit(db, async_db, user, style):
+    response, replayed = await GenerationRequestService(async_db).generate_image(
+        user.id, style.id, INPUT_URL
+    )
+
+    assert not replayed
+    assert response.message == STARTED_MESSAGE
+    job = db.query(GenerationJob).one()
+    assert job.image_id == response.image_id
+    assert job.credits == 1
+    assert _credits(db, user.id) == 4
+
+
+async def test_identical_request_joins_the_running_one(db, async_db, user, style):
+    service = GenerationRequestService(async_db)
+    first, _ = await service.generate_image(user.id, style.id, INPUT_URL)
+
+    second, replayed = await service.generate_image(user.id, style.id, INPUT_URL)
+
+    assert not replayed
+    assert second.image_id == first.image_id
+    assert second.message == JOINED_MESSAGE
+    assert _count(db, GeneratedImage) == 1
+    assert _count(db, GenerationJob) == 1
+    assert _credits(db, user.id) == 4
+
+
+async def test_idempotency_key_replays_the_first_response(db, async_db, user, style):
+    service = GenerationRequestService(async_db)
+    first, _ = await service.generate_image(
+        user.id, style.id, INPUT_URL, idempotency_key="key-1"
+    )
+
+    second, replayed = await service.generate_image(
+        user.id, style.id, INPUT_URL, idempotency_key="key-1"
+    )
+
+    assert replayed
+    assert second == first
+    assert _count(db, GenerationJob) == 1
+    assert _credits(db, user.id) == 4
+
+
+async def test_idempotency_key_reused_for_another_body(db, async_db, user, style):
+    service = GenerationRequestService(async_db)
+    await service.generate_image(user.id, style.id, INPUT_URL, idempotency_key="key-1")
+
+    with pytest.raises(IdempotencyKeyMismatchException):
+        await service.generate_image(
+            user.id,
+            style.id,
+            "https://example.com/other.png",
+            idempotency_key="key-1",
+        )
+    assert _count(db, GenerationJob) == 1
+
+
+async def test_request_without_credits_leaves_nothing(db, async_db, user, style):
+    db.get(User, user.id).credits = 0
+    db.commit()
+
+    with pytest.raises(NotEnoughCreditsException):
+        await GenerationRequestService(async_db).generate_image(
+            user.id, style.id, INPUT_URL
+        )
+    await async_db.rollback()
+
+    assert _count(db, GeneratedImage) == 0
+    assert _count(db, GenerationJob) == 0
+
+
+async def test_requests_over_the_in_flight_limit_are_refused(
+    db, async_db, user, style, monkeypatch
+):
+    monkeypatch.setattr("core.config.settings.GENERATION_MAX_IN_FLIGHT_PER_USER", 2)
+    service = GenerationRequestService(async_db)
+    for number in range(2):
+        await service.generate_image(
+            user.id, style.id, f"https://example.com/{number}.png"
+        )
+
+    with pytest.raises(TooManyGenerationsException):
+        await service.generate_image(user.id, style.id, INPUT_URL)
+
+    assert _count(db, CreditReservation) == 2
+    assert _credits(db, user.id) == 3
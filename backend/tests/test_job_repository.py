@@ -0,0 +1,105 @@
+import datetime
+
+from enums import JobKind, JobStatus
+from models import GenerationJob
+from repository import JobRepository
+from utils import utcnow
+
+
+def _queue(db, image, count=1) -> list[int]:
+    jobs = [
+        GenerationJob(
+            image_id=image.id,
+            kind=JobKind.IMAGE,
+            status=JobStatus.QUEUED,
+            created_at=utcnow(),
+        )
+        for _ in range(count)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    return [job.id for job in jobs]
+
+
+def _expire_lease(db, job_id):
+    db.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+        {GenerationJob.lease_expires_at: utcnow() - datetime.timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_claim_next_takes_the_oldest_queued_job(db, image):
+    first, second = _queue(db, image, count=2)
+    repository = JobRepository(db)
+
+    job = repository.claim_next("worker-a", lease_seconds=60, max_attempts=3)
+
+    assert job is not None
+    assert job.id == first
+    assert job.status == JobStatus.RUNNING
+    assert job.worker_id == "worker-a"
+    assert job.attempts == 1
+    assert job.lease_expires_at > utcnow()
+
+    other = repository.claim_next("worker-b", lease_seconds=60, max_attempts=3)
+    assert other is not None and other.id == second
+    assert repository.claim_next("worker-c", lease_seconds=60, max_attempts=3) is None
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(db, image):
+    (job_id,) = _queue(db, image)
+    repository = JobRepository(db)
+    repository.claim_next("worker-a", lease_seconds=60, max_attempts=3)
+    _expire_lease(db, job_id)
+
+    job = repository.claim_next("worker-b", lease_seconds=60, max_attempts=3)
+
+    assert job is not None
+    assert job.id == job_id
+    assert job.worker_id == "worker-b"
+    assert job.attempts == 2
+    # the first worker lost the job and cannot renew its lease
+    assert not repository.extend_lease(job_id, "worker-a", lease_seconds=60)
+    assert repository.extend_lease(job_id, "worker-b", lease_seconds=60)
+
+
+def test_live_lease_is_not_reclaimed(db, image):
+    _queue(db, image)
+    repository = JobRepository(db)
+    repository.claim_next("worker-a", lease_seconds=60, max_attempts=3)
+
+    assert repository.claim_next("worker-b", lease_seconds=60, max_attempts=3) is None
+
+
+def test_exhausted_job_is_not_reclaimed(db, image):
+    (job_id,) = _queue(db, image)
+    repository = JobRepository(db)
+    repository.claim_next("worker-a", lease_seconds=60, max_attempts=1)
+    _expire_lease(db, job_id)
+
+    assert repository.claim_next("worker-b", lease_seconds=60, max_attempts=1) is None
+    assert [job.id for job in repository.get_exhausted(utcnow(), 1, 10)] == [job_id]
+
+
+def test_claims_pause_at_max_running(db, image):
+    _queue(db, image, count=2)
+    repository = JobRepository(db)
+    repository.claim_next("worker-a", lease_seconds=60, max_attempts=3, max_running=1)
+
+    assert (
+        repository.claim_next(
+            "worker-b", lease_seconds=60, max_attempts=3, max_running=1
+        )
+        is None
+    )
+
+
+def test_finished_job_is_not_claimed(db, image):
+    (job_id,) = _queue(db, image)
+    repository = JobRepository(db)
+    repository.claim_next("worker-a", lease_seconds=60, max_attempts=3)
+    repository.finish(job_id, JobStatus.COMPLETED)
+    _expire_lease(db, job_id)
+
+    assert repository.claim_next("worker-b", lease_seconds=60, max_attempts=3) is None
+    assert repository.get_job_by_id(job_id).status == JobStatus.COMPLETED
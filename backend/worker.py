@@ -0,0 +1,55 @@
+"""
+Worker entry point for draining the image generation job queue.
+
+This module configures the Python path and provides a CLI command to run
+a pool of generation workers outside the API process. Run it alongside
+the API with JOB_QUEUE_MODE=external.
+"""
+
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+import click
+
+# Add app directory to Python path
+app_dir = Path(__file__).parent / "app"
+sys.path.insert(0, str(app_dir))
+
+
+@click.command()
+@click.option("--concurrency", default=None, type=int, help="Concurrent jobs")
+@click.option(
+    "--poll-interval", default=None, type=float, help="Seconds between queue polls"
+)
+def run(concurrency, poll_interval):
+    """Run the generation worker pool"""
+    from core.cache import close_redis
+    from core.events import event_broker
+    from core.http_clients import http_clients
+    from core.storage import s3_client
+    from core.logging import setup_logging
+    from services import WorkerPool
+
+    setup_logging()
+    pool = WorkerPool(concurrency=concurrency, poll_interval=poll_interval)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # finish in-flight jobs before exiting
+            loop.add_signal_handler(sig, pool.stop)
+        try:
+            await pool.run()
+        finally:
+            await http_clients.close()
+            s3_client.close()
+            await event_broker.close()
+            await close_redis()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()